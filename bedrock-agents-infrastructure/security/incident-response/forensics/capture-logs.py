@@ -17,6 +17,8 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from pathlib import Path
 
+from resource_inventory import DEFAULT_INVENTORY_TTL, ResourceInventory
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -27,22 +29,28 @@ logger = logging.getLogger(__name__)
 class LogCaptureManager:
     """Manages comprehensive log capture for incident forensics."""
 
-    def __init__(self, incident_id: str, output_dir: str = "./incident-logs"):
+    def __init__(
+        self,
+        incident_id: str,
+        output_dir: str = "./incident-logs",
+        inventory: Optional[ResourceInventory] = None,
+    ):
         """
         Initialize log capture manager.
 
         Args:
             incident_id: Unique incident identifier
             output_dir: Directory for captured logs
+            inventory: Shared resource inventory (in-memory one if None)
         """
         self.incident_id = incident_id
         self.output_dir = Path(output_dir) / incident_id
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.inventory = inventory or ResourceInventory(incident_id)
 
         # Initialize AWS clients
         self.cloudtrail = boto3.client("cloudtrail")
         self.cloudwatch = boto3.client("logs")
-        self.ec2 = boto3.client("ec2")
         self.rds = boto3.client("rds")
         self.s3 = boto3.client("s3")
 
@@ -131,12 +139,7 @@ class LogCaptureManager:
 
             # Get all log groups if not specified
             if log_groups is None:
-                paginator = self.cloudwatch.get_paginator("describe_log_groups")
-                log_groups = []
-                for page in paginator.paginate():
-                    log_groups.extend(
-                        [lg["logGroupName"] for lg in page.get("logGroups", [])]
-                    )
+                log_groups = self.inventory.log_group_names()
 
             all_logs = {}
             total_events = 0
@@ -200,8 +203,7 @@ class LogCaptureManager:
         try:
             # Get all VPCs if not specified
             if vpc_ids is None:
-                vpcs = self.ec2.describe_vpcs()
-                vpc_ids = [vpc["VpcId"] for vpc in vpcs.get("Vpcs", [])]
+                vpc_ids = self.inventory.vpc_ids()
 
             start_time = int((datetime.utcnow() - timedelta(hours=hours)).timestamp())
             end_time = int(datetime.utcnow().timestamp())
@@ -213,13 +215,11 @@ class LogCaptureManager:
                     logger.info(f"Capturing flow logs for VPC {vpc_id}")
 
                     # Get flow log destination
-                    flow_logs_response = self.ec2.describe_flow_logs(
-                        Filter=[{"Name": "resource-id", "Values": [vpc_id]}]
-                    )
+                    vpc_flow_logs = self.inventory.flow_logs([vpc_id])
 
                     # Extract logs from CloudWatch (if stored there)
-                    if flow_logs_response.get("FlowLogs"):
-                        for fl in flow_logs_response["FlowLogs"]:
+                    if vpc_flow_logs:
+                        for fl in vpc_flow_logs:
                             log_group = fl.get("LogGroupName")
                             if log_group:
                                 logs = []
@@ -280,15 +280,7 @@ class LogCaptureManager:
 
             # Get all DB instances if not specified
             if db_instances is None:
-                paginator = self.rds.get_paginator("describe_db_instances")
-                db_instances = []
-                for page in paginator.paginate():
-                    db_instances.extend(
-                        [
-                            db["DBInstanceIdentifier"]
-                            for db in page.get("DBInstances", [])
-                        ]
-                    )
+                db_instances = self.inventory.db_instance_ids()
 
             for db_id in db_instances:
                 try:
@@ -359,8 +351,7 @@ class LogCaptureManager:
 
             # Get all buckets if not specified
             if buckets is None:
-                response = self.s3.list_buckets()
-                buckets = [b["Name"] for b in response.get("Buckets", [])]
+                buckets = self.inventory.bucket_names()
 
             for bucket in buckets:
                 try:
@@ -499,6 +490,17 @@ def main():
     parser.add_argument("--vpc-ids", help="Comma-separated VPC IDs")
     parser.add_argument("--db-instances", help="Comma-separated DB instance IDs")
     parser.add_argument("--buckets", help="Comma-separated S3 bucket names")
+    parser.add_argument(
+        "--inventory-dir",
+        default="./incident-inventory",
+        help="Resource inventory cache shared by the forensics scripts",
+    )
+    parser.add_argument(
+        "--inventory-ttl",
+        type=float,
+        default=DEFAULT_INVENTORY_TTL,
+        help="Seconds cached inventory stays valid",
+    )
 
     args = parser.parse_args()
 
@@ -514,7 +516,10 @@ def main():
         resources["buckets"] = args.buckets.split(",")
 
     # Run capture
-    manager = LogCaptureManager(args.incident_id, args.output_dir)
+    inventory = ResourceInventory(
+        args.incident_id, args.inventory_dir, args.inventory_ttl
+    )
+    manager = LogCaptureManager(args.incident_id, args.output_dir, inventory)
     results = manager.capture_all(resources or None)
 
     # Print results
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Connection snapshot analysis for incident forensics.
+
+network-capture.py takes repeated socket snapshots (ss, or netstat where
+ss is missing) on each instance, delimited by "### " section markers, and
+uploads them to the evidence bucket. This module parses the snapshots into
+connection tables, diffs each instance's snapshots in time order (new
+listeners, new outbound peers, connections that disappeared) and keeps
+hashed indexes from peer address and listening port to instances, so a
+peer shared by many hosts (a C2 server, say) is found with dictionary
+lookups rather than by rescanning every snapshot.
+
+Usage:
+    python3 connection_analysis.py --files connections-INCIDENT123-i-1234567.txt
+    python3 connection_analysis.py --incident-id INCIDENT123 --peer 203.0.113.7
+"""
+
+import argparse
+import ipaddress
+import json
+import logging
+import re
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from pcap_analysis import download_captures
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SECTION_PREFIX = "### "
+
+# ss state names; netstat's are mapped onto them
+NETSTAT_STATES = {"ESTABLISHED": "ESTAB"}
+
+SS_PROCESS = re.compile(r'\("([^"]*)",pid=(\d+)')
+
+# Unique key of a connection: (proto, local IP, local port, peer IP, peer port)
+ConnectionKey = Tuple[str, str, Optional[int], str, Optional[int]]
+
+
+def snapshot_commands(count: int = 1, interval: int = 60) -> List[str]:
+    """
+    Shell lines that print count socket snapshots, interval seconds apart.
+
+    Each snapshot starts with "### snapshot <epoch seconds> <instance ID>"
+    and ends with "### end", so truncated output is recognized. Expects
+    $INSTANCE_ID to be set (see ssm_commands.INSTANCE_ID_SHELL).
+    """
+    return [
+        "snapshot() {",
+        '  echo "### snapshot $(date -u +%s) $INSTANCE_ID"',
+        '  echo "### sockets"',
+        "  ss -tuanp 2>/dev/null || netstat -tunap 2>/dev/null",
+        '  echo "### end"',
+        "}",
+        f"for n in $(seq 1 {count}); do",
+        "  snapshot",
+        f'  if [ "$n" -lt {count} ]; then sleep {interval}; fi',
+        "done",
+    ]
+
+
+@lru_cache(maxsize=65536)
+def _split_address(value: str) -> Tuple[str, Optional[int]]:
+    """IP and port of an ss/netstat address ("10.0.0.1:22", "[::1]:53", "*:*")."""
+    host, _, port = value.rpartition(":")
+    if host.startswith("[") and host.endswith("]"):
+        host = host[1:-1]
+    # Interface scope (127.0.0.53%lo) and IPv4-mapped IPv6 addresses
+    host = host.split("%", 1)[0]
+    if host.startswith("::ffff:") and "." in host:
+        host = host[len("::ffff:") :]
+    return host or "*", int(port) if port.isdigit() else None
+
+
+def parse_socket_line(line: str) -> Optional[Dict]:
+    """
+    One connection from a line of `ss -tuanp` or `netstat -tunap` output.
+
+    Returns:
+        Connection dictionary, or None for header and unrelated lines
+    """
+    fields = line.split()
+    if len(fields) < 5 or fields[0].rstrip("6") not in ("tcp", "udp"):
+        return None
+    proto = fields[0].rstrip("6")
+
+    if fields[1].isdigit():
+        # netstat: Proto Recv-Q Send-Q Local Foreign [State] [PID/Program]
+        local, peer = fields[3], fields[4]
+        rest = fields[5:]
+        if rest and "/" not in rest[0] and rest[0] != "-":
+            state = rest.pop(0)
+            state = NETSTAT_STATES.get(state, state.replace("_", "-"))
+        else:
+            state = "UNCONN"
+        # Program names may contain spaces ("1234/nginx: master")
+        program = " ".join(rest) or "-"
+        pid, _, process = program.partition("/")
+        pid = int(pid) if pid.isdigit() else None
+        process = process or None
+    else:
+        # ss: Netid State Recv-Q Send-Q Local Peer [Process]
+        if len(fields) < 6:
+            return None
+        state, local, peer = fields[1], fields[4], fields[5]
+        match = SS_PROCESS.search(" ".join(fields[6:]))
+        process, pid = (match.group(1), int(match.group(2))) if match else (None, None)
+
+    local_ip, local_port = _split_address(local)
+    peer_ip, peer_port = _split_address(peer)
+    return {
+        "proto": proto,
+        "state": state,
+        "local_ip": local_ip,
+        "local_port": local_port,
+        "peer_ip": peer_ip,
+        "peer_port": peer_port,
+        "process": process,
+        "pid": pid,
+    }
+
+
+def parse_snapshots(text: str, instance_id: Optional[str] = None) -> List[Dict]:
+    """
+    Snapshots in the output of the snapshot_commands() script.
+
+    Args:
+        text: Command output or snapshot file contents
+        instance_id: Instance the output came from, if the markers lack it
+
+    Returns:
+        Snapshot dictionaries (instance_id, taken_at, complete, connections)
+    """
+    snapshots = []
+    current = None
+    section = None
+    for line in text.splitlines():
+        if line.startswith(SECTION_PREFIX):
+            words = line[len(SECTION_PREFIX) :].split()
+            if not words:
+                continue
+            if words[0] == "snapshot":
+                current = {
+                    "instance_id": words[2] if len(words) > 2 else instance_id,
+                    "taken_at": int(words[1]) if len(words) > 1 else None,
+                    "complete": False,
+                    "connections": [],
+                }
+                snapshots.append(current)
+            elif words[0] == "end" and current is not None:
+                current["complete"] = True
+                current = None
+            section = words[0]
+        elif current is not None and section == "sockets":
+            connection = parse_socket_line(line)
+            if connection:
+                current["connections"].append(connection)
+    return snapshots
+
+
+def is_listener(connection: Dict) -> bool:
+    """Whether a connection is a listening TCP socket or an unconnected UDP one."""
+    return connection["state"] == "LISTEN" or (
+        connection["proto"] == "udp" and connection["peer_port"] is None
+    )
+
+
+def connection_key(connection: Dict) -> ConnectionKey:
+    """Key identifying a connection across snapshots."""
+    return (
+        connection["proto"],
+        connection["local_ip"],
+        connection["local_port"],
+        connection["peer_ip"],
+        connection["peer_port"],
+    )
+
+
+@lru_cache(maxsize=65536)
+def is_external(address: str) -> bool:
+    """Whether an address is globally routable."""
+    try:
+        return ipaddress.ip_address(address).is_global
+    except ValueError:
+        return False
+
+
+class ConnectionTable:
+    """Connections of one snapshot, split into listeners and outbound peers."""
+
+    def __init__(self, snapshot: Dict):
+        """
+        Initialize connection table.
+
+        Args:
+            snapshot: Snapshot dictionary from parse_snapshots()
+        """
+        self.instance_id = snapshot["instance_id"] or "unknown"
+        self.taken_at = snapshot["taken_at"]
+        self.complete = snapshot["complete"]
+
+        self.connections: Dict[ConnectionKey, Dict] = {}
+        self.listeners: Dict[Tuple[str, str, Optional[int]], Dict] = {}
+        for c in snapshot["connections"]:
+            if is_listener(c):
+                self.listeners[(c["proto"], c["local_ip"], c["local_port"])] = c
+            else:
+                self.connections[connection_key(c)] = c
+
+        # Connections to a local listening port are inbound; the rest go out
+        listening_ports = {(proto, port) for proto, _, port in self.listeners}
+        self.outbound: Dict[Tuple[str, str, Optional[int]], Dict] = {}
+        for c in self.connections.values():
+            if (c["proto"], c["local_port"]) not in listening_ports:
+                self.outbound.setdefault((c["proto"], c["peer_ip"], c["peer_port"]), c)
+
+
+class ConnectionAnalyzer:
+    """Diffs connection snapshots per instance and rolls them up across instances."""
+
+    def __init__(self, top_n: int = 20):
+        """
+        Initialize connection analyzer.
+
+        Args:
+            top_n: Number of entries in rollup lists
+        """
+        self.top_n = top_n
+
+        self.tables: Dict[str, List[ConnectionTable]] = defaultdict(list)
+        self.incomplete = 0
+
+        # Hashed indexes: peer IP -> instance -> {(peer port, process)} and
+        # (proto, listening port) -> instance -> {process}
+        self.peer_index: Dict[str, Dict[str, Set[Tuple]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self.listener_index: Dict[Tuple[str, int], Dict[str, Set]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+
+    def add_snapshot(self, snapshot: Dict) -> None:
+        """Add one parsed snapshot and index its peers and listeners."""
+        if not snapshot["complete"]:
+            # Truncated output (e.g. SSM's 24,000 character limit)
+            self.incomplete += 1
+        table = ConnectionTable(snapshot)
+        self.tables[table.instance_id].append(table)
+
+        for c in table.outbound.values():
+            self.peer_index[c["peer_ip"]][table.instance_id].add(
+                (c["peer_port"], c["process"])
+            )
+        for c in table.listeners.values():
+            self.listener_index[(c["proto"], c["local_port"])][table.instance_id].add(
+                c["process"]
+            )
+
+    def add_text(self, text: str, instance_id: Optional[str] = None) -> int:
+        """Add the snapshots in command output or a file; returns how many."""
+        snapshots = parse_snapshots(text, instance_id)
+        for snapshot in snapshots:
+            self.add_snapshot(snapshot)
+        return len(snapshots)
+
+    def add_files(self, paths: List[str]) -> int:
+        """Add the snapshots in local files; returns how many."""
+        total = 0
+        for path in paths:
+            with open(path, errors="replace") as f:
+                total += self.add_text(f.read())
+        return total
+
+    @staticmethod
+    def diff(previous: ConnectionTable, current: ConnectionTable) -> Dict:
+        """
+        Changes between two snapshots of one instance.
+
+        Returns:
+            New and closed listeners, new outbound peers and connections
+            that disappeared
+        """
+        return {
+            "from": previous.taken_at,
+            "to": current.taken_at,
+            "new_listeners": [
+                dict(current.listeners[k])
+                for k in current.listeners.keys() - previous.listeners.keys()
+            ],
+            "closed_listeners": [
+                dict(previous.listeners[k])
+                for k in previous.listeners.keys() - current.listeners.keys()
+            ],
+            "new_peers": [
+                dict(current.outbound[k])
+                for k in current.outbound.keys() - previous.outbound.keys()
+            ],
+            "gone_connections": [
+                dict(previous.connections[k])
+                for k in previous.connections.keys() - current.connections.keys()
+            ],
+        }
+
+    def changes(self, instance_id: str) -> List[Dict]:
+        """
+        Diffs of an instance's consecutive snapshots, in time order.
+
+        Truncated snapshots are left out, as their missing lines would show
+        up as closed listeners and gone connections.
+        """
+        tables = sorted(
+            (t for t in self.tables.get(instance_id, []) if t.complete),
+            key=lambda t: t.taken_at or 0,
+        )
+        diffs = [self.diff(a, b) for a, b in zip(tables, tables[1:])]
+        return [d for d in diffs if any(d[k] for k in d if k not in ("from", "to"))]
+
+    def shared_peers(
+        self, min_hosts: int = 2, external_only: bool = True
+    ) -> List[Dict]:
+        """
+        Peer addresses that several instances connect out to.
+
+        Args:
+            min_hosts: Fewest instances a peer needs
+            external_only: Skip private, loopback and link-local peers
+
+        Returns:
+            Peers with the most instances first
+        """
+        shared = [
+            (len(hosts), ip)
+            for ip, hosts in self.peer_index.items()
+            if len(hosts) >= min_hosts and (not external_only or is_external(ip))
+        ]
+        shared.sort(key=lambda s: (-s[0], s[1]))
+        return [self.peer(ip) for _, ip in shared[: self.top_n]]
+
+    def peer(self, ip: str) -> Dict:
+        """Instances that connected out to an address, with ports and processes."""
+        hosts = self.peer_index.get(ip, {})
+        return {
+            "ip": ip,
+            "hosts": len(hosts),
+            "ports": sorted({p for seen in hosts.values() for p, _ in seen if p}),
+            "processes": sorted({n for seen in hosts.values() for _, n in seen if n}),
+            "instances": sorted(hosts),
+        }
+
+    def rare_listeners(self, max_hosts: int = 2) -> List[Dict]:
+        """
+        Listening ports found on only a few instances of the fleet.
+
+        A port that one or two hosts listen on, when the rest do not, is
+        worth a look for backdoors.
+        """
+        if len(self.tables) <= max_hosts:
+            return []
+        rare = [
+            {
+                "proto": proto,
+                "port": port,
+                "hosts": len(hosts),
+                "processes": sorted(
+                    {p for names in hosts.values() for p in names if p}
+                ),
+                "instances": sorted(hosts),
+            }
+            for (proto, port), hosts in self.listener_index.items()
+            if len(hosts) <= max_hosts
+        ]
+        rare.sort(key=lambda r: (r["hosts"], r["proto"], r["port"] or 0))
+        return rare[: self.top_n]
+
+    def report(
+        self,
+        min_hosts: int = 2,
+        max_listener_hosts: int = 2,
+        peer: Optional[str] = None,
+    ) -> Dict:
+        """
+        Snapshot counts, per-instance changes and cross-instance rollups.
+
+        Args:
+            min_hosts: Fewest instances for a shared peer
+            max_listener_hosts: Most instances for a rare listener
+            peer: Also look up the instances connected to this address
+
+        Returns:
+            Dictionary with the analysis results
+        """
+        changes = {i: self.changes(i) for i in sorted(self.tables)}
+        report = {
+            "instances": len(self.tables),
+            "snapshots": sum(len(t) for t in self.tables.values()),
+            "incomplete_snapshots": self.incomplete,
+            "changes": {i: c for i, c in changes.items() if c},
+            "shared_peers": self.shared_peers(min_hosts),
+            "rare_listeners": self.rare_listeners(max_listener_hosts),
+        }
+        if peer:
+            report["peer"] = self.peer(peer)
+        return report
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Parse, diff and roll up connection snapshots"
+    )
+    parser.add_argument("--files", nargs="*", default=[], help="Local snapshot files")
+    parser.add_argument(
+        "--incident-id", help="Download this incident's snapshots from S3 first"
+    )
+    parser.add_argument(
+        "--bucket", default="incident-evidence", help="Evidence bucket to download from"
+    )
+    parser.add_argument(
+        "--download-dir",
+        default="./incident-connections",
+        help="Directory for downloads",
+    )
+    parser.add_argument(
+        "--min-hosts", type=int, default=2, help="Fewest instances for a shared peer"
+    )
+    parser.add_argument(
+        "--max-listener-hosts",
+        type=int,
+        default=2,
+        help="Most instances for a rare listening port",
+    )
+    parser.add_argument("--peer", help="List the instances connected to this address")
+    parser.add_argument("--top", type=int, default=20, help="Entries per rollup list")
+
+    args = parser.parse_args()
+
+    paths = list(args.files)
+    if args.incident_id:
+        paths += download_captures(
+            args.incident_id,
+            args.download_dir,
+            args.bucket,
+            suffix=".txt",
+            name_prefix="connections-",
+        )
+    if not paths:
+        parser.error("no snapshot files given (use --files or --incident-id)")
+
+    analyzer = ConnectionAnalyzer(top_n=args.top)
+    analyzer.add_files(paths)
+
+    print(
+        json.dumps(
+            analyzer.report(args.min_hosts, args.max_listener_hosts, args.peer),
+            indent=2,
+            default=str,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""
+DNS analysis of captured port 53 traffic for incident forensics.
+
+Decodes the DNS wire format of the packets in the DNS pcaps uploaded by
+network-capture.py into structured records (query name, type, response
+code, answers), locally rather than on a possibly compromised host. The
+records are aggregated with NumPy into domain frequencies, NXDOMAIN bursts
+per client and high-entropy labels (a sign of DGA domains or DNS
+tunneling).
+
+Usage:
+    python3 dns_analysis.py --pcaps dns-INCIDENT123-i-1234567.pcap
+    python3 dns_analysis.py --incident-id INCIDENT123 --records-dir ./dns
+"""
+
+import argparse
+import ipaddress
+import json
+import logging
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from pcap_analysis import (
+    IPPROTO_TCP,
+    IPPROTO_UDP,
+    decode_packet,
+    download_captures,
+    format_address,
+    read_pcap,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DNS_PORT = 53
+
+QTYPE_NAMES = {
+    1: "A",
+    2: "NS",
+    5: "CNAME",
+    6: "SOA",
+    12: "PTR",
+    15: "MX",
+    16: "TXT",
+    28: "AAAA",
+    33: "SRV",
+    65: "HTTPS",
+    255: "ANY",
+}
+RCODE_NAMES = {
+    0: "NOERROR",
+    1: "FORMERR",
+    2: "SERVFAIL",
+    3: "NXDOMAIN",
+    4: "NOTIMP",
+    5: "REFUSED",
+}
+RCODE_NXDOMAIN = 3
+
+# Longest DNS label
+MAX_LABEL_LENGTH = 63
+
+# Labels scored for entropy per NumPy batch
+ENTROPY_BATCH = 8192
+
+_HEADER = struct.Struct(">HHHHHH")
+_RR = struct.Struct(">HHIH")
+_U16 = struct.Struct(">H")
+
+
+def _read_name(message: bytes, offset: int) -> Tuple[str, int]:
+    """
+    Read a possibly compressed domain name.
+
+    Returns:
+        (name, offset just past the name in the original position)
+    """
+    labels = []
+    end = -1
+    jumps = 0
+    while True:
+        if offset >= len(message):
+            raise ValueError("name runs past end of message")
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(message) or jumps > 16:
+                raise ValueError("bad compression pointer")
+            if end < 0:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | message[offset + 1]
+            jumps += 1
+        elif length == 0:
+            offset += 1
+            break
+        else:
+            # latin-1 keeps binary labels (tunnelling, DGAs) byte for byte
+            labels.append(message[offset + 1 : offset + 1 + length].decode("latin-1"))
+            offset += 1 + length
+    return ".".join(labels).lower(), end if end >= 0 else offset
+
+
+def _rdata(message: bytes, rtype: int, offset: int, length: int) -> str:
+    """Text form of a resource record's data."""
+    data = message[offset : offset + length]
+    if rtype == 1 and length == 4:
+        return str(ipaddress.IPv4Address(data))
+    if rtype == 28 and length == 16:
+        return str(ipaddress.IPv6Address(data))
+    if rtype in (2, 5, 12):
+        return _read_name(message, offset)[0]
+    if rtype == 15 and length > 2:
+        return f"{_U16.unpack_from(message, offset)[0]} {_read_name(message, offset + 2)[0]}"
+    if rtype == 16:
+        strings, i = [], 0
+        while i < length:
+            strings.append(data[i + 1 : i + 1 + data[i]].decode("utf-8", "replace"))
+            i += 1 + data[i]
+        return " ".join(strings)
+    return data.hex()
+
+
+def decode_dns(message: bytes) -> Dict:
+    """
+    Decode a DNS message in wire format.
+
+    Args:
+        message: DNS message without any TCP length prefix
+
+    Returns:
+        Dictionary with ID, response flag, response code, questions and answers
+
+    Raises:
+        ValueError: If the message is malformed
+    """
+    if len(message) < 12:
+        raise ValueError("message shorter than DNS header")
+    msg_id, flags, qdcount, ancount, _, _ = _HEADER.unpack_from(message, 0)
+
+    offset = 12
+    questions = []
+    for _ in range(qdcount):
+        name, offset = _read_name(message, offset)
+        if offset + 4 > len(message):
+            raise ValueError("question runs past end of message")
+        qtype = _U16.unpack_from(message, offset)[0]
+        questions.append((name, qtype))
+        offset += 4
+
+    answers = []
+    for _ in range(ancount):
+        name, offset = _read_name(message, offset)
+        if offset + 10 > len(message):
+            raise ValueError("answer runs past end of message")
+        rtype, _, ttl, length = _RR.unpack_from(message, offset)
+        offset += 10
+        answers.append(
+            {
+                "name": name,
+                "type": QTYPE_NAMES.get(rtype, str(rtype)),
+                "ttl": ttl,
+                "data": _rdata(message, rtype, offset, length),
+            }
+        )
+        offset += length
+
+    return {
+        "id": msg_id,
+        "response": bool(flags & 0x8000),
+        "rcode": flags & 0x000F,
+        "questions": questions,
+        "answers": answers,
+    }
+
+
+def extract_records(path: str, records_path: Optional[str] = None) -> Dict:
+    """
+    Decode every DNS message in a pcap file.
+
+    Records are written as JSON lines if a path is given; the returned
+    columns hold only what the aggregations need.
+
+    Args:
+        path: Path to the pcap file
+        records_path: Write every decoded record to this file
+
+    Returns:
+        Dictionary with per-message columns and decode counts
+    """
+    logger.info(f"Extracting DNS records from {path}")
+
+    columns: Dict[str, List] = {
+        "ts": [],
+        "client": [],
+        "qname": [],
+        "qtype": [],
+        "rcode": [],
+        "response": [],
+    }
+    counts = {"messages": 0, "malformed": 0, "tcp_partial": 0}
+    records_file = open(records_path, "w") if records_path else None
+
+    try:
+        for linktype, ts, _, data in read_pcap(path):
+            packet = decode_packet(linktype, data)
+            if (
+                packet is None
+                or packet.payload < 0
+                or DNS_PORT not in (packet.sport, packet.dport)
+            ):
+                continue
+
+            message = data[packet.payload :]
+            if packet.proto == IPPROTO_TCP:
+                if len(message) < 2:
+                    continue
+                length = _U16.unpack_from(message, 0)[0]
+                if len(message) < 2 + length:
+                    # Message split across segments; not reassembled
+                    counts["tcp_partial"] += 1
+                    continue
+                message = message[2 : 2 + length]
+            elif packet.proto != IPPROTO_UDP:
+                continue
+
+            try:
+                dns = decode_dns(message)
+            except (ValueError, IndexError, struct.error):
+                counts["malformed"] += 1
+                continue
+            if not dns["questions"]:
+                continue
+
+            counts["messages"] += 1
+            qname, qtype = dns["questions"][0]
+            # The client is the querier: source of queries, target of responses
+            client = format_address(packet.dst if dns["response"] else packet.src)
+            columns["ts"].append(ts)
+            columns["client"].append(client)
+            columns["qname"].append(qname)
+            columns["qtype"].append(QTYPE_NAMES.get(qtype, str(qtype)))
+            columns["rcode"].append(dns["rcode"])
+            columns["response"].append(dns["response"])
+
+            if records_file is not None:
+                record = {
+                    "ts": ts,
+                    "src": format_address(packet.src),
+                    "dst": format_address(packet.dst),
+                    "id": dns["id"],
+                    "response": dns["response"],
+                    "qname": qname,
+                    "qtype": QTYPE_NAMES.get(qtype, str(qtype)),
+                }
+                if dns["response"]:
+                    record["rcode"] = RCODE_NAMES.get(dns["rcode"], str(dns["rcode"]))
+                    record["answers"] = dns["answers"]
+                records_file.write(json.dumps(record) + "\n")
+
+    except Exception as e:
+        logger.error(f"Error extracting DNS from {path}: {e}")
+        return {"status": "error", "file": path, "error": str(e)}
+    finally:
+        if records_file is not None:
+            records_file.close()
+
+    return {
+        "status": "success",
+        "file": path,
+        **counts,
+        "columns": columns,
+        "records_file": records_path,
+    }
+
+
+def label_entropy(labels: np.ndarray) -> np.ndarray:
+    """
+    Shannon entropy in bits per character of each label.
+
+    Args:
+        labels: Array of label byte strings (dtype S)
+
+    Returns:
+        Float array of entropies
+    """
+    entropy = np.zeros(len(labels))
+    for start in range(0, len(labels), ENTROPY_BATCH):
+        batch = labels[start : start + ENTROPY_BATCH].astype(f"S{MAX_LABEL_LENGTH}")
+        chars = batch.view(np.uint8).reshape(len(batch), MAX_LABEL_LENGTH)
+        lengths = (chars != 0).sum(axis=1)
+
+        # Per-label byte histograms from one bincount over (row, byte) codes
+        rows = np.repeat(np.arange(len(batch)), MAX_LABEL_LENGTH)
+        hist = np.bincount(
+            rows * 256 + chars.ravel(), minlength=len(batch) * 256
+        ).reshape(len(batch), 256)
+        hist[:, 0] = 0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p = hist / lengths[:, None]
+            terms = np.where(hist > 0, -p * np.log2(p), 0.0)
+        entropy[start : start + len(batch)] = terms.sum(axis=1)
+    return entropy
+
+
+class DNSAnalyzer:
+    """Aggregates decoded DNS records into investigation leads."""
+
+    def __init__(
+        self,
+        nxdomain_window: float = 60.0,
+        nxdomain_threshold: int = 20,
+        entropy_threshold: float = 3.5,
+        min_label_length: int = 12,
+        top_n: int = 20,
+    ):
+        """
+        Initialize DNS analyzer.
+
+        Args:
+            nxdomain_window: Seconds in the sliding window for NXDOMAIN bursts
+            nxdomain_threshold: NXDOMAIN responses within the window that
+                make a burst
+            entropy_threshold: Bits per character above which a label is
+                reported
+            min_label_length: Shorter labels are not scored for entropy
+            top_n: Number of top domains to report
+        """
+        self.nxdomain_window = nxdomain_window
+        self.nxdomain_threshold = nxdomain_threshold
+        self.entropy_threshold = entropy_threshold
+        self.min_label_length = min_label_length
+        self.top_n = top_n
+
+    def _top(self, values: np.ndarray) -> List[Dict]:
+        """Most frequent values with their counts."""
+        if not len(values):
+            return []
+        unique, counts = np.unique(values, return_counts=True)
+        order = np.argsort(counts, kind="stable")[::-1][: self.top_n]
+        return [{"domain": str(unique[i]), "count": int(counts[i])} for i in order]
+
+    def domain_frequency(self, qnames: np.ndarray) -> Dict:
+        """Top query names and top registered domains (last two labels)."""
+        base = np.array([".".join(q.rsplit(".", 2)[-2:]) for q in qnames], dtype=str)
+        return {
+            "unique_names": int(len(np.unique(qnames))) if len(qnames) else 0,
+            "top_names": self._top(qnames),
+            "top_domains": self._top(base),
+        }
+
+    def nxdomain_bursts(
+        self, ts: np.ndarray, clients: np.ndarray, qnames: np.ndarray
+    ) -> List[Dict]:
+        """
+        Windows in which a client received many NXDOMAIN responses.
+
+        Args:
+            ts: Timestamps of the NXDOMAIN responses
+            clients: Client address of each response
+            qnames: Query name of each response
+
+        Returns:
+            Bursts per client with start, end, count and sample names
+        """
+        bursts: List[Dict] = []
+        if not len(ts):
+            return bursts
+
+        # One sort by client, then time; each client is a run of the result
+        unique_clients, codes = np.unique(clients, return_inverse=True)
+        order = np.lexsort((ts, codes))
+        codes, all_times, all_names = codes[order], ts[order], qnames[order]
+        bounds = np.flatnonzero(np.diff(codes)) + 1
+        bounds = np.concatenate(([0], bounds, [len(codes)]))
+
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            if hi - lo < self.nxdomain_threshold:
+                continue
+            client = unique_clients[codes[lo]]
+            times = all_times[lo:hi]
+            names = all_names[lo:hi]
+
+            # Responses within the window starting at each response
+            ends = np.searchsorted(times, times + self.nxdomain_window, side="right")
+            counts = ends - np.arange(len(times))
+
+            # Merge overlapping windows that are over the threshold
+            candidates = np.flatnonzero(counts >= self.nxdomain_threshold)
+            i = 0
+            while i < len(candidates):
+                start = candidates[i]
+                end = ends[start]
+                i += 1
+                while i < len(candidates) and candidates[i] < end:
+                    end = max(end, ends[candidates[i]])
+                    i += 1
+                unique_names = np.unique(names[start:end])
+                bursts.append(
+                    {
+                        "client": str(client),
+                        "start": float(times[start]),
+                        "end": float(times[end - 1]),
+                        "count": int(end - start),
+                        "unique_names": int(len(unique_names)),
+                        "sample_names": [str(n) for n in unique_names[:10]],
+                    }
+                )
+        return sorted(bursts, key=lambda b: b["count"], reverse=True)
+
+    def high_entropy_labels(self, qnames: np.ndarray) -> List[Dict]:
+        """Query names whose longest label has high character entropy."""
+        if not len(qnames):
+            return []
+        unique, counts = np.unique(qnames, return_counts=True)
+        # Names decode labels as latin-1, so each character is one byte
+        labels = np.array(
+            [
+                max(q.split("."), key=len)[:MAX_LABEL_LENGTH].encode(
+                    "latin-1", "replace"
+                )
+                for q in unique
+            ],
+            dtype=f"S{MAX_LABEL_LENGTH}",
+        )
+        lengths = np.char.str_len(labels)
+        scored = np.flatnonzero(lengths >= self.min_label_length)
+        entropy = label_entropy(labels[scored])
+
+        hits = scored[entropy >= self.entropy_threshold]
+        hit_entropy = entropy[entropy >= self.entropy_threshold]
+        order = np.argsort(hit_entropy)[::-1]
+        return [
+            {
+                "qname": str(unique[hits[i]]),
+                "label": labels[hits[i]].decode("latin-1"),
+                "length": int(lengths[hits[i]]),
+                "entropy": round(float(hit_entropy[i]), 3),
+                "queries": int(counts[hits[i]]),
+            }
+            for i in order
+        ]
+
+    def analyze(self, columns: Dict[str, List]) -> Dict:
+        """
+        Aggregate extracted DNS columns.
+
+        Args:
+            columns: Per-message columns from extract_records
+
+        Returns:
+            Dictionary with domain frequency, NXDOMAIN bursts, high-entropy
+            labels and per-type and per-rcode counts
+        """
+        ts = np.asarray(columns["ts"], dtype=float)
+        clients = np.asarray(columns["client"], dtype=str)
+        qnames = np.asarray(columns["qname"], dtype=str)
+        qtypes = np.asarray(columns["qtype"], dtype=str)
+        rcodes = np.asarray(columns["rcode"], dtype=np.int64)
+        responses = np.asarray(columns["response"], dtype=bool)
+
+        # Count queries; fall back to responses if only those were captured
+        counted = ~responses if (~responses).any() else responses
+        nx = responses & (rcodes == RCODE_NXDOMAIN)
+
+        type_names, type_counts = np.unique(qtypes[counted], return_counts=True)
+        rcode_values, rcode_counts = np.unique(rcodes[responses], return_counts=True)
+
+        return {
+            "messages": int(len(ts)),
+            "queries": int((~responses).sum()),
+            "responses": int(responses.sum()),
+            "clients": int(len(np.unique(clients))) if len(clients) else 0,
+            "query_types": {str(t): int(c) for t, c in zip(type_names, type_counts)},
+            "response_codes": {
+                RCODE_NAMES.get(int(r), str(r)): int(c)
+                for r, c in zip(rcode_values, rcode_counts)
+            },
+            "domain_frequency": self.domain_frequency(qnames[counted]),
+            "nxdomain_bursts": self.nxdomain_bursts(ts[nx], clients[nx], qnames[nx]),
+            "high_entropy_labels": self.high_entropy_labels(qnames[counted]),
+        }
+
+    def analyze_files(
+        self,
+        paths: List[str],
+        workers: Optional[int] = None,
+        records_dir: Optional[str] = None,
+    ) -> Dict:
+        """
+        Extract DNS records from pcap files in parallel and aggregate them.
+
+        Args:
+            paths: Paths to DNS pcap files
+            workers: Worker processes (CPU count if None)
+            records_dir: Write each file's records to
+                <records_dir>/<name>.dns.jsonl
+
+        Returns:
+            Dictionary with per-file decode counts and the aggregations
+        """
+        if records_dir:
+            os.makedirs(records_dir, exist_ok=True)
+
+        def records_path(path: str) -> Optional[str]:
+            if not records_dir:
+                return None
+            name = os.path.splitext(os.path.basename(path))[0]
+            return os.path.join(records_dir, f"{name}.dns.jsonl")
+
+        if len(paths) <= 1 or workers == 1:
+            results = [extract_records(p, records_path(p)) for p in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(
+                    executor.map(
+                        extract_records, paths, [records_path(p) for p in paths]
+                    )
+                )
+
+        columns: Dict[str, List] = {}
+        for result in results:
+            for name, values in result.pop("columns", {}).items():
+                columns.setdefault(name, []).extend(values)
+        if not columns:
+            columns = {
+                c: [] for c in ("ts", "client", "qname", "qtype", "rcode", "response")
+            }
+
+        return {"status": "success", "files": results, **self.analyze(columns)}
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Decode and analyze DNS traffic from packet captures"
+    )
+    parser.add_argument("--pcaps", nargs="*", default=[], help="Local pcap files")
+    parser.add_argument(
+        "--incident-id", help="Download this incident's DNS captures from S3 first"
+    )
+    parser.add_argument(
+        "--bucket", default="incident-evidence", help="Evidence bucket to download from"
+    )
+    parser.add_argument(
+        "--download-dir", default="./incident-pcaps", help="Directory for downloads"
+    )
+    parser.add_argument(
+        "--records-dir", help="Write every DNS record as JSON lines to this directory"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--nxdomain-window",
+        type=float,
+        default=60.0,
+        help="Sliding window in seconds for NXDOMAIN bursts",
+    )
+    parser.add_argument(
+        "--nxdomain-threshold",
+        type=int,
+        default=20,
+        help="NXDOMAIN responses within the window that make a burst",
+    )
+    parser.add_argument(
+        "--entropy-threshold",
+        type=float,
+        default=3.5,
+        help="Label entropy in bits per character to report",
+    )
+    parser.add_argument("--top", type=int, default=20, help="Top domains to show")
+
+    args = parser.parse_args()
+
+    paths = list(args.pcaps)
+    if args.incident_id:
+        paths += download_captures(
+            args.incident_id, args.download_dir, args.bucket, name_prefix="dns-"
+        )
+    if not paths:
+        parser.error("no pcap files given (use --pcaps or --incident-id)")
+
+    analyzer = DNSAnalyzer(
+        nxdomain_window=args.nxdomain_window,
+        nxdomain_threshold=args.nxdomain_threshold,
+        entropy_threshold=args.entropy_threshold,
+        top_n=args.top,
+    )
+    results = analyzer.analyze_files(paths, args.workers, args.records_dir)
+
+    print(json.dumps(results, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,724 @@
+#!/usr/bin/env python3
+"""
+Columnar VPC Flow Log analytics for incident forensics.
+
+Loads flow log records from CloudWatch Logs, S3 or local files into
+columnar NumPy arrays (IPv4 addresses as uint32, ports as uint16, bytes
+and packets as int64) and answers the usual investigation questions with
+vectorized group-bys: top talkers, port-scan fan-out, rejected-flow
+heatmaps and egress volume by destination.
+
+Usage:
+    python3 flow_log_analytics.py --log-group /vpc/flow-logs --hours 24
+    python3 flow_log_analytics.py --files flows-*.log.gz --save flows.npz
+    python3 flow_log_analytics.py --load flows.npz --top 50
+"""
+
+import argparse
+import gc
+import gzip
+import ipaddress
+import json
+import boto3
+import logging
+import re
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from itertools import compress
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Fields of the default (version 2) flow log format
+DEFAULT_FIELDS = [
+    "version",
+    "account-id",
+    "interface-id",
+    "srcaddr",
+    "dstaddr",
+    "srcport",
+    "dstport",
+    "protocol",
+    "packets",
+    "bytes",
+    "start",
+    "end",
+    "action",
+    "log-status",
+]
+
+# Table column: (flow log field, dtype)
+COLUMNS = {
+    "src": ("srcaddr", np.uint32),
+    "dst": ("dstaddr", np.uint32),
+    "src_port": ("srcport", np.uint16),
+    "dst_port": ("dstport", np.uint16),
+    "protocol": ("protocol", np.uint8),
+    "packets": ("packets", np.int64),
+    "bytes": ("bytes", np.int64),
+    "start": ("start", np.int64),
+    "end": ("end", np.int64),
+    "accepted": ("action", np.bool_),
+}
+
+# Networks treated as internal when measuring egress
+PRIVATE_NETWORKS = [
+    "10.0.0.0/8",
+    "172.16.0.0/12",
+    "192.168.0.0/16",
+    "100.64.0.0/10",
+    "169.254.0.0/16",
+]
+
+# Time slices queried concurrently per CloudWatch log group
+DEFAULT_SLICES = 8
+
+
+def fields_from_format(log_format: Optional[str]) -> List[str]:
+    """Field names of a flow log format string such as "${srcaddr} ${dstaddr}"."""
+    if not log_format:
+        return list(DEFAULT_FIELDS)
+    return re.findall(r"\$\{([a-z0-9-]+)\}", log_format)
+
+
+def _utc(value: datetime) -> datetime:
+    """Timezone-aware form of a datetime; naive values are taken as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _isoformat(epoch: int) -> str:
+    """ISO 8601 UTC form of epoch seconds."""
+    return datetime.fromtimestamp(int(epoch), timezone.utc).isoformat()
+
+
+def ip_to_str(address: int) -> str:
+    """Dotted-quad form of a uint32 IPv4 address."""
+    return socket.inet_ntoa(int(address).to_bytes(4, "big"))
+
+
+def _ipv4_column(values: List[str]) -> np.ndarray:
+    """Convert dotted-quad strings to uint32, converting each distinct value once."""
+    lookup = {v: int.from_bytes(socket.inet_aton(v), "big") for v in set(values)}
+    return np.fromiter(map(lookup.__getitem__, values), np.uint32, len(values))
+
+
+# Token put between joined lines; flow log fields never contain NUL
+LINE_SENTINEL = "\0"
+
+
+def _line_ok(tokens: List[str], position: Dict[str, int]) -> bool:
+    """Whether one split record converts into the table's columns."""
+    try:
+        for name, (_, dtype) in COLUMNS.items():
+            value = tokens[position[name]]
+            if name in ("src", "dst"):
+                if value != "-" and ":" not in value:
+                    socket.inet_aton(value)
+            elif name != "accepted":
+                int(value)
+    except (IndexError, ValueError, OSError):
+        return False
+    return True
+
+
+def parse_records(
+    lines: List[str], fields: List[str]
+) -> Tuple[Dict[str, np.ndarray], int]:
+    """
+    Parse flow log lines into columns.
+
+    NODATA/SKIPDATA records, IPv6 flows, lines that do not match the
+    format and lines with values that do not convert are skipped.
+
+    Args:
+        lines: Flow log records as text
+        fields: Field names of the log format
+
+    Returns:
+        (columns, number of skipped lines)
+
+    Raises:
+        ValueError: If the format lacks a field the table needs
+    """
+    missing = [f for f, _ in COLUMNS.values() if f not in fields]
+    if missing:
+        raise ValueError(f"Flow log format lacks fields: {', '.join(missing)}")
+    position = {name: fields.index(field) for name, (field, _) in COLUMNS.items()}
+    width = len(fields)
+    total = len(lines)
+
+    # Split every line in one call, with a sentinel token between lines,
+    # and take each column as a strided slice of the tokens. The sentinels
+    # land on every (width + 1)th token only if every line has exactly
+    # width fields; otherwise each line is split on its own to drop the
+    # ones that do not
+    gc.disable()
+    try:
+        tokens = f" {LINE_SENTINEL} ".join(lines).split()
+        sentinels = tokens[width :: width + 1]
+        if len(tokens) != (width + 1) * len(lines) - 1 or sentinels.count(
+            LINE_SENTINEL
+        ) != len(sentinels):
+            lines = [line for line in lines if len(line.split()) == width]
+            tokens = f" {LINE_SENTINEL} ".join(lines).split()
+    finally:
+        gc.enable()
+    raw = {name: tokens[i :: width + 1] for name, i in position.items()}
+
+    # NODATA/SKIPDATA records have "-" addresses; IPv6 flows contain ":"
+    keep = [
+        s != "-" and ":" not in s and ":" not in d
+        for s, d in zip(raw["src"], raw["dst"])
+    ]
+    if not all(keep):
+        raw = {name: list(compress(values, keep)) for name, values in raw.items()}
+
+    columns = {}
+    try:
+        for name, (_, dtype) in COLUMNS.items():
+            values = raw[name]
+            if name in ("src", "dst"):
+                columns[name] = _ipv4_column(values)
+            elif name == "accepted":
+                columns[name] = np.array(values, dtype=str) == "ACCEPT"
+            else:
+                columns[name] = np.array(values, dtype=np.int64).astype(dtype)
+    except (ValueError, OSError, OverflowError):
+        # A malformed value somewhere: drop the lines it is on and parse
+        # the rest again
+        valid = [line for line in lines if _line_ok(line.split(), position)]
+        columns, _ = parse_records(valid, fields)
+    return columns, total - len(columns["src"])
+
+
+class FlowLogTable:
+    """Flow log records stored as NumPy columns."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], skipped: int = 0):
+        """
+        Initialize flow log table.
+
+        Args:
+            columns: One array per entry of COLUMNS, all the same length
+            skipped: Records skipped while parsing
+        """
+        self.columns = columns
+        self.skipped = skipped
+
+    def __len__(self) -> int:
+        return len(self.columns["src"])
+
+    def __getattr__(self, name: str) -> np.ndarray:
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @classmethod
+    def empty(cls) -> "FlowLogTable":
+        """Table without records."""
+        return cls({name: np.array([], dtype=t) for name, (_, t) in COLUMNS.items()})
+
+    @classmethod
+    def from_lines(cls, lines: List[str], fields: List[str]) -> "FlowLogTable":
+        """Table parsed from flow log lines."""
+        columns, skipped = parse_records(lines, fields)
+        return cls(columns, skipped)
+
+    @classmethod
+    def concat(cls, tables: List["FlowLogTable"]) -> "FlowLogTable":
+        """One table holding the records of several tables."""
+        skipped = sum(t.skipped for t in tables)
+        tables = [t for t in tables if len(t)] or [cls.empty()]
+        return cls(
+            {
+                name: np.concatenate([t.columns[name] for t in tables])
+                for name in COLUMNS
+            },
+            skipped,
+        )
+
+    def save(self, path: str) -> None:
+        """Save the columns to a .npz file."""
+        np.savez_compressed(path, **self.columns)
+
+    @classmethod
+    def load(cls, path: str) -> "FlowLogTable":
+        """Load columns saved with save()."""
+        with np.load(path) as data:
+            return cls({name: data[name] for name in COLUMNS})
+
+
+class FlowLogLoader:
+    """Loads flow log records from CloudWatch Logs, S3 or local files."""
+
+    def __init__(self, max_workers: int = 8):
+        """
+        Initialize flow log loader.
+
+        Args:
+            max_workers: Concurrent CloudWatch slices or S3 objects
+        """
+        self.max_workers = max_workers
+
+        self.logs = boto3.client("logs")
+        self.s3 = boto3.client("s3")
+
+    def _load_slice(
+        self, log_group: str, start_ms: int, end_ms: int, fields: List[str]
+    ) -> FlowLogTable:
+        """Records of one time slice of a log group."""
+        paginator = self.logs.get_paginator("filter_log_events")
+        lines = [
+            event["message"]
+            for page in paginator.paginate(
+                logGroupName=log_group, startTime=start_ms, endTime=end_ms
+            )
+            for event in page.get("events", [])
+        ]
+        return FlowLogTable.from_lines(lines, fields)
+
+    def load_cloudwatch(
+        self,
+        log_group: str,
+        start: datetime,
+        end: datetime,
+        log_format: Optional[str] = None,
+        slices: int = DEFAULT_SLICES,
+    ) -> FlowLogTable:
+        """
+        Load a log group's records, reading time slices concurrently.
+
+        Args:
+            log_group: Flow log group name
+            start: Start of the time range (naive values are UTC)
+            end: End of the time range (naive values are UTC)
+            log_format: Flow log format string (default format if None)
+            slices: Number of time slices read in parallel
+
+        Returns:
+            Table with the records of the time range
+        """
+        fields = fields_from_format(log_format)
+        start_ms = int(_utc(start).timestamp() * 1000)
+        end_ms = int(_utc(end).timestamp() * 1000)
+        step = max(1, (end_ms - start_ms) // slices)
+        bounds = [(s, min(s + step, end_ms)) for s in range(start_ms, end_ms, step)]
+        logger.info(f"Loading {log_group} in {len(bounds)} slices")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            tables = list(
+                executor.map(
+                    # filter_log_events end times are inclusive
+                    lambda b: self._load_slice(log_group, b[0], b[1] - 1, fields),
+                    bounds,
+                )
+            )
+        return FlowLogTable.concat(tables)
+
+    @staticmethod
+    def _parse_text(text: str, fields: Optional[List[str]]) -> FlowLogTable:
+        """Records of a flow log file, using its header line if it has one."""
+        lines = text.splitlines()
+        if lines and not lines[0].split(" ", 1)[0].isdigit():
+            fields = lines[0].split()
+            lines = lines[1:]
+        return FlowLogTable.from_lines(lines, fields or list(DEFAULT_FIELDS))
+
+    def load_s3(
+        self,
+        bucket: str,
+        prefix: str = "",
+        since: Optional[datetime] = None,
+        fields: Optional[List[str]] = None,
+    ) -> FlowLogTable:
+        """
+        Load flow log objects delivered to S3, downloading them concurrently.
+
+        Args:
+            bucket: Flow log bucket
+            prefix: Key prefix (e.g. "AWSLogs/123456789012/vpcflowlogs/")
+            since: Skip objects last modified before this time
+            fields: Field names for objects without a header line
+
+        Returns:
+            Table with the records of the matching objects
+        """
+        keys = [
+            obj["Key"]
+            for page in self.s3.get_paginator("list_objects_v2").paginate(
+                Bucket=bucket, Prefix=prefix
+            )
+            for obj in page.get("Contents", [])
+            if obj["Key"].endswith((".log.gz", ".log"))
+            and (since is None or obj["LastModified"] >= _utc(since))
+        ]
+        logger.info(f"Loading {len(keys)} flow log objects from s3://{bucket}/{prefix}")
+
+        def load(key: str) -> FlowLogTable:
+            body = self.s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+            if key.endswith(".gz"):
+                body = gzip.decompress(body)
+            return self._parse_text(body.decode(), fields)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return FlowLogTable.concat(list(executor.map(load, keys)))
+
+    def load_files(
+        self, paths: List[str], fields: Optional[List[str]] = None
+    ) -> FlowLogTable:
+        """Load local flow log files (plain or gzip)."""
+
+        def load(path: str) -> FlowLogTable:
+            opener = gzip.open if path.endswith(".gz") else open
+            with opener(path, "rt") as f:
+                return self._parse_text(f.read(), fields)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return FlowLogTable.concat(list(executor.map(load, paths)))
+
+
+def _factorize(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distinct keys and the group index of every record.
+
+    Keys of up to 32 bits are packed with their row number into one uint64
+    and sorted once, which is several times faster than np.unique with
+    return_inverse (an argsort) on tens of millions of records.
+    """
+    n = len(keys)
+    if not n or keys.dtype.itemsize > 4 or n >= 2**32:
+        return np.unique(keys, return_inverse=True)
+    packed = (keys.astype(np.uint64) << 32) | np.arange(n, dtype=np.uint64)
+    packed.sort()
+    sorted_keys = (packed >> 32).astype(keys.dtype)
+    first = np.empty(n, dtype=bool)
+    first[0] = True
+    np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=first[1:])
+    inverse = np.empty(n, dtype=np.int64)
+    inverse[(packed & 0xFFFFFFFF).astype(np.int64)] = np.cumsum(first) - 1
+    return sorted_keys[first], inverse
+
+
+def _pair_codes(
+    a: np.ndarray, n_a: int, b: np.ndarray, n_b: int, spare: int = 1
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Int64 code per record for (a, b) group index pairs, ordered by a then b.
+
+    Codes are a * n_b + b while that leaves room for a further factor of
+    spare; otherwise the pairs are renumbered densely and the a of every
+    dense code is returned as well (None when code // n_b gives it).
+    """
+    codes = a.astype(np.int64) * n_b + b
+    if n_a * n_b * spare < 2**63:
+        return codes, None
+    pairs, codes = np.unique(codes, return_inverse=True)
+    return codes, pairs // n_b
+
+
+def _distinct(codes: np.ndarray) -> np.ndarray:
+    """
+    Sorted distinct values of an integer array.
+
+    A plain sort plus a run mask; np.unique takes a slower path for large
+    int64 arrays on recent NumPy.
+    """
+    values = np.sort(codes)
+    if not len(values):
+        return values
+    first = np.empty(len(values), dtype=bool)
+    first[0] = True
+    np.not_equal(values[1:], values[:-1], out=first[1:])
+    return values[first]
+
+
+def _runs(sorted_keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start offsets and lengths of the runs of equal values in sorted_keys."""
+    if not len(sorted_keys):
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+    starts = np.flatnonzero(np.diff(sorted_keys, prepend=sorted_keys[0] - 1))
+    return starts, np.diff(starts, append=len(sorted_keys))
+
+
+class FlowLogAnalytics:
+    """Vectorized investigation queries over a FlowLogTable."""
+
+    def __init__(
+        self,
+        table: FlowLogTable,
+        internal_networks: Optional[List[str]] = None,
+        top_n: int = 20,
+    ):
+        """
+        Initialize flow log analytics.
+
+        Args:
+            table: Flow log records
+            internal_networks: CIDRs treated as internal for egress
+                (RFC 1918, CGNAT and link-local if None)
+            top_n: Number of entries in top-N results
+        """
+        self.table = table
+        self.top_n = top_n
+        self.internal_networks = [
+            ipaddress.IPv4Network(n) for n in internal_networks or PRIVATE_NETWORKS
+        ]
+        self._factors: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _factor(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Distinct values and group indexes of a column, computed once."""
+        if column not in self._factors:
+            self._factors[column] = _factorize(getattr(self.table, column))
+        return self._factors[column]
+
+    def _is_internal(self, addresses: np.ndarray) -> np.ndarray:
+        """Mask of addresses inside the internal networks."""
+        mask = np.zeros(len(addresses), dtype=bool)
+        for network in self.internal_networks:
+            netmask = np.uint32(int(network.netmask))
+            mask |= (addresses & netmask) == np.uint32(int(network.network_address))
+        return mask
+
+    def _top(self, values: np.ndarray, n: Optional[int] = None) -> np.ndarray:
+        """Indexes of the n (default top_n) largest values, largest first."""
+        n = min(self.top_n if n is None else n, len(values))
+        if n == 0:
+            return np.array([], dtype=np.int64)
+        top = np.argpartition(values, -n)[-n:]
+        return top[np.argsort(values[top], kind="stable")[::-1]]
+
+    @staticmethod
+    def _distinct_per_group(
+        group: np.ndarray, n_groups: int, other: np.ndarray, n_other: int
+    ) -> np.ndarray:
+        """Number of distinct other values per group."""
+        codes, owners = _pair_codes(group, n_groups, other, n_other)
+        distinct = _distinct(codes)
+        owner = distinct // n_other if owners is None else owners[distinct]
+        return np.bincount(owner, minlength=n_groups)
+
+    def top_talkers(self) -> List[Dict]:
+        """Source addresses with the most bytes sent."""
+        t = self.table
+        keys, src = self._factor("src")
+        dst_keys, dst = self._factor("dst")
+        nbytes = np.bincount(src, weights=t.bytes, minlength=len(keys))
+        packets = np.bincount(src, weights=t.packets, minlength=len(keys))
+        flows = np.bincount(src, minlength=len(keys))
+        peers = self._distinct_per_group(src, len(keys), dst, len(dst_keys))
+        return [
+            {
+                "ip": ip_to_str(keys[i]),
+                "bytes": int(nbytes[i]),
+                "packets": int(packets[i]),
+                "flows": int(flows[i]),
+                "peers": int(peers[i]),
+            }
+            for i in self._top(nbytes)
+        ]
+
+    def port_scan_fanout(self, min_ports: int = 100, min_hosts: int = 50) -> List[Dict]:
+        """
+        Sources that reached many ports on one host or many hosts on one port.
+
+        Args:
+            min_ports: Distinct destination ports on a single host that flag
+                a vertical scan
+            min_hosts: Distinct hosts on a single port that flag a
+                horizontal scan
+
+        Returns:
+            Sources over either threshold, with their fan-out counts
+        """
+        t = self.table
+        if not len(t):
+            return []
+        sources, src = self._factor("src")
+        dst_keys, dst = self._factor("dst")
+        n_src, n_dst = len(sources), len(dst_keys)
+
+        # Distinct ports per (source, destination host): runs of equal pairs
+        # in the sorted distinct (source, host, port) codes
+        pair, pair_src = _pair_codes(src, n_src, dst, n_dst, spare=65536)
+        pairs = _distinct(pair * 65536 + t.dst_port) // 65536
+        starts, ports_per_pair = _runs(pairs)
+        owner = pairs[starts] // n_dst if pair_src is None else pair_src[pairs[starts]]
+        hosts = np.bincount(owner, minlength=n_src)
+        targets = np.bincount(owner, weights=ports_per_pair, minlength=n_src)
+        max_ports = np.maximum.reduceat(ports_per_pair, _runs(owner)[0])
+
+        # Distinct hosts per (source, destination port)
+        service = src.astype(np.int64) * 65536 + t.dst_port
+        code, service_of = _pair_codes(service, n_src * 65536, dst, n_dst)
+        services = _distinct(code)
+        services = services // n_dst if service_of is None else service_of[services]
+        starts, hosts_per_service = _runs(services)
+        max_hosts = np.maximum.reduceat(
+            hosts_per_service, _runs(services[starts] // 65536)[0]
+        )
+
+        rejected = np.bincount(src, weights=~t.accepted, minlength=n_src)
+        flows = np.bincount(src, minlength=n_src)
+
+        flagged = np.flatnonzero((max_ports >= min_ports) | (max_hosts >= min_hosts))
+        flagged = flagged[np.argsort(targets[flagged])[::-1]]
+        return [
+            {
+                "ip": ip_to_str(sources[i]),
+                "distinct_targets": int(targets[i]),
+                "distinct_hosts": int(hosts[i]),
+                "max_ports_on_host": int(max_ports[i]),
+                "max_hosts_on_port": int(max_hosts[i]),
+                "rejected_ratio": round(float(rejected[i] / flows[i]), 3),
+                "pattern": ("vertical" if max_ports[i] >= min_ports else "horizontal"),
+            }
+            for i in flagged
+        ]
+
+    def rejected_heatmap(self, bucket_seconds: int = 3600, ports: int = 20) -> Dict:
+        """
+        Rejected flows per time bucket and destination port.
+
+        Args:
+            bucket_seconds: Width of a time bucket
+            ports: Destination ports given their own column; the rest are
+                counted under "other"
+
+        Returns:
+            Dictionary with bucket start times, port labels and a count
+            matrix (buckets x ports)
+        """
+        t = self.table
+        rejected = ~t.accepted
+        starts = t.start[rejected]
+        dst_ports = t.dst_port[rejected]
+        if not len(starts):
+            return {
+                "bucket_seconds": bucket_seconds,
+                "buckets": [],
+                "ports": [],
+                "counts": [],
+            }
+
+        # Ports are 16-bit, so a bincount over the whole range is the group-by;
+        # the stable sort keeps the lower port first on equal counts
+        port_counts = np.bincount(dst_ports, minlength=65536)
+        n_ports = min(ports, np.count_nonzero(port_counts))
+        top = np.sort(np.argsort(-port_counts, kind="stable")[:n_ports])
+        column = np.full(65536, len(top), dtype=np.int64)
+        column[top] = np.arange(len(top))
+
+        origin = starts.min() - starts.min() % bucket_seconds
+        bucket = (starts - origin) // bucket_seconds
+        n_buckets = int(bucket.max()) + 1
+        width = len(top) + 1
+        counts = np.bincount(
+            bucket * width + column[dst_ports], minlength=n_buckets * width
+        ).reshape(n_buckets, width)
+
+        labels = [str(int(p)) for p in top] + ["other"]
+        if not counts[:, -1].any():
+            counts, labels = counts[:, :-1], labels[:-1]
+        return {
+            "bucket_seconds": bucket_seconds,
+            "buckets": [
+                _isoformat(origin + i * bucket_seconds) for i in range(n_buckets)
+            ],
+            "ports": labels,
+            "counts": counts.tolist(),
+        }
+
+    def egress_by_destination(self) -> List[Dict]:
+        """External destinations receiving the most bytes from internal sources."""
+        t = self.table
+        egress = self._is_internal(t.src) & ~self._is_internal(t.dst) & t.accepted
+        src_keys, src = self._factor("src")
+        keys, dst = _factorize(t.dst[egress])
+        nbytes = np.bincount(dst, weights=t.bytes[egress], minlength=len(keys))
+        flows = np.bincount(dst, minlength=len(keys))
+        senders = self._distinct_per_group(dst, len(keys), src[egress], len(src_keys))
+        ports = self._distinct_per_group(dst, len(keys), t.dst_port[egress], 65536)
+        return [
+            {
+                "ip": ip_to_str(keys[i]),
+                "bytes": int(nbytes[i]),
+                "flows": int(flows[i]),
+                "internal_sources": int(senders[i]),
+                "ports": int(ports[i]),
+            }
+            for i in self._top(nbytes)
+        ]
+
+    def summary(self) -> Dict:
+        """All analyses plus record totals."""
+        t = self.table
+        return {
+            "records": len(t),
+            "skipped_records": t.skipped,
+            "bytes": int(t.bytes.sum()),
+            "rejected": int((~t.accepted).sum()),
+            "start": (_isoformat(t.start.min()) if len(t) else None),
+            "end": (_isoformat(t.end.max()) if len(t) else None),
+            "top_talkers": self.top_talkers(),
+            "port_scans": self.port_scan_fanout(),
+            "rejected_heatmap": self.rejected_heatmap(),
+            "egress_by_destination": self.egress_by_destination(),
+        }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Analyze VPC Flow Logs with columnar NumPy group-bys"
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--log-group", help="CloudWatch Logs flow log group")
+    source.add_argument("--s3-uri", help="S3 location of flow log objects")
+    source.add_argument("--files", nargs="+", help="Local flow log files")
+    source.add_argument("--load", help="Table saved earlier with --save")
+    parser.add_argument(
+        "--hours", type=int, default=24, help="Hours to look back (CloudWatch/S3)"
+    )
+    parser.add_argument("--log-format", help="Flow log format string, if custom")
+    parser.add_argument(
+        "--internal-cidrs", help="Comma-separated CIDRs treated as internal"
+    )
+    parser.add_argument("--save", help="Save the loaded table to this .npz file")
+    parser.add_argument("--top", type=int, default=20, help="Entries per top-N list")
+
+    args = parser.parse_args()
+
+    loader = FlowLogLoader()
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(hours=args.hours)
+    fields = fields_from_format(args.log_format) if args.log_format else None
+
+    if args.load:
+        table = FlowLogTable.load(args.load)
+    elif args.log_group:
+        table = loader.load_cloudwatch(args.log_group, start, end, args.log_format)
+    elif args.s3_uri:
+        bucket, _, prefix = args.s3_uri.replace("s3://", "", 1).partition("/")
+        table = loader.load_s3(bucket, prefix, since=start, fields=fields)
+    else:
+        table = loader.load_files(args.files, fields)
+
+    if args.save:
+        table.save(args.save)
+
+    internal = args.internal_cidrs.split(",") if args.internal_cidrs else None
+    analytics = FlowLogAnalytics(table, internal, args.top)
+
+    print(json.dumps(analytics.summary(), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,674 @@
+#!/usr/bin/env python3
+"""
+Parallel IOC scanner for acquired memory images.
+
+Memory-maps each dump written by memory-dump.py (physical memory, process
+cores, /proc listings) and splits it into chunks scanned by a process
+pool. Every chunk runs one multi-pattern pass over the whole IOC list (IP
+addresses, domains, key prefixes and hashes, as ASCII and UTF-16LE text
+and hashes also as raw bytes) and reports each hit with its offset, so
+throughput is bound by the page cache and disk rather than by the number
+of indicators.
+
+The matcher samples one little-endian 4-byte word every 4 bytes with
+NumPy. Every pattern registers the four words at its offsets 0-3, so any
+occurrence covers exactly one sampled word. A hashed bitmap of those words
+and an exact check of the 12 bytes around each sample drop almost every
+position before the remaining candidates are compared byte by byte.
+Patterns shorter than 7 bytes are searched with find() instead. Text
+matches of IPs, hashes and domains must stand alone, so 10.0.0.1 does not
+match inside 10.0.0.12.
+
+Usage:
+    python3 ioc_scanner.py --iocs iocs.txt --dumps core-1234 physical-memory.lime
+    python3 ioc_scanner.py --iocs iocs.txt --incident-id INCIDENT123
+    python3 ioc_scanner.py --ioc evil.example.com --ioc 203.0.113.7 --dumps core-1
+"""
+
+import argparse
+import gzip
+import ipaddress
+import itertools
+import json
+import boto3
+import logging
+import mmap
+import os
+import re
+import shutil
+import tarfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+INDICATOR_TYPES = ("ip", "domain", "hash", "key")
+
+# Hex digest lengths of MD5, SHA-1, SHA-256 and SHA-512
+HASH_LENGTHS = {32, 40, 64, 128}
+
+DOMAIN_PATTERN = re.compile(r"(?:[a-z0-9_-]+\.)+[a-z][a-z0-9-]*", re.IGNORECASE)
+
+# Characters that may not touch a text match of these types, so that
+# 10.0.0.1 does not match inside 10.0.0.12 (subdomains still match)
+TOKEN_CHARS = {
+    "ip": frozenset(b"0123456789abcdefABCDEF.:"),
+    "hash": frozenset(b"0123456789abcdefABCDEF"),
+    "domain": frozenset(
+        b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_"
+    ),
+}
+
+# Shorter patterns would match all over a multi-GB image
+MIN_PATTERN_LENGTH = 4
+
+# Patterns this long cover a sampled word wherever they start
+SAMPLED_MIN_LENGTH = 7
+
+# ORed into every byte before hashing words, so case variants of ASCII
+# letters share a bitmap entry (candidates are verified exactly)
+WORD_FOLD = 0x20202020
+
+BITMAP_BITS = 20
+WORD_MULTIPLIER = 2654435761
+KEY_MULTIPLIER = 0x9E3779B97F4A7C15
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_HITS = 100
+CONTEXT_BYTES = 16
+
+DUMP_PREFIXES = ("memory-dump-", "process-dumps-")
+
+
+def classify_indicator(value: str) -> str:
+    """Guess an indicator's type: ip, hash, domain or key (anything else)."""
+    try:
+        ipaddress.ip_address(value)
+        return "ip"
+    except ValueError:
+        pass
+    if len(value) in HASH_LENGTHS and all(c in "0123456789abcdefABCDEF" for c in value):
+        return "hash"
+    if DOMAIN_PATTERN.fullmatch(value):
+        return "domain"
+    return "key"
+
+
+def parse_indicator(line: str) -> Optional[Tuple[str, str]]:
+    """
+    Parse one IOC line: "<value>" or "<type>:<value>".
+
+    Returns:
+        (type, value), or None for blank and comment lines
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    kind, _, value = line.partition(":")
+    if kind in INDICATOR_TYPES and value:
+        return kind, value.strip()
+    return classify_indicator(line), line
+
+
+def load_indicators(path: str) -> List[Tuple[str, str]]:
+    """Read an IOC list, one indicator per line."""
+    with open(path) as f:
+        parsed = (parse_indicator(line) for line in f)
+        return list(dict.fromkeys(p for p in parsed if p is not None))
+
+
+def indicator_patterns(kind: str, value: str) -> List[Tuple[str, bytes]]:
+    """
+    Byte patterns an indicator can appear as in memory.
+
+    Returns:
+        (encoding, pattern) pairs: ASCII and UTF-16LE text, plus the raw
+        digest for hashes
+    """
+    patterns = [("ascii", value.encode()), ("utf-16le", value.encode("utf-16-le"))]
+    if kind == "hash":
+        patterns.append(("raw", bytes.fromhex(value)))
+    return patterns
+
+
+def _fold_word(data: bytes) -> int:
+    """Folded little-endian word of up to 4 bytes (zero padded)."""
+    return int.from_bytes(data.ljust(4, b"\0"), "little") | WORD_FOLD
+
+
+def _word_hash(words: np.ndarray) -> np.ndarray:
+    """Bitmap slots of folded words."""
+    return (words * np.uint32(WORD_MULTIPLIER)) >> np.uint32(32 - BITMAP_BITS)
+
+
+def _window_keys(
+    prev: np.ndarray, cur: np.ndarray, nxt: np.ndarray, prev_mask: int, next_mask: int
+) -> np.ndarray:
+    """64-bit keys of the masked previous, current and next words."""
+    return (
+        (cur.astype(np.uint64) << np.uint64(32))
+        | (nxt.astype(np.uint64) & np.uint64(next_mask))
+    ) ^ ((prev.astype(np.uint64) & np.uint64(prev_mask)) * np.uint64(KEY_MULTIPLIER))
+
+
+def _words(buffer, start: int, end: int) -> np.ndarray:
+    """Folded little-endian words of buffer[start:end], the last zero padded."""
+    count = (end - start) // 4
+    words = np.frombuffer(buffer, dtype="<u4", count=count, offset=start)
+    tail = buffer[start + 4 * count : end]
+    if tail:
+        words = np.append(words, np.frombuffer(tail.ljust(4, b"\0"), dtype="<u4"))
+    return words | np.uint32(WORD_FOLD)
+
+
+class IOCMatcher:
+    """Finds every occurrence of many byte patterns in one pass."""
+
+    def __init__(self, indicators: List[Tuple[str, str]]):
+        """
+        Compile the matcher.
+
+        Args:
+            indicators: (type, value) pairs
+        """
+        self.indicators = indicators
+        # (indicator index, encoding, pattern, case-insensitive)
+        self.patterns: List[Tuple[int, str, bytes, bool]] = []
+        # Per pattern: (characters that may not touch it, character width)
+        self.boundaries: List[Optional[Tuple[frozenset, int]]] = []
+        for i, (kind, value) in enumerate(indicators):
+            for encoding, pattern in indicator_patterns(kind, value):
+                if len(pattern) < MIN_PATTERN_LENGTH:
+                    logger.warning(f"Skipping {value!r}: shorter than 4 bytes")
+                    continue
+                fold = kind != "key" and encoding != "raw"
+                self.patterns.append(
+                    (i, encoding, pattern.lower() if fold else pattern, fold)
+                )
+                self.boundaries.append(
+                    (TOKEN_CHARS[kind], 2 if encoding == "utf-16le" else 1)
+                    if kind in TOKEN_CHARS and encoding != "raw"
+                    else None
+                )
+
+        self._compile_sampled()
+        self._compile_short()
+
+    def _compile_sampled(self) -> None:
+        """Register each long pattern's words at offsets 0-3."""
+        # (prev mask, next mask) -> ([prev], [cur], [next], [(offset, pattern id)])
+        groups: Dict[Tuple[int, int], Tuple[List, List, List, List]] = {}
+        for pattern_id, (_, _, pattern, _) in enumerate(self.patterns):
+            if len(pattern) < SAMPLED_MIN_LENGTH:
+                continue
+            for offset in range(4):
+                # Bytes before the sampled word end the previous word, and
+                # up to 4 bytes after it start the next one
+                after = min(4, len(pattern) - offset - 4)
+                prev_mask = ((1 << 8 * offset) - 1) << 8 * (4 - offset)
+                next_mask = (1 << 8 * after) - 1
+                group = groups.setdefault((prev_mask, next_mask), ([], [], [], []))
+                group[0].append(_fold_word(pattern[:offset].rjust(4, b"\0")))
+                group[1].append(_fold_word(pattern[offset : offset + 4]))
+                group[2].append(_fold_word(pattern[offset + 4 : offset + 4 + after]))
+                group[3].append((offset, pattern_id))
+
+        self.bitmap = np.zeros(1 << BITMAP_BITS, dtype=bool)
+        self.groups: List[Tuple[int, int, np.ndarray]] = []
+        self.registrations: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for (prev_mask, next_mask), (prev, cur, nxt, entries) in groups.items():
+            cur_words = np.array(cur, dtype=np.uint32)
+            self.bitmap[_word_hash(cur_words)] = True
+            keys = _window_keys(
+                np.array(prev, dtype=np.uint32),
+                cur_words,
+                np.array(nxt, dtype=np.uint32),
+                prev_mask,
+                next_mask,
+            )
+            group_index = len(self.groups)
+            for key, entry in zip(keys.tolist(), entries):
+                self.registrations.setdefault((group_index, key), []).append(entry)
+            self.groups.append((prev_mask, next_mask, np.unique(keys)))
+
+    def _compile_short(self) -> None:
+        """Expand short patterns into their case variants for find()."""
+        self.short: List[Tuple[int, bytes]] = []
+        for pattern_id, (_, _, pattern, fold) in enumerate(self.patterns):
+            if len(pattern) >= SAMPLED_MIN_LENGTH:
+                continue
+            if not fold:
+                self.short.append((pattern_id, pattern))
+                continue
+            cases = [{bytes([b]), bytes([b]).upper()} for b in pattern]
+            for variant in itertools.product(*cases):
+                self.short.append((pattern_id, b"".join(variant)))
+
+    def _stands_alone(self, buffer, begin: int, pattern_id: int) -> bool:
+        """Whether a match is not part of a longer IP, hash or domain."""
+        boundary = self.boundaries[pattern_id]
+        if boundary is None:
+            return True
+        chars, width = boundary
+        end = begin + len(self.patterns[pattern_id][2])
+        before = buffer[begin - width] if begin >= width else -1
+        after = buffer[end] if end < len(buffer) else -1
+        return before not in chars and after not in chars
+
+    def scan(self, buffer, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """
+        Find pattern occurrences in a chunk of a buffer.
+
+        Matches may extend past the chunk, and every occurrence in the
+        buffer is reported by exactly one chunk when chunks are contiguous
+        and start at multiples of 4.
+
+        Args:
+            buffer: Bytes-like object (e.g. an mmap)
+            start: Chunk start, a multiple of 4
+            end: Chunk end
+
+        Yields:
+            (offset, pattern id) of each occurrence
+        """
+        size = len(buffer)
+        if self.groups and end > start:
+            # Previous and next word around every sampled word
+            lo = max(start - 4, 0)
+            words = _words(buffer, lo, min(end + 4, size))
+            if lo == start:
+                words = np.concatenate((np.array([WORD_FOLD], np.uint32), words))
+            words = np.append(words, np.uint32(WORD_FOLD))
+            count = min((end - start + 3) // 4, len(words) - 2)
+
+            cur = words[1 : count + 1]
+            candidates = np.flatnonzero(self.bitmap[_word_hash(cur)])
+            prev, nxt = words[candidates], words[candidates + 2]
+            cur = cur[candidates]
+
+            for group_index, (prev_mask, next_mask, keys) in enumerate(self.groups):
+                window_keys = _window_keys(prev, cur, nxt, prev_mask, next_mask)
+                slots = np.minimum(np.searchsorted(keys, window_keys), len(keys) - 1)
+                found = np.flatnonzero(keys[slots] == window_keys)
+                for i, key in zip(
+                    candidates[found].tolist(), window_keys[found].tolist()
+                ):
+                    word_offset = start + 4 * i
+                    for offset, pattern_id in self.registrations[(group_index, key)]:
+                        _, _, pattern, fold = self.patterns[pattern_id]
+                        begin = word_offset - offset
+                        window = buffer[begin : begin + len(pattern)]
+                        if (
+                            begin >= 0
+                            and (window.lower() if fold else window) == pattern
+                            and self._stands_alone(buffer, begin, pattern_id)
+                        ):
+                            yield begin, pattern_id
+
+        for pattern_id, variant in self.short:
+            position = buffer.find(variant, start, min(end + len(variant) - 1, size))
+            while position != -1:
+                if self._stands_alone(buffer, position, pattern_id):
+                    yield position, pattern_id
+                position = buffer.find(
+                    variant, position + 1, min(end + len(variant) - 1, size)
+                )
+
+
+def _context(buffer, offset: int, length: int) -> str:
+    """Printable bytes around a hit."""
+    data = buffer[max(0, offset - CONTEXT_BYTES) : offset + length + CONTEXT_BYTES]
+    return "".join(chr(b) if 32 <= b < 127 else "." for b in data)
+
+
+# Matcher of the worker process, set once by the pool initializer
+_worker_matcher: Optional[IOCMatcher] = None
+
+
+def _init_worker(matcher: IOCMatcher) -> None:
+    """Pool initializer: keep the matcher for every chunk of this worker."""
+    global _worker_matcher
+    _worker_matcher = matcher
+
+
+def _scan_chunk(path: str, start: int, end: int, max_hits: int) -> Dict:
+    """
+    Scan one chunk of a file in a worker process.
+
+    Returns:
+        Hit count, encodings and the first max_hits hits per indicator
+    """
+    matcher = _worker_matcher
+    counts: Counter = Counter()
+    # Hits are kept per pattern here and trimmed per indicator when merged
+    kept: Dict[int, List[Dict]] = {}
+    with open(path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for offset, pattern_id in matcher.scan(buffer, start, end):
+                counts[pattern_id] += 1
+                if counts[pattern_id] <= max_hits:
+                    _, encoding, pattern, _ = matcher.patterns[pattern_id]
+                    kept.setdefault(pattern_id, []).append(
+                        {
+                            "offset": offset,
+                            "encoding": encoding,
+                            "context": _context(buffer, offset, len(pattern)),
+                        }
+                    )
+
+    indicators: Dict[int, Dict] = {}
+    for pattern_id, count in counts.items():
+        indicator, encoding, _, _ = matcher.patterns[pattern_id]
+        entry = indicators.setdefault(
+            indicator, {"count": 0, "encodings": Counter(), "hits": []}
+        )
+        entry["count"] += count
+        entry["encodings"][encoding] += count
+        entry["hits"].extend(kept[pattern_id])
+    return {"file": path, "bytes": end - start, "indicators": indicators}
+
+
+class IOCScanner:
+    """Scans memory images for IOCs with a process pool."""
+
+    def __init__(
+        self,
+        indicators: List[Tuple[str, str]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_hits: int = DEFAULT_MAX_HITS,
+    ):
+        """
+        Initialize the scanner.
+
+        Args:
+            indicators: (type, value) pairs
+            chunk_size: Bytes per scan task (rounded down to a multiple of 4)
+            max_hits: Hits with offsets kept per indicator and file
+                (all hits are counted)
+        """
+        self.matcher = IOCMatcher(indicators)
+        self.chunk_size = max(4, chunk_size - chunk_size % 4)
+        self.max_hits = max_hits
+
+    def _chunks(self, path: str) -> List[Tuple[str, int, int]]:
+        """Scan tasks covering a file."""
+        size = os.path.getsize(path)
+        return [
+            (path, start, min(start + self.chunk_size, size))
+            for start in range(0, size, self.chunk_size)
+        ]
+
+    def scan_files(self, paths: List[str], workers: Optional[int] = None) -> Dict:
+        """
+        Scan files in parallel, chunk by chunk.
+
+        Chunks of all files share one pool, so a single large image still
+        keeps every worker busy.
+
+        Args:
+            paths: Memory images and other dump files
+            workers: Worker processes (CPU count if None)
+
+        Returns:
+            Dictionary with hits per file and indicator, and totals
+        """
+        started = time.time()
+        files: Dict[str, Dict] = {
+            path: {"file": path, "status": "success", "indicators": {}}
+            for path in paths
+        }
+        chunks = []
+        for path in paths:
+            try:
+                files[path]["size"] = os.path.getsize(path)
+                chunks.extend(self._chunks(path))
+            except OSError as e:
+                logger.error(f"Error reading {path}: {e}")
+                files[path].update({"status": "error", "error": str(e)})
+
+        total = sum(end - start for _, start, end in chunks)
+        logger.info(
+            f"Scanning {len(chunks)} chunks ({total / 2**20:.0f} MiB) for "
+            f"{len(self.matcher.indicators)} indicators"
+        )
+
+        def merge(chunk: Tuple[str, int, int], result) -> None:
+            try:
+                self._merge(files, result())
+            except Exception as e:
+                path, start, _ = chunk
+                logger.error(f"Error scanning {path} at offset {start}: {e}")
+                files[path].update({"status": "error", "error": str(e)})
+
+        if len(chunks) <= 1 or workers == 1:
+            _init_worker(self.matcher)
+            for chunk in chunks:
+                merge(chunk, lambda chunk=chunk: _scan_chunk(*chunk, self.max_hits))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.matcher,),
+            ) as executor:
+                futures = {
+                    executor.submit(_scan_chunk, *chunk, self.max_hits): chunk
+                    for chunk in chunks
+                }
+                for future in as_completed(futures):
+                    merge(futures[future], future.result)
+
+        return self._report(list(files.values()), total, time.time() - started)
+
+    def _merge(self, files: Dict[str, Dict], result: Dict) -> None:
+        """Add a chunk's results to its file."""
+        merged = files[result["file"]]["indicators"]
+        for indicator, found in result["indicators"].items():
+            entry = merged.setdefault(
+                indicator, {"count": 0, "encodings": Counter(), "hits": []}
+            )
+            entry["count"] += found["count"]
+            entry["encodings"].update(found["encodings"])
+            entry["hits"].extend(found["hits"])
+
+    def _report(self, files: List[Dict], total: int, elapsed: float) -> Dict:
+        """Per-file hits sorted by count, plus totals per indicator."""
+        indicators: Dict[str, Dict] = {}
+        for result in files:
+            hits = []
+            for indicator, entry in result.pop("indicators").items():
+                kind, value = self.matcher.indicators[indicator]
+                hits.append(
+                    {
+                        "indicator": value,
+                        "type": kind,
+                        "count": entry["count"],
+                        "encodings": dict(entry["encodings"]),
+                        "hits": sorted(entry["hits"], key=lambda h: h["offset"])[
+                            : self.max_hits
+                        ],
+                    }
+                )
+                summary = indicators.setdefault(
+                    value, {"type": kind, "count": 0, "files": []}
+                )
+                summary["count"] += entry["count"]
+                summary["files"].append(result["file"])
+            result["hits"] = sorted(hits, key=lambda h: (-h["count"], h["indicator"]))
+
+        return {
+            "status": "success",
+            "files": files,
+            "indicators": dict(
+                sorted(indicators.items(), key=lambda item: -item[1]["count"])
+            ),
+            "totals": {
+                "files": len(files),
+                "bytes": total,
+                "seconds": round(elapsed, 2),
+                "mib_per_second": round(total / 2**20 / elapsed, 1)
+                if elapsed
+                else None,
+                "indicators_found": len(indicators),
+                "hits": sum(i["count"] for i in indicators.values()),
+            },
+        }
+
+
+def _unpack(path: str, dest_dir: str) -> List[str]:
+    """
+    Decompress a gzipped dump or extract a dump tarball for mmap.
+
+    Plain files are returned as they are.
+    """
+    name = os.path.basename(path)
+    if name.endswith((".tar.gz", ".tgz")):
+        out_dir = os.path.join(dest_dir, re.sub(r"\.(tar\.gz|tgz)$", "", name))
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        with tarfile.open(path) as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                # Flatten member paths so nothing lands outside out_dir
+                out = os.path.join(out_dir, member.name.replace("/", "_"))
+                with tar.extractfile(member) as src, open(out, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                paths.append(out)
+        return paths
+    if name.endswith(".gz"):
+        out = os.path.join(dest_dir, name[: -len(".gz")])
+        with gzip.open(path, "rb") as src, open(out, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        return [out]
+    return [path]
+
+
+def prepare_dumps(paths: List[str], dest_dir: str, workers: int = 4) -> List[str]:
+    """
+    Unpack compressed dumps in parallel.
+
+    Args:
+        paths: Dump files, gzipped dumps or dump tarballs
+        dest_dir: Directory for unpacked files
+        workers: Concurrent decompressions
+
+    Returns:
+        Paths of the files to scan
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        unpacked = executor.map(lambda p: _unpack(p, dest_dir), paths)
+        return [path for group in unpacked for path in group]
+
+
+def download_dumps(
+    incident_id: str,
+    dest_dir: str,
+    bucket: str = "incident-evidence",
+    workers: int = 8,
+) -> List[str]:
+    """
+    Download an incident's memory dumps from the evidence bucket.
+
+    Covers the streamed fleet artifacts under <instance>/memory/ and the
+    dump tarballs of single-instance acquisitions.
+
+    Args:
+        incident_id: Incident whose dumps to download
+        dest_dir: Local directory for the files
+        bucket: Evidence bucket
+        workers: Concurrent downloads
+
+    Returns:
+        Local paths of the downloaded files
+    """
+    s3 = boto3.client("s3")
+    keys = [
+        obj["Key"]
+        for page in s3.get_paginator("list_objects_v2").paginate(
+            Bucket=bucket, Prefix=f"{incident_id}/"
+        )
+        for obj in page.get("Contents", [])
+        if ("/memory/" in obj["Key"] and obj["Key"].endswith(".gz"))
+        or os.path.basename(obj["Key"]).startswith(DUMP_PREFIXES)
+    ]
+    logger.info(f"Downloading {len(keys)} dumps from s3://{bucket}/{incident_id}/")
+
+    def download(key: str) -> str:
+        path = os.path.join(dest_dir, key.replace("/", "_"))
+        s3.download_file(bucket, key, path)
+        return path
+
+    os.makedirs(dest_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sorted(executor.map(download, keys))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Scan memory dumps for IOCs")
+    parser.add_argument(
+        "--iocs", help='IOC list, one "<value>" or "<type>:<value>" per line'
+    )
+    parser.add_argument(
+        "--ioc", action="append", default=[], help="Single IOC (repeatable)"
+    )
+    parser.add_argument("--dumps", nargs="*", default=[], help="Local dump files")
+    parser.add_argument(
+        "--incident-id", help="Download this incident's memory dumps from S3 first"
+    )
+    parser.add_argument(
+        "--bucket", default="incident-evidence", help="Evidence bucket to download from"
+    )
+    parser.add_argument(
+        "--download-dir",
+        default="./incident-memory",
+        help="Directory for downloaded and unpacked dumps",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE // 2**20,
+        help="MiB scanned per task",
+    )
+    parser.add_argument(
+        "--max-hits",
+        type=int,
+        default=DEFAULT_MAX_HITS,
+        help="Hits with offsets kept per indicator and file",
+    )
+
+    args = parser.parse_args()
+
+    indicators = load_indicators(args.iocs) if args.iocs else []
+    indicators += [parse_indicator(value) for value in args.ioc]
+    indicators = [i for i in dict.fromkeys(indicators) if i is not None]
+    if not indicators:
+        parser.error("no indicators given (use --iocs or --ioc)")
+
+    paths = list(args.dumps)
+    if args.incident_id:
+        paths += download_dumps(args.incident_id, args.download_dir, args.bucket)
+    if not paths:
+        parser.error("no dumps given (use --dumps or --incident-id)")
+    paths = prepare_dumps(paths, os.path.join(args.download_dir, "unpacked"))
+
+    scanner = IOCScanner(indicators, args.chunk_size * 2**20, args.max_hits)
+    results = scanner.scan_files(paths, args.workers)
+
+    print(json.dumps(results, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,34 +7,113 @@ Lambda function memory for forensic investigation.
 
 Usage:
     python3 memory-dump.py --incident-id INCIDENT123 --instance-ids i-1234567
+    python3 memory-dump.py --incident-id INCIDENT123 --instance-ids i-1,i-2 --fleet
 """
 
 import argparse
 import json
 import boto3
 import logging
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional
 
+from botocore.exceptions import ClientError
+
+from resource_inventory import DEFAULT_INVENTORY_TTL, ResourceInventory
+from ssm_commands import (
+    INSTANCE_ID_SHELL,
+    SSMCommandDispatcher,
+    SSMResultCollector,
+)
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Shell function for streaming acquisition: stdin is gzipped straight into
+# a multipart S3 upload (aws s3 cp -), while FIFOs feed the raw and the
+# compressed bytes to sha256sum on the way. Reports each artifact as
+# "### artifact <name> <sha256> <gzip sha256> <upload exit code>".
+STREAM_FUNCTION = [
+    "stream() {",
+    '  name="$1"',
+    '  size="${2:+--expected-size $2}"',
+    "  rm -f raw.fifo gz.fifo",
+    "  mkfifo raw.fifo gz.fifo",
+    "  sha256sum < raw.fifo > raw.sha &",
+    "  sha256sum < gz.fifo > gz.sha &",
+    "  tee raw.fifo | gzip -c | tee gz.fifo | "
+    'aws s3 cp --only-show-errors $size - "$DEST/$name.gz"',
+    "  rc=$?",
+    "  wait",
+    '  line="$name $(cut -d" " -f1 raw.sha) $(cut -d" " -f1 gz.sha) $rc"',
+    '  echo "$line" >> hashes.txt',
+    '  echo "### artifact $line"',
+    "  rm -f raw.fifo gz.fifo raw.sha gz.sha",
+    "}",
+]
+
+# CloudWatch Logs Insights queries at most 50 log groups at once
+INSIGHTS_MAX_LOG_GROUPS = 50
+INSIGHTS_RUNNING_STATES = {"Scheduled", "Running"}
+
+# Per-function memory and duration stats from Lambda REPORT lines. Log
+# streams in a custom (possibly shared) log group are named
+# YYYY/MM/DD/<function>[<version>]<id>; default groups leave the name out
+LAMBDA_PROFILE_QUERY = r"""
+filter @type = "REPORT"
+| parse @logStream /^\d+\/\d+\/\d+\/(?<function_name>[^\[]*)\[/
+| stats max(@maxMemoryUsed) as peak_memory,
+        avg(@maxMemoryUsed) as avg_memory,
+        avg(@duration) as avg_duration,
+        max(@duration) as max_duration,
+        count(@initDuration) as cold_starts,
+        count() as invocations
+  by @log, function_name
+"""
+LAMBDA_PROFILE_FIELDS = (
+    "peak_memory",
+    "avg_memory",
+    "avg_duration",
+    "max_duration",
+    "cold_starts",
+    "invocations",
+)
+
+ARTIFACT_MARKER = "### artifact "
+SKIPPED_MARKER = "### skipped "
+
+# get_command_invocation returns at most this many characters of stdout
+SSM_OUTPUT_LIMIT = 24000
+
 
 class MemoryDumpManager:
     """Manages memory dump collection for forensics."""
 
-    def __init__(self, incident_id: str):
+    def __init__(
+        self,
+        incident_id: str,
+        inventory: Optional[ResourceInventory] = None,
+        collector: Optional[SSMResultCollector] = None,
+        dispatcher: Optional[SSMCommandDispatcher] = None,
+        max_workers: int = 10,
+    ):
         """Initialize memory dump manager."""
         self.incident_id = incident_id
+        self.max_workers = max_workers
         self.timestamp = datetime.utcnow().isoformat()
+        self.inventory = inventory or ResourceInventory(incident_id)
+        self.collector = collector or SSMResultCollector()
+        self.dispatcher = dispatcher or SSMCommandDispatcher()
 
         # Initialize AWS clients
-        self.ec2 = boto3.client("ec2")
         self.ssm = boto3.client("ssm")
         self.lambda_client = boto3.client("lambda")
         self.cloudwatch = boto3.client("logs")
+        self.s3 = boto3.client("s3")
 
         self.dumps: Dict[str, List] = {
             "ec2_memory": [],
@@ -55,9 +134,10 @@ class MemoryDumpManager:
         logger.info(f"Dumping memory from EC2 instance {instance_id}")
 
         try:
-            # Verify instance exists and is running
-            response = self.ec2.describe_instances(InstanceIds=[instance_id])
-            instance = response["Reservations"][0]["Instances"][0]
+            # Verify instance exists and is running, from a live describe
+            instance = self.inventory.refresh_instances([instance_id]).get(instance_id)
+            if instance is None:
+                raise ValueError(f"Instance {instance_id} not found")
             state = instance["State"]["Name"]
 
             if state != "running":
@@ -95,7 +175,7 @@ class MemoryDumpManager:
             response = self.ssm.send_command(
                 InstanceIds=[instance_id],
                 DocumentName="AWS-RunShellScript",
-                Parameters={"command": commands},
+                Parameters={"commands": commands},
             )
 
             dump_info = {
@@ -115,12 +195,124 @@ class MemoryDumpManager:
             logger.error(f"Error dumping EC2 memory: {e}")
             return {"status": "error", "instance_id": instance_id, "error": str(e)}
 
-    def dump_lambda_memory(self, function_names: List[str]) -> Dict:
+    def _lambda_configs(self, function_names: List[str]) -> Dict[str, Dict]:
+        """Fetch function configurations concurrently, keyed by function name."""
+
+        def fetch(func_name: str) -> Dict:
+            try:
+                return self.lambda_client.get_function(FunctionName=func_name)[
+                    "Configuration"
+                ]
+            except Exception as e:
+                logger.error(f"Error capturing Lambda memory: {e}")
+                return {"error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(function_names, executor.map(fetch, function_names)))
+
+    def _start_lambda_queries(
+        self, log_groups: List[str], start: datetime, end: datetime
+    ) -> List[Dict]:
+        """Start one profiling query per batch of up to 50 log groups."""
+        queries = []
+        for i in range(0, len(log_groups), INSIGHTS_MAX_LOG_GROUPS):
+            batch = log_groups[i : i + INSIGHTS_MAX_LOG_GROUPS]
+            try:
+                response = self.cloudwatch.start_query(
+                    logGroupNames=batch,
+                    startTime=int(start.timestamp()),
+                    endTime=int(end.timestamp()),
+                    queryString=LAMBDA_PROFILE_QUERY,
+                )
+                queries.append({"query_id": response["queryId"], "log_groups": batch})
+            except Exception as e:
+                logger.warning(
+                    f"Error querying CloudWatch for {len(batch)} groups: {e}"
+                )
+                queries.append({"query_id": None, "log_groups": batch, "error": str(e)})
+        return queries
+
+    def _poll_queries(self, queries: List[Dict], timeout: Optional[float]) -> None:
+        """
+        Poll Insights queries until they finish or time runs out.
+
+        Each query gets its final "status" and, once complete, "rows"
+        keyed by (log group name, function name or "").
+        """
+        started = time.time()
+        interval = 1.0
+        pending = [q for q in queries if q["query_id"]]
+
+        while pending:
+            still_pending = []
+            for query in pending:
+                try:
+                    response = self.cloudwatch.get_query_results(
+                        queryId=query["query_id"]
+                    )
+                except ClientError as e:
+                    if e.response.get("Error", {}).get("Code") == "ThrottlingException":
+                        still_pending.append(query)
+                        continue
+                    logger.warning(f"Error polling query {query['query_id']}: {e}")
+                    query["status"] = "Failed"
+                    continue
+
+                query["status"] = response["status"]
+                if response["status"] in INSIGHTS_RUNNING_STATES:
+                    still_pending.append(query)
+                elif response["status"] == "Complete":
+                    query["rows"] = {}
+                    for row in response["results"]:
+                        fields = {f["field"]: f["value"] for f in row}
+                        # @log is "<account id>:<log group name>"
+                        log_group = fields.pop("@log", "").split(":", 1)[-1]
+                        function_name = fields.pop("function_name", None) or ""
+                        query["rows"][(log_group, function_name)] = fields
+
+            pending = still_pending
+            if not pending or (
+                timeout is not None and time.time() - started >= timeout
+            ):
+                break
+            time.sleep(interval)
+            interval = min(10.0, interval * 2)
+
+        if pending:
+            logger.warning(f"{len(pending)} CloudWatch queries still running")
+
+    @staticmethod
+    def _lambda_stats(fields: Dict) -> Dict:
+        """Convert one stats row into numbers."""
+        stats = {}
+        for name in LAMBDA_PROFILE_FIELDS:
+            value = fields.get(name)
+            stats[name] = float(value) if value not in (None, "") else None
+        stats["invocations"] = int(stats["invocations"] or 0)
+        stats["cold_starts"] = int(stats["cold_starts"] or 0)
+        return stats
+
+    def dump_lambda_memory(
+        self,
+        function_names: List[str],
+        hours: float = 1.0,
+        timeout: Optional[float] = None,
+    ) -> Dict:
         """
         Capture Lambda function execution context and memory usage.
 
+        Configurations are fetched concurrently. Memory and duration stats
+        come from the REPORT lines in each function's log group (from its
+        LoggingConfig): one Insights query covers up to 50 log groups,
+        grouped by log group and by the function named in the log stream,
+        so functions sharing a log group are told apart and hundreds of
+        functions need only a handful of queries.
+
         Args:
             function_names: List of Lambda function names
+            hours: Hours of logs to profile
+            timeout: Maximum seconds to wait for the queries
+                (poll once if 0, until they finish if None)
 
         Returns:
             Dictionary with Lambda memory dump results
@@ -129,65 +321,89 @@ class MemoryDumpManager:
             f"Capturing memory dumps from {len(function_names)} Lambda functions"
         )
 
-        dumps = []
-
-        for func_name in function_names:
-            try:
-                logger.info(f"Capturing memory from {func_name}")
-
-                # Get function configuration
-                func_config = self.lambda_client.get_function(FunctionName=func_name)
-                func_info = func_config["Configuration"]
-
-                # Get recent invocations from CloudWatch
-                log_group = f"/aws/lambda/{func_name}"
-
-                try:
-                    # Query for recent executions
-                    query = """
-                    fields @timestamp, @duration, @maxMemoryUsed, @memorySize, @initDuration
-                    | stats max(@maxMemoryUsed) as peak_memory,
-                             avg(@duration) as avg_duration,
-                             max(@duration) as max_duration,
-                             count() as invocations
-                    """
-
-                    response = self.cloudwatch.start_query(
-                        logGroupName=log_group,
-                        startTime=int((datetime.utcnow().timestamp() - 3600)),
-                        endTime=int(datetime.utcnow().timestamp()),
-                        queryString=query,
-                    )
+        function_names = list(dict.fromkeys(function_names))
+        configs = self._lambda_configs(function_names)
+        found = [name for name in function_names if "error" not in configs[name]]
+        log_groups = {
+            name: (configs[name].get("LoggingConfig") or {}).get("LogGroup")
+            or f"/aws/lambda/{configs[name].get('FunctionName', name)}"
+            for name in found
+        }
 
-                    dump_info = {
-                        "status": "captured",
-                        "function_name": func_name,
-                        "configured_memory": func_info.get("MemorySize"),
-                        "handler": func_info.get("Handler"),
-                        "runtime": func_info.get("Runtime"),
-                        "timeout": func_info.get("Timeout"),
-                        "query_id": response["queryId"],
-                    }
+        # Querying a missing log group fails the whole batch, and functions
+        # that never ran have none
+        try:
+            existing = set(self.inventory.log_group_names())
+        except Exception as e:
+            logger.warning(f"Error listing log groups: {e}")
+            existing = set(log_groups.values())
+
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(hours=hours)
+        queries = self._start_lambda_queries(
+            [lg for lg in dict.fromkeys(log_groups.values()) if lg in existing],
+            start,
+            end,
+        )
+        self._poll_queries(queries, timeout)
+        query_for = {lg: q for q in queries for lg in q["log_groups"]}
 
-                except Exception as e:
-                    logger.warning(f"Error querying CloudWatch for {func_name}: {e}")
-                    dump_info = {
-                        "status": "partial",
+        dumps = []
+        for func_name in function_names:
+            func_info = configs[func_name]
+            if "error" in func_info:
+                dumps.append(
+                    {
                         "function_name": func_name,
-                        "configured_memory": func_info.get("MemorySize"),
-                        "warning": "CloudWatch query failed",
+                        "status": "error",
+                        "error": func_info["error"],
                     }
+                )
+                continue
 
-                self.dumps["lambda_memory"].append(dump_info)
-                dumps.append(dump_info)
+            dump_info = {
+                "status": "captured",
+                "function_name": func_name,
+                "configured_memory": func_info.get("MemorySize"),
+                "handler": func_info.get("Handler"),
+                "runtime": func_info.get("Runtime"),
+                "timeout": func_info.get("Timeout"),
+                "window_start": start.isoformat(),
+                "window_end": end.isoformat(),
+            }
 
-            except Exception as e:
-                logger.error(f"Error capturing Lambda memory: {e}")
-                dumps.append(
-                    {"function_name": func_name, "status": "error", "error": str(e)}
+            query = query_for.get(log_groups[func_name])
+            if query is None:
+                dump_info["status"] = "partial"
+                dump_info["warning"] = "No log group"
+            elif query.get("status") != "Complete":
+                dump_info["status"] = "partial"
+                dump_info["query_id"] = query["query_id"]
+                dump_info["warning"] = (
+                    f"CloudWatch query {query.get('status', 'failed').lower()}"
                 )
-
-        return {"status": "success", "functions_captured": len(dumps), "dumps": dumps}
+            else:
+                # Default log groups hold one function and name none in
+                # their streams
+                log_group = log_groups[func_name]
+                rows = query["rows"]
+                fields = rows.get(
+                    (log_group, func_info.get("FunctionName", func_name)),
+                    rows.get((log_group, ""), {}),
+                )
+                dump_info["query_id"] = query["query_id"]
+                dump_info["log_group"] = log_group
+                dump_info.update(self._lambda_stats(fields))
+
+            self.dumps["lambda_memory"].append(dump_info)
+            dumps.append(dump_info)
+
+        return {
+            "status": "success",
+            "functions_captured": len(dumps),
+            "queries": len(queries),
+            "dumps": dumps,
+        }
 
     def dump_process_memory(self, instance_id: str, process_names: List[str]) -> Dict:
         """
@@ -241,7 +457,7 @@ class MemoryDumpManager:
             response = self.ssm.send_command(
                 InstanceIds=[instance_id],
                 DocumentName="AWS-RunShellScript",
-                Parameters={"command": commands},
+                Parameters={"commands": commands},
             )
 
             dump_info = {
@@ -260,8 +476,252 @@ class MemoryDumpManager:
             logger.error(f"Error dumping process memory: {e}")
             return {"status": "error", "instance_id": instance_id, "error": str(e)}
 
+    def _streaming_dump_commands(
+        self, process_names: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Shell lines for a streaming memory acquisition on one host.
+
+        Artifacts are never written to disk: text artifacts and physical
+        memory (when avml is installed) are piped straight to S3, and each
+        gcore core is staged in /dev/shm (RAM) only until it is streamed.
+        Processes whose virtual size would not fit in the free /dev/shm
+        space are skipped, since gcore writes every readable mapping.
+        """
+        if process_names:
+            pids = " ".join(f"$(pgrep {name})" for name in process_names)
+        else:
+            pids = "$(pgrep -u root | head -20)"
+
+        return INSTANCE_ID_SHELL + [
+            f"DEST=s3://incident-evidence/{self.incident_id}/$INSTANCE_ID/memory",
+            f"WORK=/dev/shm/forensics-{self.incident_id}",
+            'mkdir -p "$WORK" && cd "$WORK" || exit 1',
+            ": > hashes.txt",
+            *STREAM_FUNCTION,
+            "ps auxww | stream processes.txt",
+            "dmesg | stream kernel-messages.log",
+            "cat /proc/meminfo | stream meminfo.txt",
+            "cat /proc/slabinfo 2>/dev/null | stream slabinfo.txt",
+            # avml writes LiME format sequentially, so it can write to a pipe
+            "if command -v avml >/dev/null 2>&1; then",
+            "  avml /dev/stdout | stream physical-memory.lime "
+            "$(awk '/MemTotal/ {print $2 * 1024}' /proc/meminfo)",
+            "fi",
+            f'for pid in $(echo {pids} | tr " " "\\n" | sort -un); do',
+            "  for f in maps status; do",
+            '    cat "/proc/$pid/$f" 2>/dev/null | stream "$f-$pid.txt"',
+            "  done",
+            '  tr "\\0" "\\n" 2>/dev/null < "/proc/$pid/environ" | stream "environ-$pid.txt"',
+            '  ls -la "/proc/$pid/fd" 2>&1 | stream "files-$pid.txt"',
+            "  vsz=$(awk '/VmSize/ {print $2}' \"/proc/$pid/status\" 2>/dev/null)",
+            "  avail=$(df -k --output=avail /dev/shm | tail -1)",
+            '  if [ -z "$vsz" ] || [ "$vsz" -gt "$avail" ]; then',
+            '    echo "### skipped core-$pid"',
+            "    continue",
+            "  fi",
+            '  if gcore -o core "$pid" >/dev/null 2>&1; then',
+            '    stream "core-$pid" "$(stat -c %s "core.$pid")" < "core.$pid"',
+            "  fi",
+            '  rm -f "core.$pid"',
+            "done",
+            'aws s3 cp --only-show-errors hashes.txt "$DEST/hashes.txt"',
+            'cd / && rm -rf "$WORK"',
+        ]
+
+    def dump_fleet(
+        self,
+        instance_ids: List[str],
+        process_names: Optional[List[str]] = None,
+        max_in_flight: str = "10",
+        timeout_seconds: int = 7200,
+    ) -> Dict:
+        """
+        Acquire memory from many instances at once with streaming uploads.
+
+        One batched SSM command covers the fleet; SSM's MaxConcurrency caps
+        how many hosts acquire at the same time. Every artifact is gzipped
+        into a multipart S3 upload as it is read, and its SHA-256 (raw and
+        compressed) is computed on the way; collect_results() adds the
+        hashes to the manifest.
+
+        Args:
+            instance_ids: EC2 instance IDs
+            process_names: Processes to core dump (root processes if None)
+            max_in_flight: Hosts acquiring at once (count or percentage)
+            timeout_seconds: Execution timeout per host
+
+        Returns:
+            Dictionary with dispatch results
+        """
+        logger.info(
+            f"Streaming memory acquisition from {len(instance_ids)} instances, "
+            f"{max_in_flight} at a time"
+        )
+
+        try:
+            # Instance states from a live describe, not the inventory cache
+            instances = self.inventory.refresh_instances(instance_ids)
+            running, skipped = [], []
+            for instance_id in instance_ids:
+                instance = instances.get(instance_id)
+                state = instance["State"]["Name"] if instance else "not found"
+                if state == "running":
+                    running.append(instance_id)
+                else:
+                    skipped.append(
+                        {
+                            "status": "skipped",
+                            "instance_id": instance_id,
+                            "reason": f"Instance state is {state}",
+                        }
+                    )
+
+            result = self.dispatcher.send(
+                self._streaming_dump_commands(process_names),
+                instance_ids=running,
+                comment=f"{self.incident_id} memory acquisition",
+                timeout_seconds=timeout_seconds,
+                max_concurrency=max_in_flight,
+            )
+
+            dumps = []
+            for instance_id, command_id in result["instance_commands"].items():
+                instance = instances[instance_id]
+                dump_info = {
+                    "status": "initiated",
+                    "mode": "streaming",
+                    "instance_id": instance_id,
+                    "command_id": command_id,
+                    "instance_type": instance.get("InstanceType"),
+                    "private_ip": instance.get("PrivateIpAddress"),
+                    "processes": process_names,
+                    "evidence": f"s3://incident-evidence/{self.incident_id}/{instance_id}/memory/",
+                    "initiated_time": datetime.utcnow().isoformat(),
+                }
+                self.dumps["ec2_memory"].append(dump_info)
+                dumps.append(dump_info)
+
+            return {
+                "status": "success",
+                "instances": len(dumps),
+                "dumps": dumps + skipped,
+                "commands": result["commands"],
+                "errors": result["errors"],
+            }
+
+        except Exception as e:
+            logger.error(f"Error starting fleet memory acquisition: {e}")
+            return {"status": "error", "error": str(e)}
+
+    def _read_hashes(self, instance_id: str) -> Optional[List[str]]:
+        """Lines of the hashes.txt a streaming acquisition uploaded, if any."""
+        try:
+            response = self.s3.get_object(
+                Bucket="incident-evidence",
+                Key=f"{self.incident_id}/{instance_id}/memory/hashes.txt",
+            )
+            return response["Body"].read().decode("utf-8", "replace").splitlines()
+        except Exception as e:
+            logger.warning(f"Could not read hashes.txt of {instance_id}: {e}")
+            return None
+
+    def _artifacts(self, instance_id: str, stdout: str) -> Dict:
+        """
+        Streamed artifacts and skipped cores of one acquisition.
+
+        Artifacts come from the uploaded hashes.txt, since SSM truncates
+        command output; the artifact lines in stdout are only used when
+        hashes.txt cannot be read. Skipped cores are only reported in
+        stdout, so output_truncated flags lists that may be incomplete.
+        """
+        lines = stdout.splitlines()
+        hashes = self._read_hashes(instance_id)
+        if hashes is None:
+            hashes = [
+                line[len(ARTIFACT_MARKER) :]
+                for line in lines
+                if line.startswith(ARTIFACT_MARKER)
+            ]
+
+        artifacts = []
+        for line in hashes:
+            fields = line.split()
+            if len(fields) != 4:
+                continue
+            name, sha256, gzip_sha256, code = fields
+            artifacts.append(
+                {
+                    "name": name,
+                    "s3_uri": f"s3://incident-evidence/{self.incident_id}/{instance_id}/memory/{name}.gz",
+                    "sha256": sha256,
+                    "gzip_sha256": gzip_sha256,
+                    "uploaded": code == "0",
+                }
+            )
+
+        skipped = [
+            line[len(SKIPPED_MARKER) :].strip()
+            for line in lines
+            if line.startswith(SKIPPED_MARKER)
+        ]
+        return {
+            "artifacts": artifacts,
+            "skipped": skipped,
+            "output_truncated": len(stdout) >= SSM_OUTPUT_LIMIT,
+        }
+
+    def collect_results(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Collect the output of the dump commands sent so far.
+
+        Each EC2 and process dump entry gets the command's result and its
+        status becomes "pending" or "done".
+
+        Args:
+            timeout: Maximum seconds to wait for running commands
+                (poll once if 0, no limit if None)
+
+        Returns:
+            Dictionary with collection status and summary
+        """
+        entries = [
+            entry
+            for kind in ("ec2_memory", "process_dumps")
+            for entry in self.dumps[kind]
+            if entry.get("command_id")
+        ]
+        try:
+            collected = self.collector.collect(
+                [e["command_id"] for e in entries], timeout=timeout
+            )
+        except Exception as e:
+            logger.error(f"Error collecting dump results: {e}")
+            return {"status": "error", "error": str(e)}
+
+        for entry in entries:
+            result = (
+                collected["results"]
+                .get(entry["instance_id"], {})
+                .get(entry["command_id"])
+            )
+            if result is not None:
+                entry["result"] = result
+                entry["status"] = "pending" if result["pending"] else "done"
+                if entry.get("mode") == "streaming" and not result["pending"]:
+                    entry.update(
+                        self._artifacts(entry["instance_id"], result.get("stdout", ""))
+                    )
+
+        return {
+            "status": "success",
+            "summary": collected["summary"],
+            "timed_out": collected["timed_out"],
+        }
+
     def create_dump_manifest(self) -> Dict:
         """Create manifest of all memory dumps."""
+        ssm_dumps = self.dumps["ec2_memory"] + self.dumps["process_dumps"]
         manifest = {
             "incident_id": self.incident_id,
             "manifest_time": datetime.utcnow().isoformat(),
@@ -270,6 +730,11 @@ class MemoryDumpManager:
                 "ec2_instances_dumped": len(self.dumps["ec2_memory"]),
                 "lambda_functions_dumped": len(self.dumps["lambda_memory"]),
                 "processes_dumped": len(self.dumps["process_dumps"]),
+                "dumps_done": sum(d["status"] == "done" for d in ssm_dumps),
+                "dumps_pending": sum(
+                    d["status"] in ("initiated", "pending") for d in ssm_dumps
+                ),
+                "artifacts_hashed": sum(len(d.get("artifacts", [])) for d in ssm_dumps),
             },
         }
 
@@ -280,6 +745,10 @@ class MemoryDumpManager:
         instance_ids: Optional[List[str]] = None,
         function_names: Optional[List[str]] = None,
         process_names: Optional[List[str]] = None,
+        collect_timeout: Optional[float] = None,
+        fleet: bool = False,
+        max_in_flight: str = "10",
+        lambda_hours: float = 1.0,
     ) -> Dict:
         """
         Collect all memory dumps.
@@ -288,6 +757,12 @@ class MemoryDumpManager:
             instance_ids: EC2 instances to dump
             function_names: Lambda functions to dump
             process_names: Specific processes to dump (on all instances)
+            collect_timeout: If set, wait up to this many seconds for dump
+                command output and add it to the manifest
+            fleet: Acquire from all instances at once with streaming uploads
+                (see dump_fleet) instead of one instance at a time
+            max_in_flight: Hosts acquiring at once in fleet mode
+            lambda_hours: Hours of Lambda logs to profile
 
         Returns:
             Dictionary with all dump results
@@ -300,7 +775,11 @@ class MemoryDumpManager:
             "dumps": {},
         }
 
-        if instance_ids:
+        if instance_ids and fleet:
+            results["dumps"]["ec2_memory"] = self.dump_fleet(
+                instance_ids, process_names, max_in_flight
+            )
+        elif instance_ids:
             results["dumps"]["ec2_memory"] = []
             for iid in instance_ids:
                 results["dumps"]["ec2_memory"].append(self.dump_ec2_memory(iid))
@@ -314,7 +793,14 @@ class MemoryDumpManager:
                     )
 
         if function_names:
-            results["dumps"]["lambda_memory"] = self.dump_lambda_memory(function_names)
+            results["dumps"]["lambda_memory"] = self.dump_lambda_memory(
+                function_names,
+                hours=lambda_hours,
+                timeout=collect_timeout,
+            )
+
+        if collect_timeout is not None and instance_ids:
+            results["collection"] = self.collect_results(collect_timeout)
 
         # Create manifest
         results["manifest"] = self.create_dump_manifest()
@@ -334,6 +820,38 @@ def main():
         "--function-names", help="Comma-separated Lambda function names"
     )
     parser.add_argument("--process-names", help="Comma-separated process names to dump")
+    parser.add_argument(
+        "--lambda-hours",
+        type=float,
+        default=1.0,
+        help="Hours of Lambda logs to profile for memory usage",
+    )
+    parser.add_argument(
+        "--fleet",
+        action="store_true",
+        help="Acquire from all instances at once, streaming dumps to S3",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        default="10",
+        help="Hosts acquiring at once with --fleet (count or percentage)",
+    )
+    parser.add_argument(
+        "--collect-timeout",
+        type=float,
+        help="Wait up to this many seconds for dump command output (0 polls once)",
+    )
+    parser.add_argument(
+        "--inventory-dir",
+        default="./incident-inventory",
+        help="Resource inventory cache shared by the forensics scripts",
+    )
+    parser.add_argument(
+        "--inventory-ttl",
+        type=float,
+        default=DEFAULT_INVENTORY_TTL,
+        help="Seconds cached inventory stays valid",
+    )
 
     args = parser.parse_args()
 
@@ -343,8 +861,19 @@ def main():
     process_names = args.process_names.split(",") if args.process_names else None
 
     # Run dump
-    manager = MemoryDumpManager(args.incident_id)
-    results = manager.dump_all(instance_ids, function_names, process_names)
+    inventory = ResourceInventory(
+        args.incident_id, args.inventory_dir, args.inventory_ttl
+    )
+    manager = MemoryDumpManager(args.incident_id, inventory)
+    results = manager.dump_all(
+        instance_ids,
+        function_names,
+        process_names,
+        args.collect_timeout,
+        args.fleet,
+        args.max_in_flight,
+        args.lambda_hours,
+    )
 
     # Print results
     print(json.dumps(results, indent=2, default=str))
@@ -11,29 +11,71 @@ Usage:
 
 import argparse
 import json
-import boto3
 import logging
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from connection_analysis import ConnectionAnalyzer, snapshot_commands
+from flow_log_analytics import (
+    FlowLogAnalytics,
+    FlowLogLoader,
+    FlowLogTable,
+    fields_from_format,
+)
+from resource_inventory import DEFAULT_INVENTORY_TTL, ResourceInventory
+from ssm_commands import (
+    INSTANCE_ID_SHELL,
+    SSMCommandDispatcher,
+    SSMResultCollector,
+    parse_targets,
+)
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# -z hook for rotating captures: claims a finished chunk, uploads it
+# (aws s3 cp switches to concurrent multipart above 8 MB), deletes it and
+# appends it to the chunk index. Runs with CHUNK_DIR and CHUNK_DEST exported.
+CHUNK_UPLOAD_SCRIPT = [
+    "#!/bin/sh",
+    'f="$1"',
+    'mv "$f" "$f.up" 2>/dev/null || exit 0',
+    'name=$(basename "$f")',
+    'size=$(stat -c %s "$f.up")',
+    'sha=$(sha256sum "$f.up" | cut -d" " -f1)',
+    'aws s3 cp --only-show-errors "$f.up" "$CHUNK_DEST/$name" || exit 1',
+    'rm -f "$f.up"',
+    'line=$(printf \'{"chunk": "%s", "bytes": %s, "sha256": "%s", '
+    '"uploaded": "%s"}\' "$name" "$size" "$sha" "$(date -u +%FT%TZ)")',
+    '( flock 9; echo "$line" >> "$CHUNK_DIR/index.jsonl"; '
+    'aws s3 cp --only-show-errors "$CHUNK_DIR/index.jsonl" "$CHUNK_DEST/index.jsonl" '
+    ') 9>"$CHUNK_DIR/index.lock"',
+]
+
 
 class NetworkCaptureManager:
     """Manages network traffic capture for forensics."""
 
-    def __init__(self, incident_id: str):
+    def __init__(
+        self,
+        incident_id: str,
+        inventory: Optional[ResourceInventory] = None,
+        dispatcher: Optional[SSMCommandDispatcher] = None,
+        collector: Optional[SSMResultCollector] = None,
+        flow_loader: Optional[FlowLogLoader] = None,
+    ):
         """Initialize network capture manager."""
         self.incident_id = incident_id
         self.timestamp = datetime.utcnow().isoformat()
-
-        # Initialize AWS clients
-        self.ec2 = boto3.client("ec2")
-        self.ssm = boto3.client("ssm")
-        self.cloudwatch = boto3.client("logs")
+        self.inventory = inventory or ResourceInventory(incident_id)
+        self.dispatcher = dispatcher or SSMCommandDispatcher()
+        self.collector = collector or SSMResultCollector()
+        self.flow_loader = flow_loader or FlowLogLoader()
 
         self.captures: Dict[str, List] = {
             "packet_captures": [],
@@ -42,6 +84,220 @@ class NetworkCaptureManager:
             "connections": [],
         }
 
+        # SSM commands sent, and the command ID per instance and purpose
+        self.commands: List[Dict] = []
+        self.instance_commands: Dict[str, Dict[str, str]] = {}
+
+        # Collected command output per instance and purpose
+        self.results: Dict[str, Dict[str, Dict]] = {}
+
+        # Capture kinds are dispatched from concurrent threads
+        self._lock = threading.Lock()
+
+    def _dispatch(
+        self,
+        purpose: str,
+        commands: List[str],
+        instance_ids: List[str],
+        targets: Optional[List[Dict]] = None,
+        timeout_seconds: Optional[int] = None,
+        start_at: Optional[float] = None,
+    ) -> Dict:
+        """
+        Send one script to many instances and record the command IDs.
+
+        With start_at, every host must be running the script before that
+        time, so SSM's rate control is lifted (MaxConcurrency 100%) and the
+        wait is added to the execution timeout.
+
+        Returns:
+            Per-instance entries (command ID or error) and the commands sent
+        """
+        # The cache only screens out unknown IDs; instances that stopped since
+        # it was written are left to SSM, which reports them as undeliverable
+        known = [i for i in instance_ids if self.inventory.instance(i) is not None]
+        result = self.dispatcher.send(
+            commands,
+            instance_ids=known,
+            targets=targets,
+            comment=f"{self.incident_id} {purpose}",
+            timeout_seconds=(
+                timeout_seconds + max(0, int(start_at - time.time()))
+                if timeout_seconds and start_at
+                else timeout_seconds
+            ),
+            max_concurrency="100%" if start_at else None,
+        )
+
+        with self._lock:
+            for command in result["commands"]:
+                self.commands.append({"purpose": purpose, **command})
+            for instance_id, command_id in result["instance_commands"].items():
+                self.instance_commands.setdefault(instance_id, {})[purpose] = command_id
+
+        entries = [
+            {"instance_id": i, "command_id": c, "status": "initiated"}
+            for i, c in result["instance_commands"].items()
+        ]
+        entries.extend(
+            {"instance_id": i, "error": f"Instance {i} not found"}
+            for i in instance_ids
+            if i not in known
+        )
+        entries.extend(
+            {"instance_id": i, "error": error["error"]}
+            for error in result["errors"]
+            for i in error.get("instance_ids", [])
+        )
+        return {
+            "entries": entries,
+            "commands": result["commands"],
+            "target_errors": [e for e in result["errors"] if "targets" in e],
+        }
+
+    @staticmethod
+    def _wait_until(start_at: Optional[float]) -> List[str]:
+        """Shell lines that sleep until start_at (epoch seconds), if given."""
+        if start_at is None:
+            return []
+        return [
+            f"WAIT=$(( {int(start_at)} - $(date +%s) ))",
+            'if [ "$WAIT" -gt 0 ]; then sleep "$WAIT"; fi',
+        ]
+
+    def _rotating_capture_commands(
+        self,
+        duration: int,
+        filter_expr: str,
+        rotate_mb: Optional[int],
+        rotate_seconds: Optional[int],
+        start_at: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Shell lines for a tcpdump capture cut into chunks by size or time.
+
+        Each finished chunk is uploaded by the -z hook while the capture
+        continues; chunks left when the capture stops are uploaded at the
+        end, and a final index line marks the capture complete.
+        """
+        chunk_dir = f"/tmp/forensics-chunks-{self.incident_id}"
+        # tcpdump only expands strftime patterns when rotating by time
+        stamp = "-%Y%m%d%H%M%S" if rotate_seconds else ""
+        pcap = f"{chunk_dir}/traffic-{self.incident_id}-$INSTANCE_ID{stamp}.pcap"
+
+        rotation = []
+        if rotate_mb:
+            rotation.append(f"-C {rotate_mb}")
+        if rotate_seconds:
+            rotation.append(f"-G {rotate_seconds}")
+
+        return INSTANCE_ID_SHELL + [
+            f"CHUNK_DIR={chunk_dir}",
+            f"CHUNK_DEST=s3://incident-evidence/{self.incident_id}/$INSTANCE_ID/chunks",
+            "export CHUNK_DIR CHUNK_DEST",
+            'mkdir -p "$CHUNK_DIR"',
+            ': > "$CHUNK_DIR/index.jsonl"',
+            "cat > \"$CHUNK_DIR/upload.sh\" <<'EOF'",
+            *CHUNK_UPLOAD_SCRIPT,
+            "EOF",
+            'chmod +x "$CHUNK_DIR/upload.sh"',
+            *self._wait_until(start_at),
+            # -Z root keeps the -z hook able to use the instance role
+            f"timeout {duration + 10} tcpdump -i any -s0 -Z root "
+            f'{" ".join(rotation)} -z "$CHUNK_DIR/upload.sh" -w {pcap} {filter_expr}',
+            'for f in "$CHUNK_DIR"/traffic-*; do '
+            'case "$f" in *.up) ;; *) "$CHUNK_DIR/upload.sh" "$f" ;; esac; done',
+            # Let in-flight hook uploads finish before marking completion
+            'for i in $(seq 300); do ls "$CHUNK_DIR"/*.up >/dev/null 2>&1 || break; sleep 1; done',
+            'echo \'{"complete": true}\' >> "$CHUNK_DIR/index.jsonl"',
+            'aws s3 cp --only-show-errors "$CHUNK_DIR/index.jsonl" "$CHUNK_DEST/index.jsonl"',
+        ]
+
+    def capture_traffic(
+        self,
+        instance_ids: List[str],
+        duration: int = 300,
+        filter_expr: str = "",
+        targets: Optional[List[Dict]] = None,
+        rotate_mb: Optional[int] = None,
+        rotate_seconds: Optional[int] = None,
+        start_at: Optional[float] = None,
+    ) -> Dict:
+        """
+        Capture network traffic from many instances using tcpdump.
+
+        One send_command call covers up to 50 instances; each host writes
+        its capture under its own instance ID. With rotation, the capture
+        is cut into chunks that are uploaded to <instance>/chunks/ as they
+        finish, listed in chunks/index.jsonl for pcap_analysis.py --follow.
+
+        Args:
+            instance_ids: EC2 instance IDs
+            duration: Capture duration in seconds
+            filter_expr: tcpdump filter expression
+            targets: SSM tag targets to capture from as well
+            rotate_mb: Start a new chunk after this many megabytes
+            rotate_seconds: Start a new chunk after this many seconds
+            start_at: Epoch seconds at which every host starts capturing
+
+        Returns:
+            Dictionary with capture results
+        """
+        rotating = bool(rotate_mb or rotate_seconds)
+        logger.info(
+            f"Capturing network traffic from {len(instance_ids)} instances "
+            f"for {duration}s" + (" in rotating chunks" if rotating else "")
+        )
+
+        try:
+            if rotating:
+                commands = self._rotating_capture_commands(
+                    duration, filter_expr, rotate_mb, rotate_seconds, start_at
+                )
+            else:
+                pcap = f"/tmp/traffic-{self.incident_id}-$INSTANCE_ID.pcap"
+                commands = (
+                    INSTANCE_ID_SHELL
+                    + self._wait_until(start_at)
+                    + [
+                        f"timeout {duration + 10} tcpdump -i any -s0 -w {pcap} {filter_expr}",
+                        f"aws s3 cp {pcap} s3://incident-evidence/{self.incident_id}/$INSTANCE_ID/",
+                    ]
+                )
+            result = self._dispatch(
+                "packet_capture",
+                commands,
+                instance_ids,
+                targets,
+                timeout_seconds=duration + 600,
+                start_at=start_at,
+            )
+
+            for entry in result["entries"]:
+                if "error" not in entry:
+                    capture = {
+                        "instance_id": entry["instance_id"],
+                        "command_id": entry["command_id"],
+                    }
+                    if rotating:
+                        capture["chunk_index"] = (
+                            f"s3://incident-evidence/{self.incident_id}/"
+                            f"{entry['instance_id']}/chunks/index.jsonl"
+                        )
+                    self.captures["packet_captures"].append(capture)
+
+            return {
+                "status": "success",
+                "instances": len(result["entries"]),
+                "captures": result["entries"],
+                "commands": result["commands"],
+                "target_errors": result["target_errors"],
+            }
+
+        except Exception as e:
+            logger.error(f"Error running packet capture: {e}")
+            return {"status": "error", "error": str(e)}
+
     def capture_instance_traffic(
         self, instance_id: str, duration: int = 300, filter_expr: str = ""
     ) -> Dict:
@@ -56,50 +312,61 @@ class NetworkCaptureManager:
         Returns:
             Dictionary with capture results
         """
-        logger.info(f"Capturing network traffic from {instance_id} for {duration}s")
+        result = self.capture_traffic([instance_id], duration, filter_expr)
+        entry = result.get("captures", [{}])[0]
+        if "command_id" not in entry:
+            return {
+                "status": "error",
+                "instance_id": instance_id,
+                "error": entry.get("error", result.get("error")),
+            }
+        return {
+            "status": "success",
+            "instance_id": instance_id,
+            "command_id": entry["command_id"],
+            "message": "Packet capture initiated",
+        }
 
-        try:
-            # Check if instance has SSM agent
-            response = self.ec2.describe_instances(InstanceIds=[instance_id])
-            response["Reservations"][0]["Instances"][0]
-
-            # Build tcpdump command
-
-            # Execute via SSM Session Manager
-            try:
-
-                # Note: This would require interactive terminal in production
-                # Here we use Systems Manager to run the command
-                response = self.ssm.send_command(
-                    InstanceIds=[instance_id],
-                    DocumentName="AWS-RunShellScript",
-                    Parameters={
-                        "command": [
-                            f"timeout {duration + 10} tcpdump -i any -s0 -w /tmp/traffic-{self.incident_id}.pcap {filter_expr}",
-                            f"aws s3 cp /tmp/traffic-{self.incident_id}.pcap s3://incident-evidence/{self.incident_id}/",
-                        ]
-                    },
-                )
+    def _load_flow_log(
+        self, flow_log: Dict, start: datetime, end: datetime
+    ) -> Optional[FlowLogTable]:
+        """Records of one flow log, or None if its destination is not readable."""
+        destination = flow_log.get("LogDestinationType", "cloud-watch-logs")
+        log_format = flow_log.get("LogFormat")
 
-                return {
-                    "status": "success",
-                    "instance_id": instance_id,
-                    "command_id": response["Command"]["CommandId"],
-                    "message": "Packet capture initiated",
-                }
+        if destination == "cloud-watch-logs" and flow_log.get("LogGroupName"):
+            return self.flow_loader.load_cloudwatch(
+                flow_log["LogGroupName"], start, end, log_format
+            )
 
-            except Exception as e:
-                logger.error(f"Error running packet capture: {e}")
-                return {"status": "error", "instance_id": instance_id, "error": str(e)}
+        file_format = flow_log.get("DestinationOptions", {}).get(
+            "FileFormat", "plain-text"
+        )
+        if destination == "s3" and file_format == "plain-text":
+            # arn:aws:s3:::bucket[/prefix]
+            bucket, _, prefix = (
+                flow_log["LogDestination"].split(":::", 1)[1].partition("/")
+            )
+            prefix = f"{prefix.rstrip('/')}/AWSLogs/" if prefix else "AWSLogs/"
+            return self.flow_loader.load_s3(
+                bucket, prefix, since=start, fields=fields_from_format(log_format)
+            )
 
-        except Exception as e:
-            logger.error(f"Error preparing packet capture: {e}")
-            return {"status": "error", "instance_id": instance_id, "error": str(e)}
+        logger.warning(
+            f"Skipping flow log {flow_log.get('FlowLogId')}: "
+            f"{destination} ({file_format}) destinations are not loaded"
+        )
+        return None
 
     def analyze_vpc_flow_logs(self, vpc_ids: List[str], hours: int = 24) -> Dict:
         """
         Analyze VPC Flow Logs for suspicious network activity.
 
+        Each VPC's flow log records (CloudWatch Logs or plain-text S3
+        destinations) are loaded into a columnar table and summarized with
+        FlowLogAnalytics: top talkers, port-scan fan-out, a rejected-flow
+        heatmap and egress volume by destination.
+
         Args:
             vpc_ids: List of VPC IDs
             hours: Hours to look back
@@ -110,58 +377,40 @@ class NetworkCaptureManager:
         logger.info(f"Analyzing VPC Flow Logs for {len(vpc_ids)} VPCs")
 
         try:
+            end = datetime.now(timezone.utc)
+            start = end - timedelta(hours=hours)
             flow_logs: Dict[str, Any] = {}
 
             for vpc_id in vpc_ids:
                 try:
                     logger.info(f"Analyzing flow logs for VPC {vpc_id}")
 
-                    # Get flow log data
-                    response = self.ec2.describe_flow_logs(
-                        Filter=[{"Name": "resource-id", "Values": [vpc_id]}]
-                    )
-
-                    flow_log_info = []
-
-                    for fl in response.get("FlowLogs", []):
-                        log_group = fl.get("LogGroupName")
-
-                        if log_group:
-                            # Query for rejected/suspicious flows
-                            start_time = int(
-                                (datetime.utcnow() - timedelta(hours=hours)).timestamp()
-                                * 1000
-                            )
-                            end_time = int(datetime.utcnow().timestamp() * 1000)
-
-                            query = """
-                            fields @timestamp, srcip, dstip, srcport, dstport, action, bytes
-                            | filter action = "REJECT"
-                            | stats count() as rejected_flows, sum(bytes) as total_bytes by srcip, dstip
-                            | sort total_bytes desc
-                            """
-
-                            try:
-                                response = self.cloudwatch.start_query(
-                                    logGroupName=log_group,
-                                    startTime=start_time,
-                                    endTime=end_time,
-                                    queryString=query,
-                                )
-
-                                flow_log_info.append(
-                                    {
-                                        "log_group": log_group,
-                                        "query_id": response["queryId"],
-                                        "status": "initiated",
-                                    }
-                                )
-                            except Exception as e:
-                                logger.warning(f"Error querying {log_group}: {e}")
-
-                        self.captures["vpc_flow_logs"].extend(flow_log_info)
-
-                    flow_logs[vpc_id] = flow_log_info
+                    sources = []
+                    tables = []
+                    for fl in self.inventory.flow_logs([vpc_id]):
+                        table = self._load_flow_log(fl, start, end)
+                        if table is None:
+                            continue
+                        sources.append(
+                            {
+                                "flow_log_id": fl.get("FlowLogId"),
+                                "destination": fl.get("LogGroupName")
+                                or fl.get("LogDestination"),
+                                "records": len(table),
+                            }
+                        )
+                        tables.append(table)
+
+                    analytics = FlowLogAnalytics(FlowLogTable.concat(tables))
+                    analysis = {
+                        "vpc_id": vpc_id,
+                        "flow_logs": sources,
+                        "window_start": start.isoformat(),
+                        "window_end": end.isoformat(),
+                        **analytics.summary(),
+                    }
+                    self.captures["vpc_flow_logs"].append(analysis)
+                    flow_logs[vpc_id] = analysis
 
                 except Exception as e:
                     logger.error(f"Error analyzing VPC {vpc_id}: {e}")
@@ -177,116 +426,201 @@ class NetworkCaptureManager:
             logger.error(f"Error analyzing VPC Flow Logs: {e}")
             return {"status": "error", "error": str(e)}
 
-    def capture_dns_queries(self, instance_ids: List[str], duration: int = 300) -> Dict:
+    def capture_dns_queries(
+        self,
+        instance_ids: List[str],
+        duration: int = 300,
+        targets: Optional[List[Dict]] = None,
+        start_at: Optional[float] = None,
+    ) -> Dict:
         """
-        Capture DNS queries from instances.
+        Capture DNS traffic from instances.
+
+        The raw port 53 capture is uploaded to the evidence bucket and
+        decoded locally by dns_analysis.py, so nothing is parsed on the
+        possibly compromised host.
 
         Args:
             instance_ids: List of instance IDs
             duration: Capture duration in seconds
+            targets: SSM tag targets to capture from as well
+            start_at: Epoch seconds at which every host starts capturing
 
         Returns:
             Dictionary with DNS capture results
         """
         logger.info(f"Capturing DNS queries from {len(instance_ids)} instances")
 
-        captures = []
-
-        for instance_id in instance_ids:
-            try:
-                logger.info(f"Capturing DNS from {instance_id}")
-
-                # Use tcpdump to capture DNS queries
-                cmd = [
-                    f'timeout {duration} tcpdump -i any -nn "port 53" -w /tmp/dns-{self.incident_id}.pcap',
-                    f'tcpdump -r /tmp/dns-{self.incident_id}.pcap -A | grep -i "A\\|CNAME\\|MX"',
-                ]
-
-                response = self.ssm.send_command(
-                    InstanceIds=[instance_id],
-                    DocumentName="AWS-RunShellScript",
-                    Parameters={"command": cmd},
-                )
-
-                captures.append(
-                    {
-                        "instance_id": instance_id,
-                        "command_id": response["Command"]["CommandId"],
-                        "status": "initiated",
-                    }
-                )
-
+        pcap = f"/tmp/dns-{self.incident_id}-$INSTANCE_ID.pcap"
+        cmd = (
+            INSTANCE_ID_SHELL
+            + self._wait_until(start_at)
+            + [
+                f'timeout {duration} tcpdump -i any -nn -s0 "port 53" -w {pcap}',
+                f"aws s3 cp {pcap} s3://incident-evidence/{self.incident_id}/$INSTANCE_ID/",
+            ]
+        )
+
+        result = self._dispatch(
+            "dns_capture",
+            cmd,
+            instance_ids,
+            targets,
+            timeout_seconds=duration + 300,
+            start_at=start_at,
+        )
+
+        for entry in result["entries"]:
+            if "error" not in entry:
+                instance_id = entry["instance_id"]
                 self.captures["dns_queries"].append(
                     {
                         "instance_id": instance_id,
-                        "command_id": response["Command"]["CommandId"],
+                        "command_id": entry["command_id"],
+                        "pcap": f"s3://incident-evidence/{self.incident_id}/{instance_id}/dns-{self.incident_id}-{instance_id}.pcap",
                     }
                 )
 
-            except Exception as e:
-                logger.error(f"Error capturing DNS from {instance_id}: {e}")
-                captures.append({"instance_id": instance_id, "error": str(e)})
-
-        return {"status": "success", "instances": len(captures), "captures": captures}
+        return {
+            "status": "success",
+            "instances": len(result["entries"]),
+            "captures": result["entries"],
+            "commands": result["commands"],
+        }
 
-    def analyze_connections(self, instance_ids: List[str]) -> Dict:
+    def analyze_connections(
+        self,
+        instance_ids: List[str],
+        targets: Optional[List[Dict]] = None,
+        snapshots: int = 1,
+        interval: int = 60,
+        start_at: Optional[float] = None,
+    ) -> Dict:
         """
         Analyze active network connections on instances.
 
+        Each instance takes socket snapshots, prints them and uploads them
+        to the evidence bucket; collect_results() parses the printed copy
+        and connection_report() diffs and rolls them up.
+
         Args:
             instance_ids: List of instance IDs
+            targets: SSM tag targets to analyze as well
+            snapshots: Snapshots per instance
+            interval: Seconds between snapshots
+            start_at: Epoch seconds at which every host takes its first
+                snapshot
 
         Returns:
             Dictionary with connection analysis
         """
         logger.info(f"Analyzing network connections on {len(instance_ids)} instances")
 
-        connections = []
-
-        for instance_id in instance_ids:
-            try:
-                logger.info(f"Analyzing connections on {instance_id}")
-
-                # Get netstat/ss output
-                cmd = [
-                    "netstat -tnp 2>/dev/null || ss -tnp",
-                    "netstat -unp 2>/dev/null || ss -unp",
-                    "lsof -i -P -n | head -100",
-                ]
-
-                response = self.ssm.send_command(
-                    InstanceIds=[instance_id],
-                    DocumentName="AWS-RunShellScript",
-                    Parameters={"command": cmd},
-                )
-
-                connections.append(
-                    {
-                        "instance_id": instance_id,
-                        "command_id": response["Command"]["CommandId"],
-                        "status": "initiated",
-                    }
-                )
-
+        # Snapshots go to a file too, as SSM truncates long command output
+        snapshot_file = f"/tmp/connections-{self.incident_id}-$INSTANCE_ID-$STAMP.txt"
+        cmd = (
+            INSTANCE_ID_SHELL
+            + self._wait_until(start_at)
+            + ["STAMP=$(date -u +%Y%m%dT%H%M%SZ)", "{"]
+            + snapshot_commands(snapshots, interval)
+            + [
+                f"}} > {snapshot_file}",
+                f"aws s3 cp --only-show-errors {snapshot_file} "
+                f"s3://incident-evidence/{self.incident_id}/$INSTANCE_ID/",
+                f"cat {snapshot_file}",
+                f"rm -f {snapshot_file}",
+            ]
+        )
+
+        result = self._dispatch(
+            "connections",
+            cmd,
+            instance_ids,
+            targets,
+            timeout_seconds=(snapshots - 1) * interval + 300,
+            start_at=start_at,
+        )
+
+        for entry in result["entries"]:
+            if "error" not in entry:
+                instance_id = entry["instance_id"]
                 self.captures["connections"].append(
                     {
                         "instance_id": instance_id,
-                        "command_id": response["Command"]["CommandId"],
+                        "command_id": entry["command_id"],
+                        "snapshots": f"s3://incident-evidence/{self.incident_id}/{instance_id}/connections-{self.incident_id}-{instance_id}-",
                     }
                 )
 
-            except Exception as e:
-                logger.error(f"Error analyzing connections on {instance_id}: {e}")
-                connections.append({"instance_id": instance_id, "error": str(e)})
+        return {
+            "status": "success",
+            "instances": len(result["entries"]),
+            "connections": result["entries"],
+            "commands": result["commands"],
+        }
+
+    def connection_report(self, peer: Optional[str] = None) -> Dict:
+        """
+        Diff and roll up the connection snapshots collected so far.
+
+        Snapshots cut off by SSM's output limit are counted as incomplete;
+        connection_analysis.py --incident-id reads the full copies from S3.
+
+        Args:
+            peer: Also look up the instances connected to this address
+
+        Returns:
+            Per-instance changes, shared peers and rare listeners
+        """
+        analyzer = ConnectionAnalyzer()
+        for instance_id, results in self.results.items():
+            result = results.get("connections")
+            if result and not result["pending"]:
+                analyzer.add_text(result.get("stdout", ""), instance_id)
+        return analyzer.report(peer=peer)
+
+    def collect_results(self, timeout: Optional[float] = None) -> Dict:
+        """
+        Collect the output of every SSM command sent so far.
+
+        Args:
+            timeout: Maximum seconds to wait for running commands
+                (poll once if 0, no limit if None)
+
+        Returns:
+            Dictionary with collection status and summary
+        """
+        purposes = {c["command_id"]: c["purpose"] for c in self.commands}
+        try:
+            collected = self.collector.collect(list(purposes), timeout=timeout)
+        except Exception as e:
+            logger.error(f"Error collecting SSM results: {e}")
+            return {"status": "error", "error": str(e)}
+
+        for instance_id, by_command in collected["results"].items():
+            for command_id, entry in by_command.items():
+                purpose = purposes[command_id]
+                self.results.setdefault(instance_id, {})[purpose] = entry
 
         return {
             "status": "success",
-            "instances": len(connections),
-            "connections": connections,
+            "summary": collected["summary"],
+            "timed_out": collected["timed_out"],
         }
 
+    def _instance_status(self) -> Dict[str, str]:
+        """Whether each instance's commands are still pending or done."""
+        status = {}
+        for instance_id in {*self.instance_commands, *self.results}:
+            results = self.results.get(instance_id, {})
+            purposes = {*self.instance_commands.get(instance_id, {}), *results}
+            done = all(p in results and not results[p]["pending"] for p in purposes)
+            status[instance_id] = "done" if done else "pending"
+        return status
+
     def create_capture_manifest(self) -> Dict:
         """Create manifest of all network captures."""
+        instance_status = self._instance_status()
         manifest = {
             "incident_id": self.incident_id,
             "capture_time": datetime.utcnow().isoformat(),
@@ -296,7 +630,16 @@ class NetworkCaptureManager:
                 "vpc_flow_logs": len(self.captures["vpc_flow_logs"]),
                 "dns_captures": len(self.captures["dns_queries"]),
                 "connection_snapshots": len(self.captures["connections"]),
+                "ssm_commands": len(self.commands),
+                "instances_done": sum(s == "done" for s in instance_status.values()),
+                "instances_pending": sum(
+                    s == "pending" for s in instance_status.values()
+                ),
             },
+            "commands": self.commands,
+            "instance_commands": self.instance_commands,
+            "instance_status": instance_status,
+            "results": self.results,
         }
 
         return manifest
@@ -306,14 +649,40 @@ class NetworkCaptureManager:
         instance_ids: Optional[List[str]] = None,
         vpc_ids: Optional[List[str]] = None,
         duration: int = 300,
+        filter_expr: str = "",
+        targets: Optional[List[Dict]] = None,
+        collect_timeout: Optional[float] = None,
+        rotate_mb: Optional[int] = None,
+        rotate_seconds: Optional[int] = None,
+        flow_log_hours: int = 24,
+        connection_snapshots: int = 1,
+        connection_interval: int = 60,
+        start_delay: Optional[float] = 30.0,
     ) -> Dict:
         """
         Capture all network traffic.
 
+        The packet, DNS and connection captures are dispatched concurrently
+        (alongside the flow log analysis) after one inventory load for the
+        whole fleet. Hosts wait for a shared start time, so captures begin
+        within seconds of each other instead of drifting with dispatch order.
+
         Args:
             instance_ids: EC2 instances to capture from
             vpc_ids: VPCs to analyze flow logs from
             duration: Capture duration in seconds
+            filter_expr: tcpdump filter expression
+            targets: SSM tag targets to capture from as well
+            collect_timeout: If set, wait up to this many seconds for command
+                output and add it to the manifest
+            rotate_mb: Cut packet captures into chunks of this many megabytes
+            rotate_seconds: Cut packet captures into chunks of this many seconds
+            flow_log_hours: Hours of VPC Flow Logs to analyze
+            connection_snapshots: Connection snapshots per instance
+            connection_interval: Seconds between connection snapshots
+            start_delay: Seconds from now until every host starts capturing,
+                enough for the commands to reach the fleet (start on arrival
+                if None)
 
         Returns:
             Dictionary with all capture results
@@ -326,19 +695,58 @@ class NetworkCaptureManager:
             "captures": {},
         }
 
-        if instance_ids:
-            results["captures"]["packet_captures"] = []
-            for iid in instance_ids:
-                results["captures"]["packet_captures"].append(
-                    self.capture_instance_traffic(iid, duration)
-                )
-            results["captures"]["dns_queries"] = self.capture_dns_queries(
-                instance_ids, duration
+        tasks: Dict[str, Callable[[], Dict]] = {}
+        start_at = None
+        if instance_ids or targets:
+            instance_ids = instance_ids or []
+            # One paginated describe for the fleet, before the dispatch threads
+            self.inventory.load("instances")
+            if start_delay is not None:
+                start_at = time.time() + start_delay
+                results["capture_start"] = datetime.fromtimestamp(
+                    start_at, timezone.utc
+                ).isoformat()
+
+            tasks["packet_captures"] = lambda: self.capture_traffic(
+                instance_ids,
+                duration,
+                filter_expr,
+                targets,
+                rotate_mb,
+                rotate_seconds,
+                start_at,
+            )
+            tasks["dns_queries"] = lambda: self.capture_dns_queries(
+                instance_ids, duration, targets, start_at
+            )
+            tasks["connections"] = lambda: self.analyze_connections(
+                instance_ids,
+                targets,
+                connection_snapshots,
+                connection_interval,
+                start_at,
             )
-            results["captures"]["connections"] = self.analyze_connections(instance_ids)
 
         if vpc_ids:
-            results["captures"]["vpc_flow_logs"] = self.analyze_vpc_flow_logs(vpc_ids)
+            tasks["vpc_flow_logs"] = lambda: self.analyze_vpc_flow_logs(
+                vpc_ids, flow_log_hours
+            )
+
+        if tasks:
+            with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+                futures = {kind: executor.submit(task) for kind, task in tasks.items()}
+            for kind, future in futures.items():
+                results["captures"][kind] = future.result()
+            if start_at is not None and time.time() > start_at:
+                logger.warning(
+                    "Dispatch finished after the shared start time; "
+                    "raise --start-delay for a tighter start window"
+                )
+
+        if collect_timeout is not None and self.commands:
+            results["collection"] = self.collect_results(collect_timeout)
+            if self.captures["connections"]:
+                results["connection_report"] = self.connection_report()
 
         # Create manifest
         results["manifest"] = self.create_capture_manifest()
@@ -361,6 +769,70 @@ def main():
         "--duration", type=int, default=300, help="Capture duration in seconds"
     )
     parser.add_argument("--filter", default="", help="tcpdump filter expression")
+    parser.add_argument(
+        "--rotate-mb",
+        type=int,
+        help="Cut the packet capture into chunks of this many MB, uploaded as they finish",
+    )
+    parser.add_argument(
+        "--rotate-seconds",
+        type=int,
+        help="Cut the packet capture into chunks of this many seconds",
+    )
+    parser.add_argument(
+        "--flow-log-hours",
+        type=int,
+        default=24,
+        help="Hours of VPC Flow Logs to analyze",
+    )
+    parser.add_argument(
+        "--connection-snapshots",
+        type=int,
+        default=1,
+        help="Connection snapshots per instance, diffed in time order",
+    )
+    parser.add_argument(
+        "--connection-interval",
+        type=int,
+        default=60,
+        help="Seconds between connection snapshots",
+    )
+    parser.add_argument(
+        "--target-tag",
+        action="append",
+        help="Also capture from instances with this tag, KEY=VALUE[,VALUE]",
+    )
+    parser.add_argument(
+        "--max-concurrency", default="50", help="SSM MaxConcurrency per command"
+    )
+    parser.add_argument("--max-errors", default="10%", help="SSM MaxErrors per command")
+    parser.add_argument(
+        "--start-delay",
+        type=float,
+        default=30.0,
+        help="Seconds until every host starts capturing at the same moment",
+    )
+    parser.add_argument(
+        "--no-sync-start",
+        action="store_true",
+        help="Let each host start capturing when its command arrives",
+    )
+    parser.add_argument(
+        "--collect-timeout",
+        type=float,
+        help="Wait up to this many seconds for command output (0 polls once)",
+    )
+    parser.add_argument(
+        "--inventory-dir",
+        default="./incident-inventory",
+        help="Resource inventory cache shared by the forensics scripts",
+    )
+    parser.add_argument(
+        "--inventory-ttl",
+        type=float,
+        default=DEFAULT_INVENTORY_TTL,
+        help="Seconds cached inventory stays valid",
+    )
 
     args = parser.parse_args()
 
@@ -369,8 +841,25 @@ def main():
     vpc_ids = args.vpc_ids.split(",") if args.vpc_ids else None
 
     # Run capture
-    manager = NetworkCaptureManager(args.incident_id)
-    results = manager.capture_all(instance_ids, vpc_ids, args.duration)
+    inventory = ResourceInventory(
+        args.incident_id, args.inventory_dir, args.inventory_ttl
+    )
+    dispatcher = SSMCommandDispatcher(args.max_concurrency, args.max_errors)
+    manager = NetworkCaptureManager(args.incident_id, inventory, dispatcher)
+    results = manager.capture_all(
+        instance_ids,
+        vpc_ids,
+        args.duration,
+        args.filter,
+        parse_targets(args.target_tag),
+        args.collect_timeout,
+        args.rotate_mb,
+        args.rotate_seconds,
+        args.flow_log_hours,
+        args.connection_snapshots,
+        args.connection_interval,
+        None if args.no_sync_start else args.start_delay,
+    )
 
     # Print results
     print(json.dumps(results, indent=2, default=str))
@@ -0,0 +1,800 @@
+#!/usr/bin/env python3
+"""
+Streaming pcap analysis for incident forensics.
+
+Reads the classic pcap files written by tcpdump through mmap, decodes the
+link, IP and TCP/UDP headers of every packet and aggregates packets into
+5-tuple flows with bytes, packets, duration and TCP flags, plus top
+talkers. Memory stays bounded on multi-GB captures: the file is paged in
+by the OS, flows idle for longer than the idle timeout are exported and
+dropped from the flow table, and the table is capped. Several files are
+analyzed in parallel, one process per file. Rotating captures can be
+followed through their chunk indexes, so analysis starts on the first
+chunk while the capture is still running.
+
+Usage:
+    python3 pcap_analysis.py --pcaps traffic-1.pcap traffic-2.pcap
+    python3 pcap_analysis.py --incident-id INCIDENT123 --download-dir ./pcaps
+    python3 pcap_analysis.py --incident-id INCIDENT123 --follow
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import boto3
+import logging
+import mmap
+import os
+import socket
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# Classic pcap magic numbers: byte order and timestamp resolution
+PCAP_MAGIC = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1e-6),
+    b"\xa1\xb2\xc3\xd4": (">", 1e-6),
+    b"\x4d\x3c\xb2\xa1": ("<", 1e-9),
+    b"\xa1\xb2\x3c\x4d": (">", 1e-9),
+}
+PCAPNG_MAGIC = b"\x0a\x0d\x0d\x0a"
+
+# Link types: Ethernet, raw IP, Linux cooked (tcpdump -i any), Linux
+# cooked v2 (newer tcpdump -i any), and raw IPv4/IPv6
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_LINUX_SLL2 = 276
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86DD
+ETHERTYPE_VLAN = {0x8100, 0x88A8}
+
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+IPPROTO_NAMES = {1: "icmp", 6: "tcp", 17: "udp", 58: "icmpv6"}
+
+# IPv6 extension headers walked to reach the transport header
+IPV6_EXTENSION_HEADERS = {0, 43, 60}
+IPV6_FRAGMENT = 44
+
+TCP_FLAG_NAMES = ["FIN", "SYN", "RST", "PSH", "ACK", "URG", "ECE", "CWR"]
+
+DEFAULT_IDLE_TIMEOUT = 120.0
+DEFAULT_MAX_FLOWS = 500_000
+DEFAULT_TOP_N = 20
+
+# Packets between sweeps of the flow table for idle flows
+SWEEP_INTERVAL = 100_000
+
+# Chunk index written by rotating captures under <incident>/<instance>/
+CHUNK_INDEX_SUFFIX = "/chunks/index.jsonl"
+
+_U16 = struct.Struct(">H")
+_PORTS = struct.Struct(">HH")
+
+
+class Packet:
+    """Decoded network and transport headers of one packet."""
+
+    __slots__ = ("proto", "src", "dst", "sport", "dport", "flags", "payload")
+
+    def __init__(
+        self,
+        proto: int,
+        src: bytes,
+        dst: bytes,
+        sport: int,
+        dport: int,
+        flags: int,
+        payload: int,
+    ):
+        self.proto = proto
+        self.src = src
+        self.dst = dst
+        self.sport = sport
+        self.dport = dport
+        self.flags = flags
+        # Offset of the transport payload in the frame (-1 if unknown)
+        self.payload = payload
+
+
+def read_pcap(path: str) -> Iterator[Tuple[int, float, int, bytes]]:
+    """
+    Iterate over the packets of a classic pcap file through mmap.
+
+    Args:
+        path: Path to the pcap file
+
+    Yields:
+        (link type, timestamp, original length, captured bytes) per packet
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < 24:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic = mm[:4]
+            if magic == PCAPNG_MAGIC:
+                raise ValueError(
+                    f"{path} is pcapng; convert it with "
+                    "'editcap -F pcap' or capture with tcpdump"
+                )
+            if magic not in PCAP_MAGIC:
+                raise ValueError(f"{path} is not a pcap file")
+
+            endian, resolution = PCAP_MAGIC[magic]
+            linktype = struct.unpack_from(f"{endian}I", mm, 20)[0] & 0x0FFFFFFF
+            record = struct.Struct(f"{endian}IIII")
+            unpack_record = record.unpack_from
+            size = len(mm)
+            offset = 24
+
+            while offset + 16 <= size:
+                ts_sec, ts_frac, caplen, orig_len = unpack_record(mm, offset)
+                offset += 16
+                if offset + caplen > size:
+                    # Capture cut off mid-packet, e.g. tcpdump was killed
+                    break
+                yield (
+                    linktype,
+                    ts_sec + ts_frac * resolution,
+                    orig_len,
+                    mm[offset : offset + caplen],
+                )
+                offset += caplen
+
+
+def decode_packet(linktype: int, data: bytes) -> Optional[Packet]:
+    """
+    Decode the IP and TCP/UDP headers of a captured frame.
+
+    Args:
+        linktype: pcap link type of the frame
+        data: Captured bytes
+
+    Returns:
+        Decoded packet, or None for non-IP or truncated frames
+    """
+    if linktype == LINKTYPE_ETHERNET:
+        if len(data) < 14:
+            return None
+        ethertype = _U16.unpack_from(data, 12)[0]
+        offset = 14
+        while ethertype in ETHERTYPE_VLAN and len(data) >= offset + 4:
+            ethertype = _U16.unpack_from(data, offset + 2)[0]
+            offset += 4
+    elif linktype == LINKTYPE_LINUX_SLL:
+        if len(data) < 16:
+            return None
+        ethertype = _U16.unpack_from(data, 14)[0]
+        offset = 16
+    elif linktype == LINKTYPE_LINUX_SLL2:
+        if len(data) < 20:
+            return None
+        ethertype = _U16.unpack_from(data, 0)[0]
+        offset = 20
+    elif linktype in (LINKTYPE_RAW, LINKTYPE_IPV4, LINKTYPE_IPV6):
+        if not data:
+            return None
+        version = data[0] >> 4
+        ethertype = ETHERTYPE_IPV4 if version == 4 else ETHERTYPE_IPV6
+        offset = 0
+    else:
+        return None
+
+    fragment = False
+    if ethertype == ETHERTYPE_IPV4:
+        if len(data) < offset + 20:
+            return None
+        ihl = (data[offset] & 0x0F) * 4
+        proto = data[offset + 9]
+        src = data[offset + 12 : offset + 16]
+        dst = data[offset + 16 : offset + 20]
+        # Only the first fragment carries the transport header
+        fragment = (_U16.unpack_from(data, offset + 6)[0] & 0x1FFF) != 0
+        offset += ihl
+    elif ethertype == ETHERTYPE_IPV6:
+        if len(data) < offset + 40:
+            return None
+        proto = data[offset + 6]
+        src = data[offset + 8 : offset + 24]
+        dst = data[offset + 24 : offset + 40]
+        offset += 40
+        while proto in IPV6_EXTENSION_HEADERS or proto == IPV6_FRAGMENT:
+            if len(data) < offset + 8:
+                return Packet(proto, src, dst, 0, 0, 0, -1)
+            if proto == IPV6_FRAGMENT:
+                fragment = (_U16.unpack_from(data, offset + 2)[0] & 0xFFF8) != 0
+                next_proto, length = data[offset], 8
+            else:
+                next_proto, length = data[offset], (data[offset + 1] + 1) * 8
+            proto = next_proto
+            offset += length
+    else:
+        return None
+
+    if fragment:
+        return Packet(proto, src, dst, 0, 0, 0, -1)
+
+    if proto == IPPROTO_TCP and len(data) >= offset + 14:
+        sport, dport = _PORTS.unpack_from(data, offset)
+        header = (data[offset + 12] >> 4) * 4
+        return Packet(proto, src, dst, sport, dport, data[offset + 13], offset + header)
+    if proto == IPPROTO_UDP and len(data) >= offset + 8:
+        sport, dport = _PORTS.unpack_from(data, offset)
+        return Packet(proto, src, dst, sport, dport, 0, offset + 8)
+    return Packet(proto, src, dst, 0, 0, 0, -1)
+
+
+def format_address(address: bytes) -> str:
+    """Text form of a packed IPv4 or IPv6 address."""
+    family = socket.AF_INET if len(address) == 4 else socket.AF_INET6
+    return socket.inet_ntop(family, address)
+
+
+def format_flags(flags: int) -> List[str]:
+    """Names of the TCP flags set in a flags byte."""
+    return [name for bit, name in enumerate(TCP_FLAG_NAMES) if flags & (1 << bit)]
+
+
+class PcapFlowAnalyzer:
+    """Aggregates pcap packets into 5-tuple flows and top talkers."""
+
+    def __init__(
+        self,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_flows: int = DEFAULT_MAX_FLOWS,
+        top_n: int = DEFAULT_TOP_N,
+    ):
+        """
+        Initialize flow analyzer.
+
+        Args:
+            idle_timeout: Seconds without packets after which a flow ends
+            max_flows: Most flows kept in the flow table at once
+            top_n: Number of top flows and talkers to report
+        """
+        self.idle_timeout = idle_timeout
+        self.max_flows = max_flows
+        self.top_n = top_n
+
+    @staticmethod
+    def _flow_record(key: Tuple, flow: List) -> Dict:
+        """JSON-friendly record for a flow table entry."""
+        proto, src, sport, dst, dport = key
+        first, last, packets, nbytes, flags = flow
+        record = {
+            "protocol": IPPROTO_NAMES.get(proto, str(proto)),
+            "src": format_address(src),
+            "src_port": sport,
+            "dst": format_address(dst),
+            "dst_port": dport,
+            "start": first,
+            "end": last,
+            "duration": round(last - first, 6),
+            "packets": packets,
+            "bytes": nbytes,
+        }
+        if proto == IPPROTO_TCP:
+            record["tcp_flags"] = format_flags(flags)
+        return record
+
+    def analyze_file(self, path: str, flows_path: Optional[str] = None) -> Dict:
+        """
+        Aggregate one pcap file into flows.
+
+        Args:
+            path: Path to the pcap file
+            flows_path: Write every flow as a JSON line to this file
+
+        Returns:
+            Dictionary with packet totals, top flows and top talkers
+        """
+        logger.info(f"Analyzing {path}")
+
+        # key -> [first_ts, last_ts, packets, bytes, tcp_flags]
+        flows: Dict[Tuple, List] = {}
+        # source address -> [bytes, packets, flows]
+        talkers: Dict[bytes, List[int]] = {}
+        # Min-heap of (bytes, sequence, record) for the largest ended flows
+        top: List[Tuple[int, int, Dict]] = []
+        totals = {"packets": 0, "bytes": 0, "flows": 0, "non_ip": 0}
+        first_ts: Optional[float] = None
+        last_ts = 0.0
+
+        flows_file = open(flows_path, "w") if flows_path else None
+
+        def end_flows(keys: List[Tuple]) -> None:
+            for key in keys:
+                flow = flows.pop(key)
+                totals["flows"] += 1
+                if flows_file is None and len(top) >= self.top_n:
+                    if flow[3] <= top[0][0]:
+                        continue
+                record = self._flow_record(key, flow)
+                if flows_file is not None:
+                    flows_file.write(json.dumps(record) + "\n")
+                item = (flow[3], totals["flows"], record)
+                if len(top) < self.top_n:
+                    heapq.heappush(top, item)
+                elif item[0] > top[0][0]:
+                    heapq.heapreplace(top, item)
+
+        idle_timeout = self.idle_timeout
+        try:
+            since_sweep = 0
+            for linktype, ts, length, data in read_pcap(path):
+                packet = decode_packet(linktype, data)
+                totals["packets"] += 1
+                totals["bytes"] += length
+                if first_ts is None:
+                    first_ts = ts
+                last_ts = ts
+                if packet is None:
+                    totals["non_ip"] += 1
+                    continue
+
+                key = (packet.proto, packet.src, packet.sport, packet.dst, packet.dport)
+                flow = flows.get(key)
+                if flow is not None and ts - flow[1] > idle_timeout:
+                    # Same 5-tuple after an idle gap is a new flow
+                    end_flows([key])
+                    flow = None
+                if flow is None:
+                    flows[key] = [ts, ts, 1, length, packet.flags]
+                    talker = talkers.get(packet.src)
+                    if talker is None:
+                        talkers[packet.src] = [length, 1, 1]
+                    else:
+                        talker[0] += length
+                        talker[1] += 1
+                        talker[2] += 1
+                else:
+                    flow[1] = ts
+                    flow[2] += 1
+                    flow[3] += length
+                    flow[4] |= packet.flags
+                    talker = talkers[packet.src]
+                    talker[0] += length
+                    talker[1] += 1
+
+                since_sweep += 1
+                if since_sweep >= SWEEP_INTERVAL or len(flows) > self.max_flows:
+                    since_sweep = 0
+                    cutoff = ts - idle_timeout
+                    end_flows([k for k, f in flows.items() if f[1] < cutoff])
+                    if len(flows) > self.max_flows:
+                        # Still over the cap: end the least recently seen half
+                        by_age = sorted(flows, key=lambda k: flows[k][1])
+                        end_flows(by_age[: len(by_age) // 2])
+
+            end_flows(list(flows))
+
+        except Exception as e:
+            logger.error(f"Error analyzing {path}: {e}")
+            return {"status": "error", "file": path, "error": str(e)}
+        finally:
+            if flows_file is not None:
+                flows_file.close()
+
+        top_talkers = heapq.nlargest(self.top_n, talkers.items(), key=lambda t: t[1][0])
+        return {
+            "status": "success",
+            "file": path,
+            "start": first_ts,
+            "end": last_ts,
+            **totals,
+            "talkers": {format_address(a): t for a, t in talkers.items()},
+            "top_flows": [record for _, _, record in sorted(top, reverse=True)],
+            "top_talkers": [
+                {"ip": format_address(a), "bytes": b, "packets": p, "flows": n}
+                for a, (b, p, n) in top_talkers
+            ],
+            "flows_file": flows_path,
+        }
+
+    def analyze_files(
+        self,
+        paths: List[str],
+        workers: Optional[int] = None,
+        flows_dir: Optional[str] = None,
+    ) -> Dict:
+        """
+        Analyze several pcap files in parallel and merge the results.
+
+        Flows are aggregated per file, so a flow that spans rotated files
+        is reported once per file.
+
+        Args:
+            paths: Paths to pcap files
+            workers: Worker processes (CPU count if None)
+            flows_dir: Write each file's flows to <flows_dir>/<name>.flows.jsonl
+
+        Returns:
+            Dictionary with per-file results, totals, top flows and talkers
+        """
+        if flows_dir:
+            os.makedirs(flows_dir, exist_ok=True)
+
+        results = []
+        if len(paths) <= 1 or workers == 1:
+            results = [
+                self.analyze_file(p, self._flows_path(p, flows_dir)) for p in paths
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self.analyze_file, p, self._flows_path(p, flows_dir)
+                    )
+                    for p in paths
+                ]
+                results = [future.result() for future in as_completed(futures)]
+
+        return self._merge(results)
+
+    def analyze_following(
+        self,
+        follower: "ChunkFollower",
+        workers: Optional[int] = None,
+        flows_dir: Optional[str] = None,
+        poll_interval: float = 5.0,
+        idle_timeout: float = 600.0,
+    ) -> Dict:
+        """
+        Analyze rotating capture chunks as they arrive.
+
+        Each chunk is handed to a worker process as soon as it is
+        downloaded, while the follower keeps polling for the next ones.
+
+        Args:
+            follower: Chunk follower for the incident
+            workers: Worker processes (CPU count if None)
+            flows_dir: Write each chunk's flows to <flows_dir>/<name>.flows.jsonl
+            poll_interval: Seconds between index polls
+            idle_timeout: Stop after this many seconds without a new chunk
+
+        Returns:
+            Merged results in the same form as analyze_files
+        """
+        if flows_dir:
+            os.makedirs(flows_dir, exist_ok=True)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = []
+
+            def on_chunk(path: str) -> None:
+                futures.append(
+                    executor.submit(
+                        self.analyze_file, path, self._flows_path(path, flows_dir)
+                    )
+                )
+
+            follower.follow(on_chunk, poll_interval, idle_timeout)
+            results = [future.result() for future in futures]
+
+        return self._merge(results)
+
+    @staticmethod
+    def _flows_path(path: str, flows_dir: Optional[str]) -> Optional[str]:
+        """Flow output file for a capture file, if flows are written."""
+        if not flows_dir:
+            return None
+        name = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(flows_dir, f"{name}.flows.jsonl")
+
+    def _merge(self, results: List[Dict]) -> Dict:
+        """Merge per-file results into totals, top flows and top talkers."""
+        talkers: Dict[str, List[int]] = {}
+        top_flows: List[Dict] = []
+        totals = {"packets": 0, "bytes": 0, "flows": 0, "non_ip": 0}
+        files = []
+        for result in sorted(results, key=lambda r: r["file"]):
+            if result["status"] != "success":
+                files.append(result)
+                continue
+            for field in totals:
+                totals[field] += result[field]
+            for ip, (b, p, n) in result.pop("talkers").items():
+                talker = talkers.setdefault(ip, [0, 0, 0])
+                talker[0] += b
+                talker[1] += p
+                talker[2] += n
+            top_flows.extend(result["top_flows"])
+            files.append(result)
+
+        top_talkers = heapq.nlargest(self.top_n, talkers.items(), key=lambda t: t[1][0])
+        return {
+            "status": "success",
+            "files": files,
+            "totals": totals,
+            "top_flows": heapq.nlargest(
+                self.top_n, top_flows, key=lambda f: f["bytes"]
+            ),
+            "top_talkers": [
+                {"ip": ip, "bytes": b, "packets": p, "flows": n}
+                for ip, (b, p, n) in top_talkers
+            ],
+        }
+
+
+class ChunkFollower:
+    """
+    Downloads rotating capture chunks as their chunk indexes grow.
+
+    Rotating captures (network-capture.py --rotate-mb/--rotate-seconds)
+    upload each finished chunk to <incident>/<instance>/chunks/ and append
+    it to chunks/index.jsonl; a final {"complete": true} line marks the
+    end of the capture.
+    """
+
+    def __init__(
+        self,
+        incident_id: str,
+        dest_dir: str,
+        bucket: str = "incident-evidence",
+        workers: int = 8,
+    ):
+        """
+        Initialize chunk follower.
+
+        Args:
+            incident_id: Incident whose captures to follow
+            dest_dir: Local directory for downloaded chunks
+            bucket: Evidence bucket
+            workers: Concurrent downloads
+        """
+        self.incident_id = incident_id
+        self.dest_dir = dest_dir
+        self.bucket = bucket
+        self.workers = workers
+
+        self.s3 = boto3.client("s3")
+
+        os.makedirs(dest_dir, exist_ok=True)
+        self.downloaded: Set[str] = set()
+        self.indexes: Set[str] = set()
+        self.complete: Set[str] = set()
+
+    def _index_keys(self) -> List[str]:
+        """Chunk index keys under the incident prefix."""
+        paginator = self.s3.get_paginator("list_objects_v2")
+        return [
+            obj["Key"]
+            for page in paginator.paginate(
+                Bucket=self.bucket, Prefix=f"{self.incident_id}/"
+            )
+            for obj in page.get("Contents", [])
+            if obj["Key"].endswith(CHUNK_INDEX_SUFFIX)
+        ]
+
+    def _read_index(self, key: str) -> Tuple[List[Dict], bool]:
+        """Chunk entries of an index and whether the capture has completed."""
+        body = self.s3.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        entries = []
+        complete = False
+        for line in body.decode().splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get("complete"):
+                complete = True
+            elif "chunk" in entry:
+                entries.append(entry)
+        return entries, complete
+
+    def _download(self, key: str, entry: Dict) -> Optional[str]:
+        """Download a chunk and check its SHA-256 against the index."""
+        path = os.path.join(self.dest_dir, key.replace("/", "_"))
+        try:
+            self.s3.download_file(self.bucket, key, path)
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            if entry.get("sha256") and digest.hexdigest() != entry["sha256"]:
+                raise ValueError("SHA-256 does not match the chunk index")
+        except Exception as e:
+            logger.warning(f"Could not download chunk {key}, will retry: {e}")
+            if os.path.exists(path):
+                os.remove(path)
+            return None
+        self.downloaded.add(key)
+        return path
+
+    def poll_once(self) -> List[str]:
+        """
+        Download the chunks listed since the last poll.
+
+        Returns:
+            Local paths of newly downloaded chunks, in index order
+        """
+        self.indexes.update(self._index_keys())
+        pending = []
+        finished: Dict[str, List[str]] = {}
+        for index_key in sorted(self.indexes - self.complete):
+            prefix = index_key[: -len("index.jsonl")]
+            entries, complete = self._read_index(index_key)
+            keys = [prefix + entry["chunk"] for entry in entries]
+            pending.extend(
+                (key, entry)
+                for key, entry in zip(keys, entries)
+                if key not in self.downloaded
+            )
+            if complete:
+                finished[index_key] = keys
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            paths = list(executor.map(lambda item: self._download(*item), pending))
+
+        # A capture is done once its last chunks are downloaded as well
+        for index_key, keys in finished.items():
+            if self.downloaded.issuperset(keys):
+                self.complete.add(index_key)
+        return [p for p in paths if p]
+
+    def follow(
+        self,
+        on_chunk: Callable[[str], None],
+        poll_interval: float = 5.0,
+        idle_timeout: float = 600.0,
+    ) -> List[str]:
+        """
+        Poll chunk indexes until every capture completes.
+
+        Args:
+            on_chunk: Called with the local path of each new chunk
+            poll_interval: Seconds between polls
+            idle_timeout: Stop after this many seconds without a new chunk
+
+        Returns:
+            Local paths of every downloaded chunk
+        """
+        paths: List[str] = []
+        last_chunk = time.time()
+        while True:
+            new = self.poll_once()
+            for path in new:
+                on_chunk(path)
+            paths.extend(new)
+            if new:
+                last_chunk = time.time()
+                logger.info(
+                    f"{len(paths)} chunks downloaded, "
+                    f"{len(self.complete)}/{len(self.indexes)} captures complete"
+                )
+
+            if self.indexes and self.complete >= self.indexes:
+                return paths
+            if time.time() - last_chunk >= idle_timeout:
+                logger.warning(f"No new chunks for {idle_timeout:.0f}s, stopping")
+                return paths
+            time.sleep(poll_interval)
+
+
+def download_captures(
+    incident_id: str,
+    dest_dir: str,
+    bucket: str = "incident-evidence",
+    suffix: str = ".pcap",
+    name_prefix: str = "",
+    workers: int = 8,
+) -> List[str]:
+    """
+    Download an incident's capture files from the evidence bucket.
+
+    Args:
+        incident_id: Incident whose captures to download
+        dest_dir: Local directory for the files
+        bucket: Evidence bucket
+        suffix: Key suffix of the files to download
+        name_prefix: File name prefix of the files to download (e.g. "dns-")
+        workers: Concurrent downloads
+
+    Returns:
+        Local paths of the downloaded files
+    """
+    s3 = boto3.client("s3")
+    keys = [
+        obj["Key"]
+        for page in s3.get_paginator("list_objects_v2").paginate(
+            Bucket=bucket, Prefix=f"{incident_id}/"
+        )
+        for obj in page.get("Contents", [])
+        if obj["Key"].endswith(suffix)
+        and os.path.basename(obj["Key"]).startswith(name_prefix)
+    ]
+    logger.info(f"Downloading {len(keys)} captures from s3://{bucket}/{incident_id}/")
+
+    def download(key: str) -> str:
+        path = os.path.join(dest_dir, key.replace("/", "_"))
+        s3.download_file(bucket, key, path)
+        return path
+
+    os.makedirs(dest_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sorted(executor.map(download, keys))
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Aggregate pcap captures into flows and top talkers"
+    )
+    parser.add_argument("--pcaps", nargs="*", default=[], help="Local pcap files")
+    parser.add_argument(
+        "--incident-id", help="Download this incident's captures from S3 first"
+    )
+    parser.add_argument(
+        "--bucket", default="incident-evidence", help="Evidence bucket to download from"
+    )
+    parser.add_argument(
+        "--download-dir", default="./incident-pcaps", help="Directory for downloads"
+    )
+    parser.add_argument(
+        "--flows-dir", help="Write every flow as JSON lines to this directory"
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Follow the incident's rotating capture chunks as they are uploaded",
+    )
+    parser.add_argument(
+        "--follow-idle",
+        type=float,
+        default=600.0,
+        help="Stop following after this many seconds without a new chunk",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="Seconds without packets after which a flow ends",
+    )
+    parser.add_argument(
+        "--max-flows",
+        type=int,
+        default=DEFAULT_MAX_FLOWS,
+        help="Most flows held in memory per file",
+    )
+    parser.add_argument(
+        "--top", type=int, default=DEFAULT_TOP_N, help="Top flows and talkers to show"
+    )
+
+    args = parser.parse_args()
+
+    analyzer = PcapFlowAnalyzer(args.idle_timeout, args.max_flows, args.top)
+
+    if args.follow:
+        if not args.incident_id:
+            parser.error("--follow requires --incident-id")
+        follower = ChunkFollower(args.incident_id, args.download_dir, args.bucket)
+        results = analyzer.analyze_following(
+            follower, args.workers, args.flows_dir, idle_timeout=args.follow_idle
+        )
+    else:
+        paths = list(args.pcaps)
+        if args.incident_id:
+            paths += download_captures(args.incident_id, args.download_dir, args.bucket)
+        if not paths:
+            parser.error("no pcap files given (use --pcaps or --incident-id)")
+        results = analyzer.analyze_files(paths, args.workers, args.flows_dir)
+
+    print(json.dumps(results, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
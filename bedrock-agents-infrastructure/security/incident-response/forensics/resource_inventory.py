@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Shared resource inventory for incident forensics.
+
+The forensics scripts all need the same discovery data: instances, volumes,
+VPCs, flow logs, databases, buckets and log groups. ResourceInventory loads
+each kind once with paginated bulk calls, caches it on disk per incident,
+account and region with a TTL, and answers lookups from in-memory indexes,
+so running several scripts for one incident discovers the account only once.
+Liveness checks such as instance state go to AWS with refresh_instances().
+
+Usage:
+    python3 resource_inventory.py --incident-id INCIDENT123 --refresh
+"""
+
+import argparse
+import json
+import boto3
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# How each kind is discovered: service, paginated operation, result key
+# and the field that identifies an item
+INVENTORY_KINDS = {
+    "instances": ("ec2", "describe_instances", "Reservations", "InstanceId"),
+    "volumes": ("ec2", "describe_volumes", "Volumes", "VolumeId"),
+    "vpcs": ("ec2", "describe_vpcs", "Vpcs", "VpcId"),
+    "flow_logs": ("ec2", "describe_flow_logs", "FlowLogs", "FlowLogId"),
+    "db_instances": (
+        "rds",
+        "describe_db_instances",
+        "DBInstances",
+        "DBInstanceIdentifier",
+    ),
+    "buckets": ("s3", "list_buckets", "Buckets", "Name"),
+    "log_groups": ("logs", "describe_log_groups", "logGroups", "logGroupName"),
+}
+
+DEFAULT_INVENTORY_TTL = 900
+
+# Instance IDs per describe_instances filter in refresh_instances()
+INSTANCE_FILTER_BATCH = 200
+
+
+class ResourceInventory:
+    """Loads and caches the incident's resource inventory."""
+
+    def __init__(
+        self,
+        incident_id: str,
+        cache_dir: Optional[str] = None,
+        ttl: float = DEFAULT_INVENTORY_TTL,
+    ):
+        """
+        Initialize resource inventory.
+
+        Args:
+            incident_id: Unique incident identifier
+            cache_dir: Directory for the on-disk cache (memory only if None)
+            ttl: Seconds a cached kind stays valid
+        """
+        self.incident_id = incident_id
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        # Resolved on first cache access, once the account is known
+        self.cache_path: Optional[str] = None
+
+        self._clients: Dict[str, Any] = {}
+        self._items: Dict[str, List[Dict]] = {}
+        self._index: Dict[str, Dict[str, Dict]] = {}
+        self._loaded_at: Dict[str, float] = {}
+
+        # Kinds fetched from AWS by this process (not read from the cache)
+        self._live: set = set()
+        self._lock = threading.RLock()
+
+    def _client(self, service: str) -> Any:
+        """AWS client for a service, created on first use."""
+        if service not in self._clients:
+            self._clients[service] = boto3.client(service)
+        return self._clients[service]
+
+    def _fetch(self, kind: str) -> List[Dict]:
+        """Discover every item of a kind with paginated bulk calls."""
+        service, operation, key, _ = INVENTORY_KINDS[kind]
+        client = self._client(service)
+
+        if kind == "buckets":
+            return client.list_buckets().get(key, [])
+
+        items = []
+        for page in client.get_paginator(operation).paginate():
+            if kind == "instances":
+                for reservation in page.get(key, []):
+                    items.extend(reservation.get("Instances", []))
+            else:
+                items.extend(page.get(key, []))
+        return items
+
+    def _cache_file(self) -> Optional[str]:
+        """
+        Path of the on-disk cache for this incident, account and region.
+
+        One incident can span several accounts and regions, so the cache is
+        only used once the caller identity is known (memory only otherwise).
+        """
+        if self.cache_path or not self.cache_dir:
+            return self.cache_path
+        try:
+            account = self._client("sts").get_caller_identity()["Account"]
+            region = self._client("ec2").meta.region_name
+        except Exception as e:
+            logger.warning(f"Not caching inventory, caller identity unknown: {e}")
+            self.cache_dir = None
+            return None
+        self.cache_path = os.path.join(
+            self.cache_dir, f"{self.incident_id}-{account}-{region}-inventory.json"
+        )
+        return self.cache_path
+
+    def _read_cache(self) -> Dict:
+        """Read the on-disk cache, if any."""
+        if not self._cache_file() or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f).get("kinds", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable inventory cache: {e}")
+            return {}
+
+    def _write_cache(self, kind: str) -> None:
+        """Merge one kind into the on-disk cache, keeping the other kinds."""
+        if not self._cache_file():
+            return
+        kinds = self._read_cache()
+        kinds[kind] = {"loaded_at": self._loaded_at[kind], "items": self._items[kind]}
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"incident_id": self.incident_id, "kinds": kinds}, f, default=str)
+        os.replace(tmp_path, self.cache_path)
+
+    def _set(self, kind: str, items: List[Dict], loaded_at: float) -> None:
+        """Store a kind's items and rebuild its index."""
+        id_field = INVENTORY_KINDS[kind][3]
+        self._items[kind] = items
+        self._index[kind] = {item[id_field]: item for item in items}
+        self._loaded_at[kind] = loaded_at
+
+    def load(self, kind: str, refresh: bool = False) -> List[Dict]:
+        """
+        Items of one kind, from memory, the disk cache or AWS.
+
+        Args:
+            kind: One of INVENTORY_KINDS
+            refresh: Ignore cached data and discover again
+
+        Returns:
+            List of raw describe items
+        """
+        with self._lock:
+            now = time.time()
+            if not refresh and now - self._loaded_at.get(kind, 0) < self.ttl:
+                return self._items[kind]
+
+            if not refresh:
+                cached = self._read_cache().get(kind)
+                if cached and now - cached["loaded_at"] < self.ttl:
+                    self._set(kind, cached["items"], cached["loaded_at"])
+                    return self._items[kind]
+
+            logger.info(f"Discovering {kind}")
+            # Round-trip through JSON so live and cached items look the same
+            items = json.loads(json.dumps(self._fetch(kind), default=str))
+            self._set(kind, items, now)
+            self._live.add(kind)
+            self._write_cache(kind)
+            return items
+
+    def load_all(self, refresh: bool = False) -> Dict[str, int]:
+        """Load every kind; returns the item count per kind."""
+        return {kind: len(self.load(kind, refresh)) for kind in INVENTORY_KINDS}
+
+    def get(self, kind: str, resource_id: str) -> Optional[Dict]:
+        """
+        Look up one item by ID.
+
+        A miss on cached data discovers the kind again once, so resources
+        created after the cache was written are still found.
+        """
+        with self._lock:
+            self.load(kind)
+            item = self._index[kind].get(resource_id)
+            if item is None and kind not in self._live:
+                self.load(kind, refresh=True)
+                item = self._index[kind].get(resource_id)
+            return item
+
+    def ids(self, kind: str) -> List[str]:
+        """IDs of every item of a kind."""
+        self.load(kind)
+        return list(self._index[kind])
+
+    def instance(self, instance_id: str) -> Optional[Dict]:
+        """EC2 instance by ID."""
+        return self.get("instances", instance_id)
+
+    def refresh_instances(self, instance_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Describe EC2 instances now, whatever the age of the cached data.
+
+        For liveness checks: a cached state can be up to the TTL old. The
+        fresh items replace the cached ones in memory.
+
+        Args:
+            instance_ids: EC2 instance IDs
+
+        Returns:
+            {instance_id: instance} for the IDs that still exist
+        """
+        client = self._client("ec2")
+        paginator = client.get_paginator("describe_instances")
+        fresh = {}
+        # A filter skips IDs that no longer exist where InstanceIds fails
+        for i in range(0, len(instance_ids), INSTANCE_FILTER_BATCH):
+            batch = instance_ids[i : i + INSTANCE_FILTER_BATCH]
+            for page in paginator.paginate(
+                Filters=[{"Name": "instance-id", "Values": batch}]
+            ):
+                for reservation in page.get("Reservations", []):
+                    for instance in reservation.get("Instances", []):
+                        fresh[instance["InstanceId"]] = instance
+        fresh = json.loads(json.dumps(fresh, default=str))
+
+        with self._lock:
+            index = self._index.get("instances")
+            if index is not None:
+                index.update(fresh)
+                self._items["instances"] = list(index.values())
+        return fresh
+
+    def instance_ids(self, state: Optional[str] = None) -> List[str]:
+        """EC2 instance IDs, optionally only those in one state."""
+        return [
+            i["InstanceId"]
+            for i in self.load("instances")
+            if state is None or i.get("State", {}).get("Name") == state
+        ]
+
+    def volumes(self, volume_ids: Optional[List[str]] = None) -> List[Dict]:
+        """EBS volumes, all or the given IDs."""
+        if volume_ids is None:
+            return list(self.load("volumes"))
+        return [v for v in (self.get("volumes", i) for i in volume_ids) if v]
+
+    def vpc_ids(self) -> List[str]:
+        """VPC IDs."""
+        return self.ids("vpcs")
+
+    def flow_logs(self, resource_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Flow logs, all or those attached to the given resources."""
+        flow_logs = self.load("flow_logs")
+        if resource_ids is None:
+            return list(flow_logs)
+        wanted = set(resource_ids)
+        return [fl for fl in flow_logs if fl.get("ResourceId") in wanted]
+
+    def db_instance_ids(self) -> List[str]:
+        """RDS DB instance identifiers."""
+        return self.ids("db_instances")
+
+    def db_instances(self, db_ids: Optional[List[str]] = None) -> List[Dict]:
+        """RDS DB instances, all or the given identifiers."""
+        if db_ids is None:
+            return list(self.load("db_instances"))
+        return [d for d in (self.get("db_instances", i) for i in db_ids) if d]
+
+    def bucket_names(self) -> List[str]:
+        """S3 bucket names."""
+        return self.ids("buckets")
+
+    def log_group_names(self, prefix: str = "") -> List[str]:
+        """CloudWatch log group names, optionally under a prefix."""
+        return [name for name in self.ids("log_groups") if name.startswith(prefix)]
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Discover and cache the resource inventory for an incident"
+    )
+    parser.add_argument("--incident-id", required=True, help="Incident identifier")
+    parser.add_argument(
+        "--cache-dir", default="./incident-inventory", help="Inventory cache directory"
+    )
+    parser.add_argument(
+        "--ttl",
+        type=float,
+        default=DEFAULT_INVENTORY_TTL,
+        help="Seconds cached inventory stays valid",
+    )
+    parser.add_argument(
+        "--refresh", action="store_true", help="Discover again, ignoring the cache"
+    )
+
+    args = parser.parse_args()
+
+    inventory = ResourceInventory(args.incident_id, args.cache_dir, args.ttl)
+    counts = inventory.load_all(refresh=args.refresh)
+
+    print(json.dumps({"incident_id": args.incident_id, "counts": counts}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -10,40 +10,961 @@ Usage:
 """
 
 import argparse
+import base64
+import glob
+import gzip
+import hashlib
 import json
 import boto3
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 import time
 
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from resource_inventory import DEFAULT_INVENTORY_TTL, ResourceInventory
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Errors from snapshot creation that clear up if we wait and retry
+RETRYABLE_SNAPSHOT_ERRORS = {
+    "SnapshotCreationPerVolumeRateExceeded",
+    "ConcurrentSnapshotLimitExceeded",
+    "RequestLimitExceeded",
+    "Throttling",
+    "ThrottlingException",
+}
+
+# The concurrent-snapshot limit only frees up as pending snapshots finish,
+# so back off from it much longer than from plain rate limits
+BACKOFF_BASE_SECONDS = {"ConcurrentSnapshotLimitExceeded": 30.0}
+DEFAULT_BACKOFF_BASE_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 300.0
+
+# Objects above this size are copied with multipart upload_part_copy
+# (copy_object itself stops at 5 GiB)
+MULTIPART_COPY_THRESHOLD = 1024**3
+MULTIPART_PART_SIZE = 256 * 1024**2
+MAX_MULTIPART_PARTS = 10000
+MULTIPART_PART_WORKERS = 8
+
+# Concurrent copy calls per bucket, and prefix listings feeding them
+DEFAULT_COPY_WORKERS = 16
+PREFIX_LISTING_WORKERS = 8
+
+# Snapshot states from an earlier run that can stand in for a new snapshot
+REUSABLE_EBS_STATES = ["pending", "completed"]
+REUSABLE_RDS_STATES = {"creating", "available"}
+
+# CloudWatch publishes NumberOfObjects once a day; older datapoints are stale
+BUCKET_METRIC_LOOKBACK = timedelta(days=3)
+COUNT_LISTING_WORKERS = 16
+
+# EBS direct API block fetches in flight per exported image, and the
+# attempts allowed for a block whose checksum does not match
+EXPORT_BLOCK_WORKERS = 32
+EXPORT_BLOCK_ATTEMPTS = 3
+
+# Rough planning figures for --plan: seconds per create call, seconds per
+# S3 object copy, and how fast a first full snapshot of a volume completes
+PLAN_SECONDS_PER_CALL = 0.5
+PLAN_SECONDS_PER_COPY = 0.1
+PLAN_SNAPSHOT_GIB_PER_HOUR = 100.0
+
+# Final state for a tracked snapshot the describe calls stop returning
+# (deleted or deregistered), after this many polling rounds in a row; a
+# snapshot created moments ago can briefly be missing too
+NOT_FOUND_STATE = "not_found"
+NOT_FOUND_POLLS = 2
+
+# How each snapshot kind is tracked: the manifest fields holding its ID and
+# state, the states that end tracking, and the IDs per describe call
+TRACKED_SNAPSHOTS = {
+    "ebs": {
+        "id_field": "snapshot_id",
+        "state_field": "state",
+        "done": {"completed"},
+        "failed": {"error", "recoverable", "recovering", NOT_FOUND_STATE},
+        "batch_size": 200,
+    },
+    "rds": {
+        "id_field": "snapshot_id",
+        "state_field": "status",
+        "done": {"available"},
+        "failed": {
+            "failed",
+            "incompatible-restore",
+            "incompatible-parameters",
+            NOT_FOUND_STATE,
+        },
+        "batch_size": 100,
+    },
+    "ami": {
+        "id_field": "ami_id",
+        "state_field": "state",
+        "done": {"available"},
+        "failed": {"failed", "invalid", "error", "deregistered", NOT_FOUND_STATE},
+        "batch_size": 200,
+    },
+}
+
+# Resource types snapshot_all can run, and the filter keys that select them
+RESOURCE_TYPES = {
+    "ebs": "volume_ids",
+    "rds": "db_instances",
+    "ec2": "instance_ids",
+    "s3": "buckets",
+}
+
+
+class SnapshotCompletionTracker:
+    """
+    Tracks forensic snapshots until they complete.
+
+    Pending EBS snapshots, RDS snapshots and AMIs are polled in batches
+    (up to hundreds of IDs per describe call) instead of one waiter per
+    resource. The poll interval grows while nothing changes and backs off
+    on throttling. Manifest entries are updated in place with state,
+    progress, ETA and completion time.
+    """
+
+    def __init__(
+        self,
+        ec2: Any,
+        rds: Any,
+        poll_interval: float = 15.0,
+        max_poll_interval: float = 120.0,
+    ):
+        """
+        Initialize completion tracker.
+
+        Args:
+            ec2: EC2 client
+            rds: RDS client
+            poll_interval: Initial seconds between polling rounds
+            max_poll_interval: Upper bound for the growing poll interval
+        """
+        self.ec2 = ec2
+        self.rds = rds
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+
+        # First observation per snapshot ID: (time, progress percent)
+        self._first_seen: Dict[str, tuple] = {}
+
+        # Consecutive polling rounds each snapshot ID was missing from
+        self._missing: Dict[str, int] = {}
+
+    def _describe_ebs(self, ids: List[str]) -> Dict[str, tuple]:
+        """Return {snapshot_id: (state, progress)} for EBS snapshots."""
+        # A filter skips deleted IDs where SnapshotIds fails the whole batch
+        states = {}
+        paginator = self.ec2.get_paginator("describe_snapshots")
+        for page in paginator.paginate(
+            OwnerIds=["self"], Filters=[{"Name": "snapshot-id", "Values": ids}]
+        ):
+            for snap in page.get("Snapshots", []):
+                states[snap["SnapshotId"]] = (
+                    snap["State"],
+                    float(str(snap.get("Progress") or "0").rstrip("%") or 0),
+                )
+        return states
+
+    def _describe_rds(self, ids: List[str]) -> Dict[str, tuple]:
+        """Return {snapshot_id: (status, progress)} for RDS snapshots."""
+        states = {}
+        paginator = self.rds.get_paginator("describe_db_snapshots")
+        for page in paginator.paginate(
+            Filters=[{"Name": "db-snapshot-id", "Values": ids}]
+        ):
+            for snap in page.get("DBSnapshots", []):
+                states[snap["DBSnapshotIdentifier"]] = (
+                    snap["Status"],
+                    float(snap.get("PercentProgress", 0)),
+                )
+        return states
+
+    def _describe_ami(self, ids: List[str]) -> Dict[str, tuple]:
+        """Return {image_id: (state, progress)} for AMIs."""
+        states = {}
+        paginator = self.ec2.get_paginator("describe_images")
+        for page in paginator.paginate(
+            Owners=["self"], Filters=[{"Name": "image-id", "Values": ids}]
+        ):
+            for image in page.get("Images", []):
+                states[image["ImageId"]] = (
+                    image["State"],
+                    100.0 if image["State"] == "available" else 0.0,
+                )
+        return states
+
+    def _eta(self, snapshot_id: str, progress: float, now: float) -> Optional[float]:
+        """Estimate seconds to completion from the observed progress rate."""
+        first_time, first_progress = self._first_seen.setdefault(
+            snapshot_id, (now, progress)
+        )
+        if progress >= 100:
+            return 0.0
+        if now <= first_time or progress <= first_progress:
+            return None
+        rate = (progress - first_progress) / (now - first_time)
+        return round((100 - progress) / rate, 1)
+
+    def poll_once(self, snapshots: Dict[str, List]) -> Dict:
+        """
+        Poll every pending snapshot once and update the entries in place.
+
+        Returns:
+            Progress summary per snapshot kind
+        """
+        describers = {
+            "ebs": self._describe_ebs,
+            "rds": self._describe_rds,
+            "ami": self._describe_ami,
+        }
+        now = time.time()
+        summary: Dict[str, Any] = {}
+
+        for kind, spec in TRACKED_SNAPSHOTS.items():
+            entries = [
+                entry
+                for entry in snapshots.get(kind, [])
+                if entry.get(spec["id_field"]) and "error" not in entry
+            ]
+            pending = {
+                entry[spec["id_field"]]: entry
+                for entry in entries
+                if "final_state" not in entry
+            }
+            ids = list(pending)
+
+            for i in range(0, len(ids), spec["batch_size"]):
+                batch = ids[i : i + spec["batch_size"]]
+                states = describers[kind](batch)
+                for snapshot_id in batch:
+                    if snapshot_id in states:
+                        self._missing.pop(snapshot_id, None)
+                        continue
+                    self._missing[snapshot_id] = self._missing.get(snapshot_id, 0) + 1
+                    if self._missing[snapshot_id] >= NOT_FOUND_POLLS:
+                        entry = pending[snapshot_id]
+                        entry[spec["state_field"]] = NOT_FOUND_STATE
+                        entry["final_state"] = NOT_FOUND_STATE
+                        entry["completed_time"] = datetime.utcnow().isoformat()
+                        entry["eta_seconds"] = 0.0
+
+                for snapshot_id, (state, progress) in states.items():
+                    entry = pending[snapshot_id]
+                    entry[spec["state_field"]] = state
+                    entry["progress"] = f"{progress:.0f}%"
+                    entry["eta_seconds"] = self._eta(snapshot_id, progress, now)
+
+                    if state in spec["done"] or state in spec["failed"]:
+                        entry["final_state"] = state
+                        entry["completed_time"] = datetime.utcnow().isoformat()
+                        entry["eta_seconds"] = 0.0
+
+            finished = [e for e in entries if "final_state" in e]
+            etas = [
+                e["eta_seconds"]
+                for e in entries
+                if "final_state" not in e and e.get("eta_seconds") is not None
+            ]
+            summary[kind] = {
+                "total": len(entries),
+                "completed": sum(e["final_state"] in spec["done"] for e in finished),
+                "failed": sum(e["final_state"] in spec["failed"] for e in finished),
+                "pending": len(entries) - len(finished),
+                "eta_seconds": max(etas) if etas else None,
+            }
+
+        return summary
+
+    def track(
+        self,
+        snapshots: Dict[str, List],
+        timeout: Optional[float] = None,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict:
+        """
+        Poll until every snapshot reaches a final state or time runs out.
+
+        Args:
+            snapshots: Manifest snapshot lists keyed by kind, updated in place
+            timeout: Maximum seconds to wait (no limit if None)
+            on_progress: Called with the summary after every round
+
+        Returns:
+            Final progress summary
+        """
+        started = time.time()
+        interval = self.poll_interval
+        previous = None
+
+        while True:
+            try:
+                summary = self.poll_once(snapshots)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in RETRYABLE_SNAPSHOT_ERRORS:
+                    raise
+                interval = min(self.max_poll_interval, interval * 2)
+                logger.warning(f"{code} while polling, backing off to {interval:.0f}s")
+                time.sleep(interval)
+                continue
+
+            pending = sum(kind["pending"] for kind in summary.values())
+            logger.info(
+                "Snapshot progress: "
+                + ", ".join(
+                    f"{kind} {s['completed']}/{s['total']} done"
+                    + (f" (ETA {s['eta_seconds']:.0f}s)" if s["eta_seconds"] else "")
+                    for kind, s in summary.items()
+                    if s["total"]
+                )
+            )
+            if on_progress:
+                on_progress(summary)
+
+            elapsed = time.time() - started
+            summary_state = {"pending": pending, "elapsed_seconds": round(elapsed, 1)}
+            if not pending:
+                return {**summary, **summary_state, "timed_out": False}
+            if timeout is not None and elapsed >= timeout:
+                return {**summary, **summary_state, "timed_out": True}
+
+            # Poll less often while nothing is changing
+            if summary == previous:
+                interval = min(self.max_poll_interval, interval * 1.5)
+            else:
+                interval = self.poll_interval
+            previous = summary
+
+            sleep_for = interval
+            if timeout is not None:
+                sleep_for = min(sleep_for, max(0.0, timeout - elapsed))
+            time.sleep(sleep_for)
+
+
+class SnapshotImageExporter:
+    """
+    Exports EBS snapshots to local raw images with the EBS direct APIs.
+
+    Blocks are fetched concurrently with get_snapshot_block and written at
+    their offsets into a sparse file, so unallocated space is never
+    downloaded. Each block is checked against the SHA256 the API returns
+    and recorded in a block manifest next to the image. When an image of
+    an earlier snapshot of the same volume exists, its blocks are copied
+    locally and only the blocks list_changed_blocks reports are fetched.
+    """
+
+    def __init__(self, output_dir: str, max_workers: int = EXPORT_BLOCK_WORKERS):
+        """
+        Initialize image exporter.
+
+        Args:
+            output_dir: Directory for images and block manifests
+            max_workers: Concurrent block fetches
+        """
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        # One connection per block fetch worker (botocore keeps 10 by default)
+        self.ebs = boto3.client("ebs", config=Config(max_pool_connections=max_workers))
+
+        # (volume size in GiB, block size) reported by the last block listing
+        self._geometry = (0, 0)
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def _paths(self, snapshot_id: str) -> Tuple[str, str]:
+        """Image and block manifest paths for a snapshot."""
+        base = os.path.join(self.output_dir, snapshot_id)
+        return f"{base}.raw", f"{base}.blocks.json"
+
+    def find_base_image(self, volume_id: str, before: str) -> Optional[Dict]:
+        """
+        Latest exported image of a volume taken before a given time.
+
+        Args:
+            volume_id: Source volume of the snapshot being exported
+            before: Snapshot creation time (ISO format) to look before
+
+        Returns:
+            Block manifest of the base image, or None
+        """
+        candidates = []
+        for path in glob.glob(os.path.join(self.output_dir, "*.blocks.json")):
+            with open(path) as f:
+                manifest = json.load(f)
+            image_path, _ = self._paths(manifest["snapshot_id"])
+            if (
+                manifest.get("volume_id") == volume_id
+                and manifest.get("created_time", "") < before
+                and os.path.exists(image_path)
+            ):
+                candidates.append(manifest)
+        return max(candidates, key=lambda m: m["created_time"], default=None)
+
+    def _iter_blocks(self, snapshot_id: str) -> Iterator[Tuple[int, Optional[str]]]:
+        """Yield (block index, token) for every allocated block."""
+        kwargs = {"SnapshotId": snapshot_id}
+        while True:
+            response = self.ebs.list_snapshot_blocks(**kwargs)
+            self._geometry = (response["VolumeSize"], response["BlockSize"])
+            for block in response.get("Blocks", []):
+                yield block["BlockIndex"], block["BlockToken"]
+            if not response.get("NextToken"):
+                return
+            kwargs["NextToken"] = response["NextToken"]
+
+    def _iter_changed_blocks(
+        self, base_snapshot_id: str, snapshot_id: str
+    ) -> Iterator[Tuple[int, Optional[str]]]:
+        """
+        Yield (block index, token) for blocks changed since the base.
+
+        The token is None for blocks that are no longer allocated.
+        """
+        kwargs = {"FirstSnapshotId": base_snapshot_id, "SecondSnapshotId": snapshot_id}
+        while True:
+            response = self.ebs.list_changed_blocks(**kwargs)
+            self._geometry = (response["VolumeSize"], response["BlockSize"])
+            for block in response.get("ChangedBlocks", []):
+                yield block["BlockIndex"], block.get("SecondBlockToken")
+            if not response.get("NextToken"):
+                return
+            kwargs["NextToken"] = response["NextToken"]
+
+    def _fetch_block(self, snapshot_id: str, index: int, token: str) -> bytes:
+        """Download one block and verify it against the API checksum."""
+        for attempt in range(1, EXPORT_BLOCK_ATTEMPTS + 1):
+            response = self.ebs.get_snapshot_block(
+                SnapshotId=snapshot_id, BlockIndex=index, BlockToken=token
+            )
+            data = response["BlockData"].read()
+            checksum = base64.b64encode(hashlib.sha256(data).digest()).decode()
+            if checksum == response.get("Checksum", checksum):
+                return data
+            logger.warning(
+                f"Checksum mismatch on block {index} of {snapshot_id} "
+                f"(attempt {attempt})"
+            )
+        raise ValueError(f"Block {index} of {snapshot_id} failed checksum checks")
+
+    def export(self, snapshot: Dict) -> Dict:
+        """
+        Export one completed EBS snapshot to a local raw image.
+
+        Args:
+            snapshot: Snapshot manifest entry (snapshot_id, volume_id,
+                created_time)
+
+        Returns:
+            Export result with image path, block counts and digest
+        """
+        snapshot_id = snapshot["snapshot_id"]
+        image_path, manifest_path = self._paths(snapshot_id)
+        base = self.find_base_image(
+            snapshot.get("volume_id", ""), snapshot.get("created_time", "")
+        )
+
+        # Blocks the snapshot does not allocate must read as zeros, so the
+        # image is written from scratch and only replaces an earlier image
+        # once every block has been written
+        partial_path = image_path + ".partial"
+        try:
+            block_hashes: Dict[str, Optional[str]] = {}
+            fd = os.open(partial_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                copied = 0
+                if base:
+                    # Start from the base image, copying only its allocated blocks
+                    base_image, _ = self._paths(base["snapshot_id"])
+                    base_fd = os.open(base_image, os.O_RDONLY)
+                    try:
+                        block_size = base["block_size"]
+                        for index, digest in base["blocks"].items():
+                            offset = int(index) * block_size
+                            os.pwrite(fd, os.pread(base_fd, block_size, offset), offset)
+                            block_hashes[index] = digest
+                            copied += 1
+                    finally:
+                        os.close(base_fd)
+                    blocks = self._iter_changed_blocks(base["snapshot_id"], snapshot_id)
+                else:
+                    blocks = self._iter_blocks(snapshot_id)
+
+                lock = threading.Lock()
+                slots = threading.BoundedSemaphore(self.max_workers * 4)
+                fetched = {"blocks": 0, "bytes": 0}
+
+                def fetch(index: int, token: Optional[str]) -> None:
+                    try:
+                        _, block_size = self._geometry
+                        if token is None:
+                            # Block was released since the base snapshot
+                            os.pwrite(fd, bytes(block_size), index * block_size)
+                            digest = None
+                        else:
+                            data = self._fetch_block(snapshot_id, index, token)
+                            os.pwrite(fd, data, index * block_size)
+                            digest = hashlib.sha256(data).hexdigest()
+                        with lock:
+                            block_hashes[str(index)] = digest
+                            fetched["blocks"] += 1
+                            fetched["bytes"] += 0 if token is None else len(data)
+                    finally:
+                        slots.release()
+
+                with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                    futures = []
+                    for index, token in blocks:
+                        slots.acquire()
+                        futures.append(executor.submit(fetch, index, token))
+                    for future in futures:
+                        future.result()
+
+                volume_size_gib, block_size = self._geometry
+                os.ftruncate(fd, volume_size_gib * 1024**3)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(partial_path, image_path)
+
+            # Released blocks stay zeroed in the image but drop out of the map
+            blocks_map = {
+                index: digest
+                for index, digest in sorted(
+                    block_hashes.items(), key=lambda b: int(b[0])
+                )
+                if digest is not None
+            }
+            digest = hashlib.sha256(
+                "".join(f"{i}:{d}\n" for i, d in blocks_map.items()).encode()
+            ).hexdigest()
+
+            manifest = {
+                "snapshot_id": snapshot_id,
+                "volume_id": snapshot.get("volume_id"),
+                "created_time": snapshot.get("created_time"),
+                "volume_size_gib": volume_size_gib,
+                "block_size": block_size,
+                "base_snapshot_id": base["snapshot_id"] if base else None,
+                "block_map_sha256": digest,
+                "blocks": blocks_map,
+            }
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f)
+
+            logger.info(
+                f"Exported {snapshot_id} to {image_path}: {fetched['blocks']} "
+                f"blocks fetched, {copied} copied from base image"
+            )
+            return {
+                "snapshot_id": snapshot_id,
+                "image_path": image_path,
+                "block_manifest": manifest_path,
+                "base_snapshot_id": manifest["base_snapshot_id"],
+                "blocks_fetched": fetched["blocks"],
+                "blocks_copied": copied,
+                "bytes_fetched": fetched["bytes"],
+                "allocated_blocks": len(blocks_map),
+                "block_map_sha256": digest,
+            }
+
+        except Exception as e:
+            logger.error(f"Error exporting {snapshot_id}: {e}")
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            return {"snapshot_id": snapshot_id, "error": str(e)}
+
 
 class ResourceSnapshotManager:
     """Manages creation of resource snapshots for forensics."""
 
-    def __init__(self, incident_id: str):
-        """Initialize snapshot manager."""
+    def __init__(
+        self,
+        incident_id: str,
+        max_in_flight: int = 10,
+        max_retries: int = 8,
+        reuse_within_hours: float = 24.0,
+        inventory: Optional[ResourceInventory] = None,
+    ):
+        """
+        Initialize snapshot manager.
+
+        Args:
+            incident_id: Unique incident identifier
+            max_in_flight: Maximum snapshot API calls in flight at once
+            max_retries: Retries for throttled or limit-exceeded calls
+            reuse_within_hours: Reuse this incident's snapshots taken within
+                this many hours instead of snapshotting again (0 disables)
+            inventory: Shared resource inventory (in-memory one if None)
+        """
         self.incident_id = incident_id
         self.timestamp = datetime.utcnow().isoformat()
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.reuse_within = timedelta(hours=reuse_within_hours)
+        self.inventory = inventory or ResourceInventory(incident_id)
+
+        # Snapshots from earlier runs for this incident, loaded on first use
+        self._existing: Optional[Dict[str, Dict]] = None
+
+        # Caps concurrent create calls across all snapshot workers
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
 
         # Initialize AWS clients
         self.ec2 = boto3.client("ec2")
         self.rds = boto3.client("rds")
-        self.s3 = boto3.client("s3")
+        # Enough connections for the parallel listings that count objects;
+        # grown by _grow_s3_pool() before copying evidence
+        self._s3_pool_size = COUNT_LISTING_WORKERS
+        self.s3 = boto3.client(
+            "s3", config=Config(max_pool_connections=self._s3_pool_size)
+        )
 
         self.snapshots: Dict[str, List] = {"ebs": [], "rds": [], "s3": [], "ami": []}
 
-    def snapshot_ebs_volumes(self, volume_ids: Optional[List[str]] = None) -> Dict:
+        # CloudWatch clients per bucket region, for bucket metrics
+        self._cloudwatch: Dict[str, Any] = {}
+
+        # Latest completion summary from wait_for_completion()
+        self.completion: Optional[Dict] = None
+
+        # Local raw images from export_ebs_images()
+        self.exports: List[Dict] = []
+
+        # Volumes already captured by an instance-level create_snapshots call
+        self._covered_volumes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _call_with_backoff(self, func: Callable, **kwargs: Any) -> Dict:
+        """
+        Call a snapshot API, retrying rate and limit errors with backoff.
+
+        The in-flight semaphore is held only for the call itself, so a
+        worker sleeping through a backoff does not use up a slot.
+        """
+        attempt = 0
+        while True:
+            try:
+                with self._in_flight:
+                    return func(**kwargs)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in RETRYABLE_SNAPSHOT_ERRORS or attempt >= self.max_retries:
+                    raise
+
+                # Exponential backoff with full jitter
+                base = BACKOFF_BASE_SECONDS.get(code, DEFAULT_BACKOFF_BASE_SECONDS)
+                delay = random.uniform(0, min(MAX_BACKOFF_SECONDS, base * 2**attempt))
+                attempt += 1
+                logger.warning(f"{code} (attempt {attempt}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _reusable_snapshots(self) -> Dict[str, Dict]:
+        """
+        Snapshots from an earlier run that can be reused, or none.
+
+        A failed lookup only costs the reuse, so it is logged and treated
+        as no earlier snapshots rather than failing the caller.
+        """
+        try:
+            return self._existing_snapshots()
+        except Exception as e:
+            logger.warning(f"Could not look up earlier snapshots: {e}")
+            self._existing = {"volumes": {}, "instances": {}, "databases": {}}
+            return self._existing
+
+    def _existing_snapshots(self) -> Dict[str, Dict]:
+        """
+        Find recent snapshots an earlier run took for this incident.
+
+        EBS snapshots come from one paginated describe_snapshots call
+        filtered on the IncidentId tag. describe_db_snapshots has no tag
+        filter, so manual RDS snapshots are filtered on their TagList.
+
+        Returns:
+            Latest reusable entry per volume and per DB instance, and the
+            latest crash-consistent snapshot set per instance
+        """
+        if self._existing is not None:
+            return self._existing
+
+        existing: Dict[str, Dict] = {"volumes": {}, "instances": {}, "databases": {}}
+        if self.reuse_within <= timedelta(0):
+            self._existing = existing
+            return existing
+
+        cutoff = datetime.now(timezone.utc) - self.reuse_within
+
+        paginator = self.ec2.get_paginator("describe_snapshots")
+        instance_sets: Dict[str, Dict[datetime, List[Dict]]] = {}
+        for page in paginator.paginate(
+            OwnerIds=["self"],
+            Filters=[
+                {"Name": "tag:IncidentId", "Values": [self.incident_id]},
+                {"Name": "status", "Values": REUSABLE_EBS_STATES},
+            ],
+        ):
+            for snapshot in page.get("Snapshots", []):
+                if snapshot["StartTime"] < cutoff:
+                    continue
+                tags = {t["Key"]: t["Value"] for t in snapshot.get("Tags", [])}
+                entry = {
+                    "volume_id": snapshot["VolumeId"],
+                    "snapshot_id": snapshot["SnapshotId"],
+                    "state": snapshot["State"],
+                    "progress": snapshot.get("Progress", "0%"),
+                    "created_time": snapshot["StartTime"].isoformat(),
+                    "reused": True,
+                }
+
+                latest = existing["volumes"].get(snapshot["VolumeId"])
+                if latest is None or entry["created_time"] > latest["created_time"]:
+                    existing["volumes"][snapshot["VolumeId"]] = entry
+
+                # create_snapshots gives every volume of a set the same start
+                if "InstanceId" in tags:
+                    entry = {
+                        **entry,
+                        "instance_id": tags["InstanceId"],
+                        "crash_consistent_set": True,
+                    }
+                    instance_sets.setdefault(tags["InstanceId"], {}).setdefault(
+                        snapshot["StartTime"], []
+                    ).append(entry)
+
+        for instance_id, sets in instance_sets.items():
+            existing["instances"][instance_id] = sets[max(sets)]
+
+        paginator = self.rds.get_paginator("describe_db_snapshots")
+        for page in paginator.paginate(SnapshotType="manual"):
+            for snapshot in page.get("DBSnapshots", []):
+                tags = {t["Key"]: t["Value"] for t in snapshot.get("TagList", [])}
+                created = snapshot.get("SnapshotCreateTime")
+                if (
+                    tags.get("IncidentId") != self.incident_id
+                    or snapshot["Status"] not in REUSABLE_RDS_STATES
+                    or (created is not None and created < cutoff)
+                ):
+                    continue
+                entry = {
+                    "db_instance_id": snapshot["DBInstanceIdentifier"],
+                    "snapshot_id": snapshot["DBSnapshotIdentifier"],
+                    "status": snapshot["Status"],
+                    "created_time": created.isoformat() if created else None,
+                    "reused": True,
+                }
+                latest = existing["databases"].get(entry["db_instance_id"])
+                if latest is None or (entry["created_time"] or "") > (
+                    latest["created_time"] or ""
+                ):
+                    existing["databases"][entry["db_instance_id"]] = entry
+
+        logger.info(
+            f"Found reusable snapshots for {len(existing['volumes'])} volumes and "
+            f"{len(existing['databases'])} databases from earlier runs"
+        )
+        self._existing = existing
+        return existing
+
+    def _snapshot_volume(self, volume_id: str) -> Dict:
+        """Create one EBS snapshot and return its result entry."""
+        try:
+            logger.info(f"Snapshotting EBS volume {volume_id}")
+
+            response = self._call_with_backoff(
+                self.ec2.create_snapshot,
+                VolumeId=volume_id,
+                Description=f"Forensics snapshot for incident {self.incident_id}",
+                TagSpecifications=[
+                    {
+                        "ResourceType": "snapshot",
+                        "Tags": [
+                            {"Key": "IncidentId", "Value": self.incident_id},
+                            {"Key": "Purpose", "Value": "Forensics"},
+                            {"Key": "CreatedTime", "Value": self.timestamp},
+                        ],
+                    }
+                ],
+            )
+
+            return {
+                "volume_id": volume_id,
+                "snapshot_id": response["SnapshotId"],
+                "state": response["State"],
+                "progress": response.get("Progress", "0%"),
+                "created_time": response["StartTime"].isoformat(),
+            }
+
+        except Exception as e:
+            logger.error(f"Error snapshotting {volume_id}: {e}")
+            return {"volume_id": volume_id, "error": str(e)}
+
+    def _instance_exclusions(self, instance_id: str, volume_ids: Set[str]) -> Dict:
+        """
+        InstanceSpecification exclusions leaving only the given volumes.
+
+        Falls back to no exclusions, with a warning, if the instance's
+        block device mappings are unknown.
+        """
+        instance = self.inventory.instance(instance_id)
+        if instance is None:
+            logger.warning(
+                f"Instance {instance_id} not found; snapshotting all of its "
+                "volumes, not only the requested ones"
+            )
+            return {}
+
+        root_device = instance.get("RootDeviceName")
+        exclude_boot = True
+        exclude_data = []
+        for mapping in instance.get("BlockDeviceMappings", []):
+            volume_id = mapping.get("Ebs", {}).get("VolumeId")
+            if not volume_id:
+                continue
+            if mapping.get("DeviceName") == root_device:
+                exclude_boot = volume_id not in volume_ids
+            elif volume_id not in volume_ids:
+                exclude_data.append(volume_id)
+
+        exclusions = {"ExcludeBootVolume": exclude_boot}
+        if exclude_data:
+            exclusions["ExcludeDataVolumeIds"] = exclude_data
+        return exclusions
+
+    def _snapshot_instance(
+        self, instance_id: str, volume_ids: Optional[Set[str]] = None
+    ) -> List[Dict]:
+        """
+        Snapshot the volumes attached to an instance in one call.
+
+        create_snapshots captures all volumes at the same point in time,
+        so the set is crash-consistent across volumes. With volume_ids,
+        the instance's other volumes are excluded from the set.
+        """
+        try:
+            logger.info(f"Snapshotting volumes of instance {instance_id}")
+
+            specification = {"InstanceId": instance_id, "ExcludeBootVolume": False}
+            if volume_ids is not None:
+                specification.update(self._instance_exclusions(instance_id, volume_ids))
+
+            response = self._call_with_backoff(
+                self.ec2.create_snapshots,
+                InstanceSpecification=specification,
+                Description=f"Forensics snapshot for incident {self.incident_id}",
+                TagSpecifications=[
+                    {
+                        "ResourceType": "snapshot",
+                        "Tags": [
+                            {"Key": "IncidentId", "Value": self.incident_id},
+                            {"Key": "Purpose", "Value": "Forensics"},
+                            {"Key": "CreatedTime", "Value": self.timestamp},
+                            {"Key": "InstanceId", "Value": instance_id},
+                        ],
+                    }
+                ],
+                CopyTagsFromSource="volume",
+            )
+
+            results = []
+            for snapshot in response.get("Snapshots", []):
+                results.append(
+                    {
+                        "volume_id": snapshot["VolumeId"],
+                        "instance_id": instance_id,
+                        "snapshot_id": snapshot["SnapshotId"],
+                        "state": snapshot["State"],
+                        "progress": snapshot.get("Progress", "0%"),
+                        "created_time": snapshot["StartTime"].isoformat(),
+                        "crash_consistent_set": True,
+                    }
+                )
+                with self._lock:
+                    self._covered_volumes[snapshot["VolumeId"]] = snapshot["SnapshotId"]
+
+            return results
+
+        except Exception as e:
+            logger.error(f"Error snapshotting volumes of {instance_id}: {e}")
+            return [{"instance_id": instance_id, "error": str(e)}]
+
+    def _snapshot_instances_grouped(
+        self,
+        instance_ids: List[str],
+        on_result: Optional[Callable[[Dict], None]] = None,
+        volume_ids: Optional[Set[str]] = None,
+    ) -> List[Dict]:
+        """
+        Run one create_snapshots call per instance, concurrently.
+
+        Instances with a recent snapshot set from an earlier run reuse it.
+        With volume_ids, only those volumes of each instance are captured.
+        """
+        snapshots = []
+
+        existing = self._reusable_snapshots()["instances"]
+        for instance_id in instance_ids:
+            for result in existing.get(instance_id, []):
+                if volume_ids is not None and result["volume_id"] not in volume_ids:
+                    continue
+                snapshots.append(result)
+                with self._lock:
+                    self._covered_volumes[result["volume_id"]] = result["snapshot_id"]
+                if on_result:
+                    on_result(result)
+        instance_ids = [i for i in instance_ids if i not in existing]
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            futures = [
+                executor.submit(self._snapshot_instance, instance_id, volume_ids)
+                for instance_id in instance_ids
+            ]
+
+            for future in as_completed(futures):
+                for result in future.result():
+                    snapshots.append(result)
+                    if on_result:
+                        on_result(result)
+
+        with self._lock:
+            self.snapshots["ebs"].extend(snapshots)
+
+        return snapshots
+
+    def snapshot_ebs_volumes(
+        self,
+        volume_ids: Optional[List[str]] = None,
+        on_result: Optional[Callable[[Dict], None]] = None,
+        group_by_instance: bool = False,
+    ) -> Dict:
         """
         Create snapshots of EBS volumes.
 
+        Snapshots are started concurrently, up to max_in_flight calls at a
+        time, so the last volume starts close to the first. Volumes already
+        captured by an instance-level snapshot are skipped, and volumes with
+        a recent snapshot from an earlier run reuse it.
+
         Args:
             volume_ids: Specific volumes (all if None)
+            on_result: Called with each volume's result as it completes
+            group_by_instance: Snapshot attached volumes with one
+                create_snapshots call per instance instead of one call per
+                volume; with volume_ids, the instances' other volumes are
+                excluded
 
         Returns:
             Dictionary with snapshot results
@@ -52,49 +973,75 @@ class ResourceSnapshotManager:
 
         try:
             # Get all volumes if not specified
-            if volume_ids is None:
-                paginator = self.ec2.get_paginator("describe_volumes")
-                volumes = []
-                for page in paginator.paginate():
-                    volumes.extend(page.get("Volumes", []))
-                volume_ids = [v["VolumeId"] for v in volumes]
+            requested = None if volume_ids is None else set(volume_ids)
+            volumes = []
+            if volume_ids is None or group_by_instance:
+                volumes = self.inventory.volumes(volume_ids)
+                if volume_ids is None:
+                    volume_ids = [v["VolumeId"] for v in volumes]
 
             snapshots = []
 
-            for volume_id in volume_ids:
-                try:
-                    logger.info(f"Snapshotting EBS volume {volume_id}")
-
-                    response = self.ec2.create_snapshot(
-                        VolumeId=volume_id,
-                        Description=f"Forensics snapshot for incident {self.incident_id}",
-                        TagSpecifications=[
-                            {
-                                "ResourceType": "snapshot",
-                                "Tags": [
-                                    {"Key": "IncidentId", "Value": self.incident_id},
-                                    {"Key": "Purpose", "Value": "Forensics"},
-                                    {"Key": "CreatedTime", "Value": self.timestamp},
-                                ],
-                            }
-                        ],
-                    )
-
-                    snapshots.append(
-                        {
-                            "volume_id": volume_id,
-                            "snapshot_id": response["SnapshotId"],
-                            "state": response["State"],
-                            "progress": response.get("Progress", "0%"),
-                            "created_time": response["StartTime"].isoformat(),
-                        }
-                    )
-
-                except Exception as e:
-                    logger.error(f"Error snapshotting {volume_id}: {e}")
-                    snapshots.append({"volume_id": volume_id, "error": str(e)})
+            if group_by_instance:
+                instance_ids = sorted(
+                    {
+                        attachment["InstanceId"]
+                        for volume in volumes
+                        for attachment in volume.get("Attachments", [])
+                        if attachment.get("State") == "attached"
+                        and volume["VolumeId"] not in self._covered_volumes
+                    }
+                )
+                snapshots.extend(
+                    self._snapshot_instances_grouped(instance_ids, on_result, requested)
+                )
+
+            with self._lock:
+                pending_volumes = [
+                    volume_id
+                    for volume_id in volume_ids
+                    if volume_id not in self._covered_volumes
+                ]
+            skipped = len(volume_ids) - len(pending_volumes)
+            if skipped:
+                logger.info(
+                    f"Skipping {skipped} volumes already captured by "
+                    "instance-level snapshots"
+                )
+
+            # Volumes snapshotted recently by an earlier run
+            existing = self._reusable_snapshots()["volumes"]
+            volume_results = [existing[v] for v in pending_volumes if v in existing]
+            if volume_results:
+                logger.info(
+                    f"Reusing recent snapshots for {len(volume_results)} volumes"
+                )
+            for result in volume_results:
+                if on_result:
+                    on_result(result)
+            volume_ids = [v for v in pending_volumes if v not in existing]
+
+            with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+                futures = [
+                    executor.submit(self._snapshot_volume, volume_id)
+                    for volume_id in volume_ids
+                ]
+
+                # Report results in completion order
+                for done, future in enumerate(as_completed(futures), start=1):
+                    result = future.result()
+                    volume_results.append(result)
+                    if "error" not in result:
+                        logger.info(
+                            f"Snapshot {result['snapshot_id']} started for "
+                            f"{result['volume_id']} ({done}/{len(volume_ids)})"
+                        )
+                    if on_result:
+                        on_result(result)
 
-            self.snapshots["ebs"] = snapshots
+            with self._lock:
+                self.snapshots["ebs"].extend(volume_results)
+            snapshots.extend(volume_results)
 
             return {
                 "status": "success",
@@ -106,6 +1053,37 @@ class ResourceSnapshotManager:
             logger.error(f"Error snapshotting EBS volumes: {e}")
             return {"status": "error", "error": str(e)}
 
+    def _snapshot_database(self, db_id: str) -> Dict:
+        """Create one RDS snapshot and return its result entry."""
+        try:
+            logger.info(f"Snapshotting RDS database {db_id}")
+
+            snapshot_id = f"forensics-{db_id}-{int(time.time())}"
+
+            response = self._call_with_backoff(
+                self.rds.create_db_snapshot,
+                DBSnapshotIdentifier=snapshot_id,
+                DBInstanceIdentifier=db_id,
+                Tags=[
+                    {"Key": "IncidentId", "Value": self.incident_id},
+                    {"Key": "Purpose", "Value": "Forensics"},
+                    {"Key": "CreatedTime", "Value": self.timestamp},
+                ],
+            )
+
+            return {
+                "db_instance_id": db_id,
+                "snapshot_id": response["DBSnapshot"]["DBSnapshotIdentifier"],
+                "status": response["DBSnapshot"]["Status"],
+                "created_time": response["DBSnapshot"][
+                    "SnapshotCreateTime"
+                ].isoformat(),
+            }
+
+        except Exception as e:
+            logger.error(f"Error snapshotting {db_id}: {e}")
+            return {"db_instance_id": db_id, "error": str(e)}
+
     def snapshot_rds_databases(self, db_instances: Optional[List[str]] = None) -> Dict:
         """
         Create snapshots of RDS databases.
@@ -121,50 +1099,24 @@ class ResourceSnapshotManager:
         try:
             # Get all DB instances if not specified
             if db_instances is None:
-                paginator = self.rds.get_paginator("describe_db_instances")
-                db_instances = []
-                for page in paginator.paginate():
-                    db_instances.extend(
-                        [
-                            db["DBInstanceIdentifier"]
-                            for db in page.get("DBInstances", [])
-                        ]
-                    )
+                db_instances = self.inventory.db_instance_ids()
 
             snapshots = []
 
+            # Databases snapshotted recently by an earlier run
+            existing = self._reusable_snapshots()["databases"]
             for db_id in db_instances:
-                try:
-                    logger.info(f"Snapshotting RDS database {db_id}")
-
-                    snapshot_id = f"forensics-{db_id}-{int(time.time())}"
-
-                    response = self.rds.create_db_snapshot(
-                        DBSnapshotIdentifier=snapshot_id,
-                        DBInstanceIdentifier=db_id,
-                        Tags=[
-                            {"Key": "IncidentId", "Value": self.incident_id},
-                            {"Key": "Purpose", "Value": "Forensics"},
-                            {"Key": "CreatedTime", "Value": self.timestamp},
-                        ],
-                    )
-
-                    snapshots.append(
-                        {
-                            "db_instance_id": db_id,
-                            "snapshot_id": response["DBSnapshot"][
-                                "DBSnapshotIdentifier"
-                            ],
-                            "status": response["DBSnapshot"]["Status"],
-                            "created_time": response["DBSnapshot"][
-                                "SnapshotCreateTime"
-                            ].isoformat(),
-                        }
+                if db_id in existing:
+                    logger.info(f"Reusing recent snapshot for RDS database {db_id}")
+                    snapshots.append(existing[db_id])
+
+            with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+                snapshots.extend(
+                    executor.map(
+                        self._snapshot_database,
+                        [db for db in db_instances if db not in existing],
                     )
-
-                except Exception as e:
-                    logger.error(f"Error snapshotting {db_id}: {e}")
-                    snapshots.append({"db_instance_id": db_id, "error": str(e)})
+                )
 
             self.snapshots["rds"] = snapshots
 
@@ -178,66 +1130,79 @@ class ResourceSnapshotManager:
             logger.error(f"Error snapshotting RDS: {e}")
             return {"status": "error", "error": str(e)}
 
-    def snapshot_ec2_instances(self, instance_ids: Optional[List[str]] = None) -> Dict:
+    def _create_instance_image(self, instance_id: str) -> Dict:
+        """Create one forensic AMI and return its result entry."""
+        try:
+            logger.info(f"Creating AMI from instance {instance_id}")
+
+            ami_name = f"forensics-{instance_id}-{int(time.time())}"
+
+            response = self._call_with_backoff(
+                self.ec2.create_image,
+                InstanceId=instance_id,
+                Name=ami_name,
+                Description=f"Forensics AMI for incident {self.incident_id}",
+                NoReboot=False,
+                TagSpecifications=[
+                    {
+                        "ResourceType": "image",
+                        "Tags": [
+                            {"Key": "IncidentId", "Value": self.incident_id},
+                            {"Key": "Purpose", "Value": "Forensics"},
+                            {"Key": "CreatedTime", "Value": self.timestamp},
+                        ],
+                    }
+                ],
+            )
+
+            return {
+                "instance_id": instance_id,
+                "ami_id": response["ImageId"],
+                "ami_name": ami_name,
+                "created_time": datetime.utcnow().isoformat(),
+            }
+
+        except Exception as e:
+            logger.error(f"Error creating AMI from {instance_id}: {e}")
+            return {"instance_id": instance_id, "error": str(e)}
+
+    def snapshot_ec2_instances(
+        self, instance_ids: Optional[List[str]] = None, mode: str = "ami"
+    ) -> Dict:
         """
         Create AMIs from EC2 instances for forensics.
 
         Args:
             instance_ids: Specific instances (all if None)
+            mode: "ami" to create an image per instance, or "volumes" to
+                snapshot all attached volumes with one create_snapshots
+                call per instance (later volume-level work skips them)
 
         Returns:
             Dictionary with snapshot results
         """
-        logger.info("Creating EC2 instance AMIs")
+        logger.info(
+            "Creating EC2 instance AMIs"
+            if mode == "ami"
+            else "Creating instance-level EBS snapshots"
+        )
 
         try:
             # Get all instances if not specified
             if instance_ids is None:
-                paginator = self.ec2.get_paginator("describe_instances")
-                instance_ids = []
-                for page in paginator.paginate():
-                    for reservation in page.get("Reservations", []):
-                        instance_ids.extend(
-                            [i["InstanceId"] for i in reservation.get("Instances", [])]
-                        )
-
-            amis = []
-
-            for instance_id in instance_ids:
-                try:
-                    logger.info(f"Creating AMI from instance {instance_id}")
-
-                    ami_name = f"forensics-{instance_id}-{int(time.time())}"
-
-                    response = self.ec2.create_image(
-                        InstanceId=instance_id,
-                        Name=ami_name,
-                        Description=f"Forensics AMI for incident {self.incident_id}",
-                        NoReboot=False,
-                        TagSpecifications=[
-                            {
-                                "ResourceType": "image",
-                                "Tags": [
-                                    {"Key": "IncidentId", "Value": self.incident_id},
-                                    {"Key": "Purpose", "Value": "Forensics"},
-                                    {"Key": "CreatedTime", "Value": self.timestamp},
-                                ],
-                            }
-                        ],
-                    )
+                instance_ids = self.inventory.instance_ids()
 
-                    amis.append(
-                        {
-                            "instance_id": instance_id,
-                            "ami_id": response["ImageId"],
-                            "ami_name": ami_name,
-                            "created_time": datetime.utcnow().isoformat(),
-                        }
-                    )
+            if mode == "volumes":
+                snapshots = self._snapshot_instances_grouped(instance_ids)
+                return {
+                    "status": "success",
+                    "instances": len(instance_ids),
+                    "snapshots_created": len(snapshots),
+                    "snapshots": snapshots,
+                }
 
-                except Exception as e:
-                    logger.error(f"Error creating AMI from {instance_id}: {e}")
-                    amis.append({"instance_id": instance_id, "error": str(e)})
+            with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+                amis = list(executor.map(self._create_instance_image, instance_ids))
 
             self.snapshots["ami"] = amis
 
@@ -247,15 +1212,438 @@ class ResourceSnapshotManager:
             logger.error(f"Error creating EC2 AMIs: {e}")
             return {"status": "error", "error": str(e)}
 
+    def _discover_prefixes(self, bucket: str) -> Tuple[List[Dict], List[str]]:
+        """
+        Split a bucket into partitions that can be listed in parallel.
+
+        Returns:
+            Objects at the bucket root and the top-level "/" prefixes
+        """
+        root_objects: List[Dict] = []
+        prefixes: List[str] = []
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Delimiter="/"):
+            root_objects.extend(page.get("Contents", []))
+            prefixes.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+        return root_objects, prefixes
+
+    def _list_prefix(self, bucket: str, prefix: str) -> Iterator[Dict]:
+        """Yield every object under a prefix."""
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            yield from page.get("Contents", [])
+
+    def _grow_s3_pool(self, copy_workers: int) -> None:
+        """
+        Recreate the S3 client if its pool is too small for copying.
+
+        Every copy worker can be running a multipart copy with its own
+        part workers, next to the prefix listings that feed the copies.
+        """
+        connections = copy_workers * MULTIPART_PART_WORKERS + PREFIX_LISTING_WORKERS
+        with self._lock:
+            if connections > self._s3_pool_size:
+                self.s3 = boto3.client(
+                    "s3", config=Config(max_pool_connections=connections)
+                )
+                self._s3_pool_size = connections
+
+    @staticmethod
+    def _load_copy_manifest(path: str) -> Dict:
+        """
+        Load a copy manifest left by an earlier run, if any.
+
+        Copies journaled after the manifest was last written are replayed
+        on top of it; a line cut short by a crash is ignored.
+        """
+        manifest: Dict = {"objects": {}}
+        if os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+
+        journal_path = f"{path}.journal"
+        if os.path.exists(journal_path):
+            objects = manifest.setdefault("objects", {})
+            with open(journal_path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    objects[entry.pop("key")] = entry
+        return manifest
+
+    @staticmethod
+    def _save_copy_manifest(path: str, manifest: Dict) -> None:
+        """
+        Write the copy manifest atomically so a crash cannot corrupt it.
+
+        The journal is dropped afterwards, since the manifest now holds
+        every copy it recorded.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, default=str)
+        os.replace(tmp_path, path)
+
+        journal_path = f"{path}.journal"
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
+    def _multipart_copy(
+        self,
+        source: Dict,
+        size: int,
+        backup_bucket: str,
+        dest_key: str,
+        etag: Optional[str] = None,
+    ) -> None:
+        """
+        Copy a large object server-side with concurrent upload_part_copy.
+
+        Every part is pinned to the version (or, unversioned, the ETag) the
+        object had when the copy started, so an overwrite during the copy
+        fails it instead of mixing two versions. Tags are copied after the
+        upload completes.
+        """
+        head_args = {"IfMatch": etag} if etag else {}
+        head = self.s3.head_object(
+            Bucket=source["Bucket"], Key=source["Key"], **head_args
+        )
+        if head.get("VersionId") and head["VersionId"] != "null":
+            source = {**source, "VersionId": head["VersionId"]}
+
+        upload = self.s3.create_multipart_upload(
+            Bucket=backup_bucket,
+            Key=dest_key,
+            ContentType=head.get("ContentType", "binary/octet-stream"),
+            Metadata=head.get("Metadata", {}),
+        )
+        upload_id = upload["UploadId"]
+
+        # Grow the part size for objects that would exceed the part limit
+        part_size = max(MULTIPART_PART_SIZE, -(-size // MAX_MULTIPART_PARTS))
+        ranges = [
+            (number, start, min(start + part_size, size) - 1)
+            for number, start in enumerate(range(0, size, part_size), start=1)
+        ]
+
+        def copy_part(part: Tuple[int, int, int]) -> Dict:
+            number, first, last = part
+            response = self.s3.upload_part_copy(
+                Bucket=backup_bucket,
+                Key=dest_key,
+                UploadId=upload_id,
+                PartNumber=number,
+                CopySource=source,
+                CopySourceRange=f"bytes={first}-{last}",
+                CopySourceIfMatch=head["ETag"],
+            )
+            return {"PartNumber": number, "ETag": response["CopyPartResult"]["ETag"]}
+
+        try:
+            with ThreadPoolExecutor(max_workers=MULTIPART_PART_WORKERS) as executor:
+                parts = list(executor.map(copy_part, ranges))
+            self.s3.complete_multipart_upload(
+                Bucket=backup_bucket,
+                Key=dest_key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except Exception:
+            self.s3.abort_multipart_upload(
+                Bucket=backup_bucket, Key=dest_key, UploadId=upload_id
+            )
+            raise
+
+        # copy_object's TaggingDirective has no multipart equivalent
+        tags = self.s3.get_object_tagging(**source).get("TagSet", [])
+        if tags:
+            self.s3.put_object_tagging(
+                Bucket=backup_bucket, Key=dest_key, Tagging={"TagSet": tags}
+            )
+
+    def _copy_to_evidence(self, bucket: str, obj: Dict, backup_bucket: str) -> Dict:
+        """Copy one object into the evidence bucket and return its manifest entry."""
+        dest_key = f"{self.incident_id}/{bucket}/{obj['Key']}"
+        source = {"Bucket": bucket, "Key": obj["Key"]}
+        size = obj.get("Size", 0)
+
+        if size > MULTIPART_COPY_THRESHOLD:
+            self._multipart_copy(source, size, backup_bucket, dest_key, obj.get("ETag"))
+        else:
+            self.s3.copy_object(
+                Bucket=backup_bucket,
+                Key=dest_key,
+                CopySource=source,
+                MetadataDirective="COPY",
+                TaggingDirective="COPY",
+            )
+
+        return {
+            "dest_key": dest_key,
+            "etag": obj.get("ETag"),
+            "size": size,
+            "copied_time": datetime.utcnow().isoformat(),
+        }
+
+    def copy_bucket_to_evidence(
+        self,
+        bucket: str,
+        backup_bucket: str,
+        copy_manifest: Dict,
+        manifest_path: str,
+        copy_workers: int = DEFAULT_COPY_WORKERS,
+    ) -> Dict:
+        """
+        Copy every object of a bucket into the evidence bucket.
+
+        Top-level prefixes are listed in parallel, and each listed object is
+        copied server-side as soon as it is seen. Objects already recorded
+        in the copy manifest with the same ETag are skipped, so an
+        interrupted copy resumes where it stopped. Each completed copy is
+        appended to <manifest_path>.journal; the caller writes the full
+        manifest with _save_copy_manifest() once copying is done.
+
+        Args:
+            bucket: Source bucket
+            backup_bucket: Evidence bucket receiving the copies
+            copy_manifest: Copy manifest, updated in place
+            manifest_path: Where the copy manifest is saved
+            copy_workers: Concurrent copy calls
+
+        Returns:
+            Copy statistics for the bucket
+        """
+        stats = {"objects": 0, "copied": 0, "skipped": 0, "failed": 0, "bytes": 0}
+        errors: List[Dict] = []
+        lock = threading.Lock()
+        # Bounds queued copies so listing cannot run far ahead of copying
+        slots = threading.BoundedSemaphore(copy_workers * 4)
+        objects = copy_manifest.setdefault("objects", {})
+
+        self._grow_s3_pool(copy_workers)
+        root_objects, prefixes = self._discover_prefixes(bucket)
+
+        with open(f"{manifest_path}.journal", "a") as journal:
+            with ThreadPoolExecutor(max_workers=copy_workers) as copy_executor:
+
+                def on_copied(manifest_key: str, obj: Dict, future: Any) -> None:
+                    slots.release()
+                    with lock:
+                        try:
+                            objects[manifest_key] = future.result()
+                            stats["copied"] += 1
+                            stats["bytes"] += obj.get("Size", 0)
+                        except Exception as e:
+                            stats["failed"] += 1
+                            errors.append({"key": obj["Key"], "error": str(e)})
+                            return
+                        journal.write(
+                            json.dumps({"key": manifest_key, **objects[manifest_key]})
+                            + "\n"
+                        )
+                        journal.flush()
+
+                def submit(obj_iter: Iterator[Dict]) -> None:
+                    for obj in obj_iter:
+                        manifest_key = f"{bucket}/{obj['Key']}"
+                        with lock:
+                            stats["objects"] += 1
+                            done = objects.get(manifest_key)
+                            if done and done.get("etag") == obj.get("ETag"):
+                                stats["skipped"] += 1
+                                continue
+                        slots.acquire()
+                        future = copy_executor.submit(
+                            self._copy_to_evidence, bucket, obj, backup_bucket
+                        )
+                        future.add_done_callback(
+                            lambda f, k=manifest_key, o=obj: on_copied(k, o, f)
+                        )
+
+                submit(iter(root_objects))
+                with ThreadPoolExecutor(
+                    max_workers=min(PREFIX_LISTING_WORKERS, max(1, len(prefixes)))
+                ) as list_executor:
+                    for future in [
+                        list_executor.submit(submit, self._list_prefix(bucket, prefix))
+                        for prefix in prefixes
+                    ]:
+                        future.result()
+
+        logger.info(
+            f"Copied {stats['copied']} objects from {bucket} to {backup_bucket} "
+            f"({stats['skipped']} already copied, {stats['failed']} failed)"
+        )
+        return {**stats, "errors": errors[:100]}
+
+    def _bucket_cloudwatch(self, bucket: str) -> Any:
+        """CloudWatch client in the bucket's region (storage metrics are regional)."""
+        location = self.s3.get_bucket_location(Bucket=bucket).get("LocationConstraint")
+        region = {None: "us-east-1", "": "us-east-1", "EU": "eu-west-1"}.get(
+            location, location
+        )
+        with self._lock:
+            if region not in self._cloudwatch:
+                self._cloudwatch[region] = boto3.client(
+                    "cloudwatch", region_name=region
+                )
+            return self._cloudwatch[region]
+
+    def _bucket_metric(
+        self, bucket: str, metric: str, storage_type: str
+    ) -> Optional[Dict]:
+        """Latest datapoint of a daily CloudWatch S3 storage metric."""
+        now = datetime.utcnow()
+        response = self._bucket_cloudwatch(bucket).get_metric_statistics(
+            Namespace="AWS/S3",
+            MetricName=metric,
+            Dimensions=[
+                {"Name": "BucketName", "Value": bucket},
+                {"Name": "StorageType", "Value": storage_type},
+            ],
+            StartTime=now - BUCKET_METRIC_LOOKBACK,
+            EndTime=now,
+            Period=86400,
+            Statistics=["Average"],
+        )
+        datapoints = response.get("Datapoints", [])
+        if not datapoints:
+            return None
+        return max(datapoints, key=lambda d: d["Timestamp"])
+
+    def _count_from_metrics(self, bucket: str) -> Optional[Dict]:
+        """Object count from the daily CloudWatch NumberOfObjects metric."""
+        latest = self._bucket_metric(bucket, "NumberOfObjects", "AllStorageTypes")
+        if latest is None:
+            return None
+        return {
+            "object_count": int(latest["Average"]),
+            "count_method": "cloudwatch_metric",
+            "count_as_of": str(latest["Timestamp"]),
+        }
+
+    def _count_from_inventory(self, bucket: str) -> Optional[Dict]:
+        """
+        Object count from the latest S3 Inventory report.
+
+        Only CSV reports of current object versions are used; rows of the
+        report's data files are counted concurrently.
+        """
+        response = self.s3.list_bucket_inventory_configurations(Bucket=bucket)
+        for config in response.get("InventoryConfigurationList", []):
+            destination = config["Destination"]["S3BucketDestination"]
+            if (
+                not config.get("IsEnabled")
+                or config.get("IncludedObjectVersions") != "Current"
+                or destination.get("Format") != "CSV"
+            ):
+                continue
+
+            dest_bucket = destination["Bucket"].split(":::")[-1]
+            base = "/".join(
+                part
+                for part in (
+                    destination.get("Prefix", "").strip("/"),
+                    bucket,
+                    config["Id"],
+                )
+                if part
+            )
+
+            # Reports are delivered under <base>/<YYYY-MM-DDTHH-MMZ>/
+            paginator = self.s3.get_paginator("list_objects_v2")
+            deliveries = sorted(
+                p["Prefix"]
+                for page in paginator.paginate(
+                    Bucket=dest_bucket, Prefix=f"{base}/", Delimiter="/"
+                )
+                for p in page.get("CommonPrefixes", [])
+                if p["Prefix"][len(base) + 1 : len(base) + 3] == "20"
+            )
+            if not deliveries:
+                continue
+
+            manifest_key = f"{deliveries[-1]}manifest.json"
+            body = self.s3.get_object(Bucket=dest_bucket, Key=manifest_key)["Body"]
+            manifest = json.loads(body.read())
+
+            def count_rows(data_key: str) -> int:
+                data = self.s3.get_object(Bucket=dest_bucket, Key=data_key)["Body"]
+                with gzip.GzipFile(fileobj=data) as rows:
+                    return sum(1 for _ in rows)
+
+            with ThreadPoolExecutor(max_workers=COUNT_LISTING_WORKERS) as executor:
+                object_count = sum(
+                    executor.map(count_rows, [f["key"] for f in manifest["files"]])
+                )
+
+            return {
+                "object_count": object_count,
+                "count_method": "s3_inventory",
+                "count_as_of": deliveries[-1][len(base) + 1 :].rstrip("/"),
+            }
+
+        return None
+
+    def _count_by_listing(self, bucket: str) -> Dict:
+        """Object count by listing top-level prefixes in parallel."""
+        root_objects, prefixes = self._discover_prefixes(bucket)
+
+        def count_prefix(prefix: str) -> int:
+            return sum(1 for _ in self._list_prefix(bucket, prefix))
+
+        with ThreadPoolExecutor(max_workers=COUNT_LISTING_WORKERS) as executor:
+            object_count = len(root_objects) + sum(executor.map(count_prefix, prefixes))
+
+        return {
+            "object_count": object_count,
+            "count_method": "parallel_listing",
+            "count_as_of": datetime.utcnow().isoformat(),
+        }
+
+    def count_bucket_objects(self, bucket: str) -> Dict:
+        """
+        Count a bucket's objects without paging through all of it if possible.
+
+        CloudWatch storage metrics are tried first, then S3 Inventory
+        reports, and only then a parallel listing by prefix.
+
+        Args:
+            bucket: Bucket name
+
+        Returns:
+            Object count, the method that produced it and when it was taken
+        """
+        for method in (self._count_from_metrics, self._count_from_inventory):
+            try:
+                count = method(bucket)
+            except Exception as e:
+                logger.warning(f"{method.__name__} unavailable for {bucket}: {e}")
+                continue
+            if count is not None:
+                return count
+
+        return self._count_by_listing(bucket)
+
     def backup_s3_buckets(
-        self, buckets: Optional[List[str]] = None, backup_bucket: Optional[str] = None
+        self,
+        buckets: Optional[List[str]] = None,
+        backup_bucket: Optional[str] = None,
+        copy_workers: int = DEFAULT_COPY_WORKERS,
+        manifest_path: Optional[str] = None,
     ) -> Dict:
         """
         Create backups of S3 buckets.
 
         Args:
             buckets: Specific buckets (all if None)
-            backup_bucket: Destination bucket for backups
+            backup_bucket: Evidence bucket to copy objects into (versioning
+                and tagging only if None)
+            copy_workers: Concurrent copy calls per bucket
+            manifest_path: Resumable copy manifest (defaults to
+                s3-copy-<incident_id>.json)
 
         Returns:
             Dictionary with backup results
@@ -265,8 +1653,15 @@ class ResourceSnapshotManager:
         try:
             # Get all buckets if not specified
             if buckets is None:
-                response = self.s3.list_buckets()
-                buckets = [b["Name"] for b in response.get("Buckets", [])]
+                buckets = self.inventory.bucket_names()
+
+            # Never copy the evidence bucket into itself
+            if backup_bucket:
+                buckets = [b for b in buckets if b != backup_bucket]
+                manifest_path = manifest_path or f"s3-copy-{self.incident_id}.json"
+                copy_manifest = self._load_copy_manifest(manifest_path)
+                copy_manifest["incident_id"] = self.incident_id
+                copy_manifest["backup_bucket"] = backup_bucket
 
             backups = []
 
@@ -301,20 +1696,32 @@ class ResourceSnapshotManager:
                             f"Failed to tag bucket {bucket} for forensics: {e}"
                         )
 
-                    # Get object count for reference
-                    paginator = self.s3.get_paginator("list_objects_v2")
-                    object_count = 0
-                    for page in paginator.paginate(Bucket=bucket):
-                        object_count += len(page.get("Contents", []))
-
-                    backups.append(
-                        {
-                            "bucket": bucket,
-                            "object_count": object_count,
-                            "versioning_enabled": True,
-                            "backup_time": self.timestamp,
-                        }
-                    )
+                    backup = {
+                        "bucket": bucket,
+                        "versioning_enabled": True,
+                        "backup_time": self.timestamp,
+                    }
+
+                    if backup_bucket:
+                        # The copy listing doubles as the object count
+                        copy_stats = self.copy_bucket_to_evidence(
+                            bucket,
+                            backup_bucket,
+                            copy_manifest,
+                            manifest_path,
+                            copy_workers,
+                        )
+                        backup["object_count"] = copy_stats["objects"]
+                        backup["count_method"] = "copy_listing"
+                        backup["copy"] = copy_stats
+                        backup["evidence_location"] = (
+                            f"s3://{backup_bucket}/{self.incident_id}/{bucket}/"
+                        )
+                    else:
+                        # Get object count for reference
+                        backup.update(self.count_bucket_objects(bucket))
+
+                    backups.append(backup)
 
                 except Exception as e:
                     logger.error(f"Error backing up {bucket}: {e}")
@@ -322,16 +1729,88 @@ class ResourceSnapshotManager:
 
             self.snapshots["s3"] = backups
 
-            return {
+            result = {
                 "status": "success",
                 "buckets_backed_up": len(backups),
                 "backups": backups,
             }
+            if backup_bucket:
+                self._save_copy_manifest(manifest_path, copy_manifest)
+                result["copy_manifest"] = manifest_path
+            return result
 
         except Exception as e:
             logger.error(f"Error backing up S3 buckets: {e}")
             return {"status": "error", "error": str(e)}
 
+    def wait_for_completion(
+        self,
+        timeout: Optional[float] = None,
+        poll_interval: float = 15.0,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict:
+        """
+        Track the snapshots created so far until they complete.
+
+        Args:
+            timeout: Maximum seconds to wait (no limit if None)
+            poll_interval: Initial seconds between polling rounds
+            on_progress: Called with the progress summary after every round
+
+        Returns:
+            Final progress summary (also recorded in the manifest)
+        """
+        tracker = SnapshotCompletionTracker(
+            self.ec2, self.rds, poll_interval=poll_interval
+        )
+        self.completion = tracker.track(self.snapshots, timeout, on_progress)
+        return self.completion
+
+    def export_ebs_images(
+        self, output_dir: str, max_workers: int = EXPORT_BLOCK_WORKERS
+    ) -> Dict:
+        """
+        Export completed EBS snapshots to local raw images.
+
+        Snapshots of the same volume are exported oldest first, so each
+        later one only downloads the blocks changed since the previous one.
+
+        Args:
+            output_dir: Directory for images and block manifests
+            max_workers: Concurrent block fetches per image
+
+        Returns:
+            Dictionary with export results
+        """
+        logger.info(f"Exporting EBS snapshots to {output_dir}")
+
+        try:
+            exporter = SnapshotImageExporter(output_dir, max_workers)
+            completed = sorted(
+                (
+                    entry
+                    for entry in self.snapshots["ebs"]
+                    if entry.get("state") == "completed" and "error" not in entry
+                ),
+                key=lambda entry: entry.get("created_time", ""),
+            )
+            skipped = len(self.snapshots["ebs"]) - len(completed)
+            if skipped:
+                logger.warning(f"Skipping {skipped} EBS snapshots not yet completed")
+
+            exports = [exporter.export(entry) for entry in completed]
+            self.exports.extend(exports)
+
+            return {
+                "status": "success",
+                "images_exported": sum("error" not in e for e in exports),
+                "exports": exports,
+            }
+
+        except Exception as e:
+            logger.error(f"Error exporting EBS images: {e}")
+            return {"status": "error", "error": str(e)}
+
     def create_manifest(self) -> Dict:
         """Create manifest of all snapshots created."""
         manifest = {
@@ -343,15 +1822,211 @@ class ResourceSnapshotManager:
                 "rds_snapshots": len(self.snapshots["rds"]),
                 "s3_backups": len(self.snapshots["s3"]),
                 "ami_images": len(self.snapshots["ami"]),
+                "reused_snapshots": sum(
+                    entry.get("reused", False)
+                    for entries in self.snapshots.values()
+                    for entry in entries
+                ),
             },
         }
 
+        if self.completion is not None:
+            manifest["completion"] = self.completion
+        if self.exports:
+            manifest["exports"] = self.exports
+
         return manifest
 
+    @staticmethod
+    def _selected_types(resource_filter: Dict) -> List[str]:
+        """
+        Resource types a filter selects.
+
+        A type is selected by its own key (e.g. "ebs") or by its ID list
+        (e.g. "volume_ids"); a filter naming no type selects all of them.
+        """
+        selected = [
+            resource_type
+            for resource_type, ids_key in RESOURCE_TYPES.items()
+            if resource_type in resource_filter or ids_key in resource_filter
+        ]
+        return selected or list(RESOURCE_TYPES)
+
+    def plan(
+        self, resource_filter: Optional[Dict] = None, max_ids: Optional[int] = None
+    ) -> Dict:
+        """
+        Estimate the work snapshot_all would do, without creating anything.
+
+        Targets come from the shared inventory; resources with a
+        reusable snapshot from an earlier run are counted separately.
+        Storage figures are upper bounds (snapshots are incremental), and
+        durations use the rough PLAN_* figures.
+
+        Args:
+            resource_filter: Same filter snapshot_all takes
+            max_ids: Most IDs listed per resource type (all if None)
+
+        Returns:
+            Per-type targets, the IDs that would be snapshotted or copied
+            with their total, call counts, storage and duration estimates
+        """
+        resource_filter = resource_filter or {}
+        selected = self._selected_types(resource_filter)
+        instance_mode = resource_filter.get("instance_mode", "ami")
+        existing = self._reusable_snapshots()
+        plan: Dict[str, Any] = {
+            "incident_id": self.incident_id,
+            "selected": selected,
+            "max_in_flight": self.max_in_flight,
+            "resources": {},
+        }
+
+        volumes: List[Dict] = []
+        if "ebs" in selected or "ec2" in selected:
+            volumes = self.inventory.volumes()
+        volume_sizes = {v["VolumeId"]: v["Size"] for v in volumes}
+
+        if "ec2" in selected:
+            instance_ids = resource_filter.get("instance_ids")
+            if instance_ids is None:
+                instance_ids = self.inventory.instance_ids()
+            attached: Dict[str, List[str]] = {}
+            for volume in volumes:
+                for attachment in volume.get("Attachments", []):
+                    attached.setdefault(attachment["InstanceId"], []).append(
+                        volume["VolumeId"]
+                    )
+            reused = (
+                [i for i in instance_ids if i in existing["instances"]]
+                if instance_mode == "volumes"
+                else []
+            )
+            pending = [i for i in instance_ids if i not in reused]
+            plan["resources"]["ec2"] = {
+                "mode": instance_mode,
+                "targets": len(instance_ids),
+                "ids": pending,
+                "reused": len(reused),
+                "api_calls": len(pending),
+                "sizes_gib": [
+                    sum(volume_sizes.get(v, 0) for v in attached.get(i, []))
+                    for i in pending
+                ],
+            }
+
+        if "ebs" in selected:
+            volume_ids = resource_filter.get("volume_ids") or list(volume_sizes)
+            covered = set()
+            if "ec2" in selected and instance_mode == "volumes":
+                covered = {v for i in instance_ids for v in attached.get(i, [])}
+            targets = [v for v in volume_ids if v not in covered]
+            pending = [v for v in targets if v not in existing["volumes"]]
+            plan["resources"]["ebs"] = {
+                "targets": len(targets),
+                "ids": pending,
+                "reused": len(targets) - len(pending),
+                "api_calls": len(pending),
+                "sizes_gib": [volume_sizes.get(v, 0) for v in pending],
+            }
+
+        if "rds" in selected:
+            db_instances = resource_filter.get("db_instances")
+            databases = self.inventory.db_instances(db_instances)
+            pending = [
+                db
+                for db in databases
+                if db["DBInstanceIdentifier"] not in existing["databases"]
+            ]
+            plan["resources"]["rds"] = {
+                "targets": len(databases),
+                "ids": [db["DBInstanceIdentifier"] for db in pending],
+                "reused": len(databases) - len(pending),
+                "api_calls": len(pending),
+                "sizes_gib": [db.get("AllocatedStorage", 0) for db in pending],
+            }
+
+        if "s3" in selected:
+            buckets = resource_filter.get("buckets")
+            if buckets is None:
+                buckets = self.inventory.bucket_names()
+            backup_bucket = resource_filter.get("backup_bucket")
+            buckets = [b for b in buckets if b != backup_bucket]
+            s3_plan = {
+                "targets": len(buckets),
+                "ids": buckets,
+                "api_calls": 2 * len(buckets),
+                "sizes_gib": [],
+            }
+            if backup_bucket:
+                # Copy volume from the daily storage metrics (Standard class)
+                objects = 0
+                for bucket in buckets:
+                    try:
+                        count = self._bucket_metric(
+                            bucket, "NumberOfObjects", "AllStorageTypes"
+                        )
+                        size = self._bucket_metric(
+                            bucket, "BucketSizeBytes", "StandardStorage"
+                        )
+                    except Exception as e:
+                        logger.warning(f"No storage metrics for {bucket}: {e}")
+                        continue
+                    objects += int(count["Average"]) if count else 0
+                    s3_plan["sizes_gib"].append(
+                        round(size["Average"] / 1024**3, 2) if size else 0
+                    )
+                s3_plan["objects_to_copy"] = objects
+                s3_plan["api_calls"] += objects
+                s3_plan["estimated_copy_seconds"] = round(
+                    objects
+                    * PLAN_SECONDS_PER_COPY
+                    / resource_filter.get("copy_workers", DEFAULT_COPY_WORKERS),
+                    1,
+                )
+            plan["resources"]["s3"] = s3_plan
+
+        snapshot_calls = sum(
+            r["api_calls"] for t, r in plan["resources"].items() if t != "s3"
+        )
+        snapshot_sizes = [
+            size
+            for t, r in plan["resources"].items()
+            if t != "s3"
+            for size in r["sizes_gib"]
+        ]
+        plan["totals"] = {
+            "api_calls": sum(r["api_calls"] for r in plan["resources"].values()),
+            "snapshot_storage_gib": sum(snapshot_sizes),
+            "copy_storage_gib": sum(
+                plan["resources"].get("s3", {}).get("sizes_gib", [])
+            ),
+            # Create calls run max_in_flight at a time
+            "estimated_start_seconds": round(
+                -(-snapshot_calls // self.max_in_flight) * PLAN_SECONDS_PER_CALL, 1
+            ),
+            # Snapshots complete in parallel, so the largest one sets the pace
+            "estimated_completion_hours": round(
+                max(snapshot_sizes, default=0) / PLAN_SNAPSHOT_GIB_PER_HOUR, 1
+            ),
+        }
+
+        for resource in plan["resources"].values():
+            resource["size_gib"] = sum(resource.pop("sizes_gib"))
+            resource["ids_total"] = len(resource["ids"])
+            if max_ids is not None:
+                resource["ids"] = resource["ids"][:max_ids]
+
+        return plan
+
     def snapshot_all(self, resource_filter: Optional[Dict] = None) -> Dict:
         """
         Create all snapshots.
 
+        The resource types run concurrently. Their create calls share the
+        manager's max_in_flight budget, so running them together does not
+        raise the load on the snapshot APIs.
+
         Args:
             resource_filter: Filter for specific resources
 
@@ -366,26 +2041,53 @@ class ResourceSnapshotManager:
             "snapshots": {},
         }
 
-        # Filter or create all snapshots
-        if not resource_filter or "ebs" in resource_filter:
-            results["snapshots"]["ebs"] = self.snapshot_ebs_volumes(
-                resource_filter.get("volume_ids") if resource_filter else None
+        resource_filter = resource_filter or {}
+        selected = self._selected_types(resource_filter)
+        instance_mode = resource_filter.get("instance_mode", "ami")
+
+        # Look up reusable snapshots once, before the steps run in parallel
+        self._reusable_snapshots()
+
+        def volume_steps() -> Dict:
+            # Instance-level volume snapshots go first so that the EBS step
+            # can skip the volumes they already captured
+            step_results = {}
+            if "ec2" in selected and instance_mode == "volumes":
+                step_results["instance_volumes"] = self.snapshot_ec2_instances(
+                    resource_filter.get("instance_ids"), mode="volumes"
+                )
+            if "ebs" in selected:
+                step_results["ebs"] = self.snapshot_ebs_volumes(
+                    resource_filter.get("volume_ids"),
+                    group_by_instance=resource_filter.get("group_by_instance", False),
+                )
+            return step_results
+
+        steps: Dict[str, Callable[[], Any]] = {"volumes": volume_steps}
+        if "rds" in selected:
+            steps["rds"] = lambda: self.snapshot_rds_databases(
+                resource_filter.get("db_instances")
             )
-
-        if not resource_filter or "rds" in resource_filter:
-            results["snapshots"]["rds"] = self.snapshot_rds_databases(
-                resource_filter.get("db_instances") if resource_filter else None
+        if "ec2" in selected and instance_mode == "ami":
+            steps["ami"] = lambda: self.snapshot_ec2_instances(
+                resource_filter.get("instance_ids")
             )
-
-        if not resource_filter or "ec2" in resource_filter:
-            results["snapshots"]["ami"] = self.snapshot_ec2_instances(
-                resource_filter.get("instance_ids") if resource_filter else None
+        if "s3" in selected:
+            steps["s3"] = lambda: self.backup_s3_buckets(
+                resource_filter.get("buckets"),
+                backup_bucket=resource_filter.get("backup_bucket"),
+                copy_workers=resource_filter.get("copy_workers", DEFAULT_COPY_WORKERS),
+                manifest_path=resource_filter.get("copy_manifest"),
             )
 
-        if not resource_filter or "s3" in resource_filter:
-            results["snapshots"]["s3"] = self.backup_s3_buckets(
-                resource_filter.get("buckets") if resource_filter else None
-            )
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            futures = {name: executor.submit(step) for name, step in steps.items()}
+
+        for name, future in futures.items():
+            if name == "volumes":
+                results["snapshots"].update(future.result())
+            else:
+                results["snapshots"][name] = future.result()
 
         # Create manifest
         results["manifest"] = self.create_manifest()
@@ -409,36 +2111,131 @@ def main():
     parser.add_argument("--db-instances", help="Comma-separated RDS instance IDs")
     parser.add_argument("--instance-ids", help="Comma-separated EC2 instance IDs")
     parser.add_argument("--buckets", help="Comma-separated S3 bucket names")
+    parser.add_argument(
+        "--backup-bucket", help="Evidence bucket to copy S3 objects into"
+    )
+    parser.add_argument(
+        "--copy-workers",
+        type=int,
+        default=DEFAULT_COPY_WORKERS,
+        help="Concurrent S3 copy calls per bucket",
+    )
+    parser.add_argument("--copy-manifest", help="Resumable S3 copy manifest path")
+    parser.add_argument(
+        "--instance-mode",
+        choices=["ami", "volumes"],
+        default="ami",
+        help="Capture instances as AMIs or as one multi-volume snapshot set each",
+    )
+    parser.add_argument(
+        "--group-by-instance",
+        action="store_true",
+        help="Snapshot attached EBS volumes with one call per instance",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Print targets and call, storage and duration estimates, then exit",
+    )
+    parser.add_argument(
+        "--plan-max-ids",
+        type=int,
+        help="Most resource IDs listed per type with --plan (all if omitted)",
+    )
+    parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Track snapshots until they complete and record final states",
+    )
+    parser.add_argument(
+        "--wait-timeout", type=float, help="Maximum seconds to wait with --wait"
+    )
+    parser.add_argument(
+        "--export-dir",
+        help="Export completed EBS snapshots to raw images here (implies --wait)",
+    )
+    parser.add_argument(
+        "--export-workers",
+        type=int,
+        default=EXPORT_BLOCK_WORKERS,
+        help="Concurrent block fetches per exported image",
+    )
+    parser.add_argument(
+        "--reuse-within-hours",
+        type=float,
+        default=24.0,
+        help="Reuse this incident's snapshots newer than this (0 to always snapshot)",
+    )
+    parser.add_argument(
+        "--inventory-dir",
+        default="./incident-inventory",
+        help="Resource inventory cache shared by the forensics scripts",
+    )
+    parser.add_argument(
+        "--inventory-ttl",
+        type=float,
+        default=DEFAULT_INVENTORY_TTL,
+        help="Seconds cached inventory stays valid",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=10,
+        help="Maximum snapshot API calls in flight at once",
+    )
 
     args = parser.parse_args()
 
     # Parse filter
-    resource_filter = None
-    if args.resource_type:
-        resource_filter = {args.resource_type}
+    resource_filter: Dict[str, Any] = {}
+    if args.resource_type and args.resource_type != "all":
+        resource_filter[args.resource_type] = True
 
     # Parse IDs
     if args.volume_ids:
-        if not resource_filter:
-            resource_filter = {}
         resource_filter["volume_ids"] = args.volume_ids.split(",")
     if args.db_instances:
-        if not resource_filter:
-            resource_filter = {}
         resource_filter["db_instances"] = args.db_instances.split(",")
     if args.instance_ids:
-        if not resource_filter:
-            resource_filter = {}
         resource_filter["instance_ids"] = args.instance_ids.split(",")
     if args.buckets:
-        if not resource_filter:
-            resource_filter = {}
         resource_filter["buckets"] = args.buckets.split(",")
 
+    # Parse options
+    resource_filter["instance_mode"] = args.instance_mode
+    resource_filter["group_by_instance"] = args.group_by_instance
+    resource_filter["copy_workers"] = args.copy_workers
+    if args.backup_bucket:
+        resource_filter["backup_bucket"] = args.backup_bucket
+    if args.copy_manifest:
+        resource_filter["copy_manifest"] = args.copy_manifest
+
     # Run snapshot
-    manager = ResourceSnapshotManager(args.incident_id)
+    manager = ResourceSnapshotManager(
+        args.incident_id,
+        max_in_flight=args.max_in_flight,
+        reuse_within_hours=args.reuse_within_hours,
+        inventory=ResourceInventory(
+            args.incident_id, args.inventory_dir, args.inventory_ttl
+        ),
+    )
+    if args.plan:
+        plan = manager.plan(resource_filter, args.plan_max_ids)
+        print(json.dumps(plan, indent=2, default=str))
+        return
+
     results = manager.snapshot_all(resource_filter)
 
+    if args.wait or args.export_dir:
+        manager.wait_for_completion(timeout=args.wait_timeout)
+        results["manifest"] = manager.create_manifest()
+
+    if args.export_dir:
+        results["exports"] = manager.export_ebs_images(
+            args.export_dir, args.export_workers
+        )
+        results["manifest"] = manager.create_manifest()
+
     # Print results
     print(json.dumps(results, indent=2, default=str))
 
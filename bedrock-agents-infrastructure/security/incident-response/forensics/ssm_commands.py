@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Batched SSM Run Command dispatch and result collection for incident forensics.
+
+Instead of one send_command call per instance, commands are sent to up to
+50 instance IDs per call (or to tag targets in a single call), with SSM
+rate-controlling the fleet through MaxConcurrency and MaxErrors. Command
+IDs are mapped back to the instances they ran on, and SSMResultCollector
+gathers every invocation's output once it finishes.
+
+Usage:
+    python3 ssm_commands.py --instance-ids i-1234567,i-7654321 --command "uptime"
+"""
+
+import argparse
+import json
+import boto3
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+# send_command accepts at most 50 instance IDs per call
+SSM_MAX_INSTANCE_IDS = 50
+
+RETRYABLE_SSM_ERRORS = {"ThrottlingException", "Throttling", "TooManyUpdates"}
+
+# Invocation states that have not produced their final output yet
+PENDING_INVOCATION_STATES = {"Pending", "InProgress", "Delayed", "Cancelling"}
+
+# Shell lines that set $INSTANCE_ID on the host through IMDSv2, so one
+# command sent to many instances still writes per-instance evidence keys
+INSTANCE_ID_SHELL = [
+    "TOKEN=$(curl -s -X PUT http://169.254.169.254/latest/api/token "
+    '-H "X-aws-ec2-metadata-token-ttl-seconds: 300")',
+    'INSTANCE_ID=$(curl -s -H "X-aws-ec2-metadata-token: $TOKEN" '
+    "http://169.254.169.254/latest/meta-data/instance-id)",
+]
+
+
+class SSMCommandDispatcher:
+    """Sends shell commands to many instances with few SSM calls."""
+
+    def __init__(
+        self,
+        max_concurrency: str = "50",
+        max_errors: str = "10%",
+        max_retries: int = 5,
+        max_workers: int = 4,
+    ):
+        """
+        Initialize command dispatcher.
+
+        Args:
+            max_concurrency: Instances SSM runs a command on at once
+                (count or percentage)
+            max_errors: Failures after which SSM stops sending the command
+                to more instances (count or percentage)
+            max_retries: Retries for throttled send_command calls
+            max_workers: Batches of instance IDs sent at once
+        """
+        self.max_concurrency = max_concurrency
+        self.max_errors = max_errors
+        self.max_retries = max_retries
+        self.max_workers = max_workers
+
+        self.ssm = boto3.client("ssm")
+
+    def _send(self, **kwargs: Any) -> Dict:
+        """Call send_command, retrying throttling with jittered backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.ssm.send_command(**kwargs)["Command"]
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in RETRYABLE_SSM_ERRORS or attempt == self.max_retries:
+                    raise
+                delay = random.uniform(0, min(30.0, 2**attempt))
+                logger.warning(f"{code} sending command, retrying in {delay:.1f}s")
+                time.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    def send(
+        self,
+        commands: List[str],
+        instance_ids: Optional[List[str]] = None,
+        targets: Optional[List[Dict]] = None,
+        comment: str = "",
+        timeout_seconds: Optional[int] = None,
+        max_concurrency: Optional[str] = None,
+    ) -> Dict:
+        """
+        Send a shell script to instances in batches, or to tag targets.
+
+        Batches are sent concurrently, so the last batch reaches SSM about as
+        soon as the first.
+
+        Args:
+            commands: Shell lines for AWS-RunShellScript
+            instance_ids: Instances to run on, sent 50 per call
+            targets: SSM targets (e.g. [{"Key": "tag:Role", "Values": ["web"]}])
+                used instead of instance IDs
+            comment: Command comment shown in the SSM console
+            timeout_seconds: Execution timeout for the script
+            max_concurrency: MaxConcurrency for this command instead of the
+                dispatcher's (e.g. "100%" when every host must start at once)
+
+        Returns:
+            Dictionary with one entry per command sent, the instance to
+            command ID mapping, and per-batch errors
+        """
+        base: Dict[str, Any] = {
+            "DocumentName": "AWS-RunShellScript",
+            "Parameters": {"commands": commands},
+            "MaxConcurrency": max_concurrency or self.max_concurrency,
+            "MaxErrors": self.max_errors,
+            "Comment": comment[:100],
+        }
+        if timeout_seconds:
+            base["Parameters"]["executionTimeout"] = [str(timeout_seconds)]
+
+        sent: List[Dict] = []
+        errors: List[Dict] = []
+        instance_commands: Dict[str, str] = {}
+
+        if targets:
+            try:
+                command = self._send(Targets=targets, **base)
+                sent.append({"command_id": command["CommandId"], "targets": targets})
+            except Exception as e:
+                logger.error(f"Error sending command to targets {targets}: {e}")
+                errors.append({"targets": targets, "error": str(e)})
+
+        ids = list(dict.fromkeys(instance_ids or []))
+        batches = [
+            ids[i : i + SSM_MAX_INSTANCE_IDS]
+            for i in range(0, len(ids), SSM_MAX_INSTANCE_IDS)
+        ]
+
+        def send_batch(batch: List[str]) -> Dict:
+            try:
+                return self._send(InstanceIds=batch, **base)
+            except Exception as e:
+                logger.error(f"Error sending command to {len(batch)} instances: {e}")
+                return {"error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch, command in zip(batches, executor.map(send_batch, batches)):
+                if "error" in command:
+                    errors.append({"instance_ids": batch, "error": command["error"]})
+                    continue
+                sent.append({"command_id": command["CommandId"], "instance_ids": batch})
+                for instance_id in batch:
+                    instance_commands[instance_id] = command["CommandId"]
+
+        logger.info(
+            f"Sent {len(sent)} commands covering {len(instance_commands)} instances"
+            + (" plus tag targets" if targets else "")
+        )
+        return {
+            "commands": sent,
+            "instance_commands": instance_commands,
+            "errors": errors,
+        }
+
+    def resolve_instances(self, command_id: str) -> List[str]:
+        """
+        Instances a command was sent to, e.g. one sent to tag targets.
+
+        Args:
+            command_id: SSM command ID
+
+        Returns:
+            Instance IDs with an invocation of the command
+        """
+        paginator = self.ssm.get_paginator("list_command_invocations")
+        return [
+            invocation["InstanceId"]
+            for page in paginator.paginate(CommandId=command_id)
+            for invocation in page.get("CommandInvocations", [])
+        ]
+
+
+class SSMResultCollector:
+    """
+    Collects the output of SSM commands for every instance they ran on.
+
+    Each polling round pages through list_command_invocations with
+    Details=True for the commands still running, concurrently across
+    commands. Invocations that have finished get their full stdout and
+    stderr fetched concurrently with get_command_invocation, once each.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        poll_interval: float = 10.0,
+        max_poll_interval: float = 60.0,
+    ):
+        """
+        Initialize result collector.
+
+        Args:
+            max_workers: Concurrent SSM calls
+            poll_interval: Initial seconds between polling rounds
+            max_poll_interval: Upper bound for the growing poll interval
+        """
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+
+        self.ssm = boto3.client("ssm")
+
+        # Latest result per (command ID, instance ID)
+        self.results: Dict[Tuple[str, str], Dict] = {}
+
+    def _list_invocations(self, command_id: str) -> List[Dict]:
+        """Every invocation of a command, with plugin details."""
+        paginator = self.ssm.get_paginator("list_command_invocations")
+        return [
+            invocation
+            for page in paginator.paginate(CommandId=command_id, Details=True)
+            for invocation in page.get("CommandInvocations", [])
+        ]
+
+    @staticmethod
+    def _entry(invocation: Dict) -> Dict:
+        """Result entry from a list_command_invocations item."""
+        plugin = (invocation.get("CommandPlugins") or [{}])[0]
+        entry = {
+            "command_id": invocation["CommandId"],
+            "instance_id": invocation["InstanceId"],
+            "status": invocation["Status"],
+            "status_details": invocation.get("StatusDetails"),
+            "response_code": plugin.get("ResponseCode"),
+            "requested_time": str(invocation.get("RequestedDateTime", "")),
+            # Truncated output until the full output is fetched
+            "stdout": plugin.get("Output", ""),
+            "stdout_url": invocation.get("StandardOutputUrl")
+            or plugin.get("StandardOutputUrl"),
+            "stderr_url": invocation.get("StandardErrorUrl")
+            or plugin.get("StandardErrorUrl"),
+            "pending": invocation["Status"] in PENDING_INVOCATION_STATES,
+        }
+        if plugin.get("OutputS3BucketName"):
+            entry["s3_output"] = (
+                f"s3://{plugin['OutputS3BucketName']}/"
+                f"{plugin.get('OutputS3KeyPrefix', '')}"
+            )
+        return entry
+
+    def _fetch_output(self, entry: Dict) -> None:
+        """Fill in the full stdout and stderr of a finished invocation."""
+        try:
+            response = self.ssm.get_command_invocation(
+                CommandId=entry["command_id"], InstanceId=entry["instance_id"]
+            )
+            entry["stdout"] = response.get("StandardOutputContent", entry["stdout"])
+            entry["stderr"] = response.get("StandardErrorContent", "")
+            entry["response_code"] = response.get(
+                "ResponseCode", entry["response_code"]
+            )
+            entry["completed_time"] = response.get("ExecutionEndDateTime")
+        except Exception as e:
+            logger.warning(
+                f"Could not fetch output of {entry['command_id']} "
+                f"on {entry['instance_id']}: {e}"
+            )
+            entry["output_error"] = str(e)
+
+    def poll_once(self, command_ids: List[str]) -> List[str]:
+        """
+        Poll commands once and update results.
+
+        Returns:
+            Command IDs that still have unfinished invocations
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listings = dict(
+                zip(command_ids, executor.map(self._list_invocations, command_ids))
+            )
+
+            finished = []
+            still_pending = []
+            for command_id, invocations in listings.items():
+                # A command whose invocations are not listed yet is pending
+                if not invocations or any(
+                    i["Status"] in PENDING_INVOCATION_STATES for i in invocations
+                ):
+                    still_pending.append(command_id)
+
+                for invocation in invocations:
+                    key = (command_id, invocation["InstanceId"])
+                    previous = self.results.get(key)
+                    if previous is not None and not previous["pending"]:
+                        continue
+                    entry = self._entry(invocation)
+                    self.results[key] = entry
+                    if not entry["pending"]:
+                        finished.append(entry)
+
+            list(executor.map(self._fetch_output, finished))
+
+        return still_pending
+
+    def by_instance(self) -> Dict[str, Dict[str, Dict]]:
+        """Results grouped as {instance_id: {command_id: result}}."""
+        grouped: Dict[str, Dict[str, Dict]] = {}
+        for (command_id, instance_id), entry in self.results.items():
+            grouped.setdefault(instance_id, {})[command_id] = entry
+        return grouped
+
+    def collect(
+        self,
+        command_ids: List[str],
+        timeout: Optional[float] = None,
+        on_progress: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict:
+        """
+        Poll until every invocation finishes or time runs out.
+
+        Args:
+            command_ids: Commands to collect
+            timeout: Maximum seconds to wait (poll once if 0, no limit if None)
+            on_progress: Called with the summary after every round
+
+        Returns:
+            Results by instance and a pending/done summary
+        """
+        started = time.time()
+        interval = self.poll_interval
+        pending = list(dict.fromkeys(command_ids))
+
+        while True:
+            try:
+                pending = self.poll_once(pending)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code")
+                if code not in RETRYABLE_SSM_ERRORS:
+                    raise
+                interval = min(self.max_poll_interval, interval * 2)
+                logger.warning(
+                    f"{code} while collecting, backing off to {interval:.0f}s"
+                )
+                time.sleep(interval)
+                continue
+
+            done = sum(not e["pending"] for e in self.results.values())
+            summary = {
+                "invocations": len(self.results),
+                "done": done,
+                "pending": len(self.results) - done,
+                "failed": sum(
+                    e["status"] not in PENDING_INVOCATION_STATES | {"Success"}
+                    for e in self.results.values()
+                ),
+                "commands_pending": len(pending),
+            }
+            logger.info(
+                f"SSM results: {summary['done']}/{summary['invocations']} "
+                f"invocations done, {summary['commands_pending']} commands pending"
+            )
+            if on_progress:
+                on_progress(summary)
+
+            elapsed = time.time() - started
+            if not pending or (timeout is not None and elapsed >= timeout):
+                return {
+                    "results": self.by_instance(),
+                    "summary": summary,
+                    "timed_out": bool(pending),
+                }
+
+            time.sleep(
+                interval if timeout is None else min(interval, timeout - elapsed)
+            )
+            interval = min(self.max_poll_interval, interval * 1.5)
+
+
+def parse_targets(target_tags: Optional[List[str]]) -> Optional[List[Dict]]:
+    """Turn KEY=VALUE[,VALUE] strings into SSM tag targets."""
+    if not target_tags:
+        return None
+    targets = []
+    for target in target_tags:
+        key, _, values = target.partition("=")
+        targets.append({"Key": f"tag:{key}", "Values": values.split(",")})
+    return targets
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run a shell command on many instances through SSM"
+    )
+    parser.add_argument("--instance-ids", help="Comma-separated EC2 instance IDs")
+    parser.add_argument(
+        "--target-tag",
+        action="append",
+        help="Run on instances with this tag, KEY=VALUE[,VALUE] (repeatable)",
+    )
+    parser.add_argument(
+        "--command", action="append", required=True, help="Shell line (repeatable)"
+    )
+    parser.add_argument("--max-concurrency", default="50", help="SSM MaxConcurrency")
+    parser.add_argument("--max-errors", default="10%", help="SSM MaxErrors")
+    parser.add_argument(
+        "--wait",
+        type=float,
+        metavar="SECONDS",
+        help="Collect command output, waiting up to this many seconds",
+    )
+
+    args = parser.parse_args()
+
+    dispatcher = SSMCommandDispatcher(args.max_concurrency, args.max_errors)
+    result = dispatcher.send(
+        args.command,
+        instance_ids=args.instance_ids.split(",") if args.instance_ids else None,
+        targets=parse_targets(args.target_tag),
+    )
+    if args.wait is not None:
+        result["output"] = SSMResultCollector().collect(
+            [c["command_id"] for c in result["commands"]], timeout=args.wait
+        )
+
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
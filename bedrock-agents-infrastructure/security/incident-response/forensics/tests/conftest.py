@@ -0,0 +1,19 @@
+"""Make the forensics scripts importable from the tests."""
+
+import importlib.util
+import os
+import sys
+
+FORENSICS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, FORENSICS_DIR)
+
+
+def load_script(filename: str):
+    """Import a forensics script whose file name is not a module name."""
+    name = filename[: -len(".py")].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(FORENSICS_DIR, filename)
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,134 @@
+"""Tests for connection_analysis."""
+
+from connection_analysis import ConnectionAnalyzer, parse_socket_line
+
+SS_LISTEN = (
+    "tcp   LISTEN 0      511    0.0.0.0:80     0.0.0.0:*    "
+    'users:(("nginx",pid=99,fd=6))'
+)
+SS_ESTAB = (
+    "tcp   ESTAB  0      0      10.0.0.5:40122 52.94.76.10:443 "
+    'users:(("curl",pid=4242,fd=3))'
+)
+
+
+def snapshot(taken_at, instance_id, lines, complete=True):
+    """Output of one snapshot_commands() snapshot."""
+    text = [f"### snapshot {taken_at} {instance_id}", "### sockets", *lines]
+    if complete:
+        text.append("### end")
+    return "\n".join(text) + "\n"
+
+
+def test_parses_ss_lines():
+    listener = parse_socket_line(SS_LISTEN)
+    assert listener["state"] == "LISTEN"
+    assert (listener["local_ip"], listener["local_port"]) == ("0.0.0.0", 80)
+    assert (listener["process"], listener["pid"]) == ("nginx", 99)
+
+    connection = parse_socket_line(SS_ESTAB)
+    assert (connection["peer_ip"], connection["peer_port"]) == ("52.94.76.10", 443)
+    assert (connection["process"], connection["pid"]) == ("curl", 4242)
+
+
+def test_parses_netstat_lines():
+    listener = parse_socket_line(
+        "tcp        0      0 0.0.0.0:80     0.0.0.0:*     LISTEN      99/nginx: master"
+    )
+    assert listener["state"] == "LISTEN"
+    assert (listener["process"], listener["pid"]) == ("nginx: master", 99)
+
+    connection = parse_socket_line(
+        "tcp6       0      0 ::ffff:10.0.0.5:22  [::ffff:198.51.100.4]:51000 "
+        "ESTABLISHED 1200/sshd: root@pts/0"
+    )
+    assert connection["state"] == "ESTAB"
+    assert connection["proto"] == "tcp"
+    assert connection["local_ip"] == "10.0.0.5"
+    assert (connection["peer_ip"], connection["peer_port"]) == ("198.51.100.4", 51000)
+    assert connection["process"] == "sshd: root@pts/0"
+
+    unconnected = parse_socket_line(
+        "udp        0      0 0.0.0.0:68     0.0.0.0:*                 812/dhclient"
+    )
+    assert unconnected["state"] == "UNCONN"
+    assert unconnected["process"] == "dhclient"
+
+    no_program = parse_socket_line(
+        "tcp        0      0 10.0.0.5:22    10.0.0.9:50000   TIME_WAIT   -"
+    )
+    assert no_program["state"] == "TIME-WAIT"
+    assert no_program["process"] is None
+
+
+def test_ignores_headers():
+    assert parse_socket_line("Netid State Recv-Q Send-Q Local Address:Port") is None
+    assert (
+        parse_socket_line("Active Internet connections (servers and established)")
+        is None
+    )
+
+
+def test_diff_reports_new_listeners_peers_and_gone_connections():
+    analyzer = ConnectionAnalyzer()
+    analyzer.add_text(snapshot(100, "i-a", [SS_LISTEN, SS_ESTAB]))
+    analyzer.add_text(
+        snapshot(
+            160,
+            "i-a",
+            [
+                SS_LISTEN,
+                "tcp   LISTEN 0  5  0.0.0.0:4444  0.0.0.0:*  "
+                'users:(("nc",pid=777,fd=3))',
+                "tcp   ESTAB  0  0  10.0.0.5:40200 52.95.110.1:8080 "
+                'users:(("python3",pid=778,fd=4))',
+            ],
+        )
+    )
+
+    [change] = analyzer.changes("i-a")
+    assert (change["from"], change["to"]) == (100, 160)
+    assert [(c["local_port"], c["process"]) for c in change["new_listeners"]] == [
+        (4444, "nc")
+    ]
+    assert change["closed_listeners"] == []
+    assert [c["peer_ip"] for c in change["new_peers"]] == ["52.95.110.1"]
+    assert [c["peer_ip"] for c in change["gone_connections"]] == ["52.94.76.10"]
+
+
+def test_truncated_snapshots_are_left_out_of_diffs():
+    analyzer = ConnectionAnalyzer()
+    analyzer.add_text(snapshot(100, "i-a", [SS_LISTEN, SS_ESTAB]))
+    analyzer.add_text(snapshot(160, "i-a", [SS_LISTEN], complete=False))
+    analyzer.add_text(snapshot(220, "i-a", [SS_LISTEN, SS_ESTAB]))
+
+    assert analyzer.incomplete == 1
+    assert analyzer.changes("i-a") == []
+
+
+def test_shared_peers_and_rare_listeners_roll_up_instances():
+    analyzer = ConnectionAnalyzer()
+    for instance_id in ("i-a", "i-b", "i-c"):
+        analyzer.add_text(snapshot(100, instance_id, [SS_LISTEN, SS_ESTAB]))
+    analyzer.add_text(
+        snapshot(
+            100,
+            "i-d",
+            [
+                SS_LISTEN,
+                'tcp LISTEN 0 5 0.0.0.0:4444 0.0.0.0:* users:(("nc",pid=7,fd=3))',
+            ],
+        )
+    )
+
+    [peer] = analyzer.shared_peers(min_hosts=2)
+    assert peer["ip"] == "52.94.76.10"
+    assert peer["instances"] == ["i-a", "i-b", "i-c"]
+    assert peer["processes"] == ["curl"]
+
+    [rare] = analyzer.rare_listeners(max_hosts=1)
+    assert (rare["port"], rare["instances"], rare["processes"]) == (
+        4444,
+        ["i-d"],
+        ["nc"],
+    )
@@ -0,0 +1,60 @@
+"""Tests for dns_analysis."""
+
+import struct
+
+from dns_analysis import DNSAnalyzer, decode_dns
+
+BINARY_LABEL = b"abc\xffdefghijklmnop"
+
+
+def query(labels, rcode=0, response=False):
+    """DNS message with one A question for the given raw labels."""
+    flags = (0x8000 if response else 0) | rcode
+    name = b"".join(bytes([len(label)]) + label for label in labels) + b"\0"
+    return struct.pack(">HHHHHH", 1, flags, 1, 0, 0, 0) + name + b"\x00\x01\x00\x01"
+
+
+def columns(records):
+    """Analyzer columns from (ts, client, qname, rcode, response) records."""
+    return {
+        "ts": [r[0] for r in records],
+        "client": [r[1] for r in records],
+        "qname": [r[2] for r in records],
+        "qtype": ["A"] * len(records),
+        "rcode": [r[3] for r in records],
+        "response": [r[4] for r in records],
+    }
+
+
+def test_binary_label_round_trips():
+    dns = decode_dns(query([BINARY_LABEL, b"example", b"com"]))
+    qname = dns["questions"][0][0]
+    assert qname.split(".")[0].encode("latin-1") == BINARY_LABEL
+
+
+def test_binary_label_is_scored_for_entropy():
+    qname = decode_dns(query([BINARY_LABEL, b"example", b"com"]))["questions"][0][0]
+    results = DNSAnalyzer(entropy_threshold=3.0).analyze(
+        columns([(1.0, "10.0.0.5", qname, 0, False)])
+    )
+    [hit] = results["high_entropy_labels"]
+    assert hit["label"].encode("latin-1") == BINARY_LABEL
+    assert hit["length"] == len(BINARY_LABEL)
+
+
+def test_nxdomain_bursts_per_client():
+    records = [(100.0 + i, "10.0.0.5", f"x{i}.example.com", 3, True) for i in range(25)]
+    # Interleaved client below the threshold, and a burst outside the window
+    records += [(100.5 + i, "10.0.0.6", f"y{i}.example.com", 3, True) for i in range(5)]
+    records += [
+        (1000.0 + 10 * i, "10.0.0.7", "z.example.com", 3, True) for i in range(25)
+    ]
+    analyzer = DNSAnalyzer(nxdomain_window=60.0, nxdomain_threshold=20)
+    results = analyzer.analyze(columns(records[::-1]))
+
+    [burst] = results["nxdomain_bursts"]
+    assert burst["client"] == "10.0.0.5"
+    assert burst["count"] == 25
+    assert burst["start"] == 100.0
+    assert burst["end"] == 124.0
+    assert burst["unique_names"] == 25
@@ -0,0 +1,137 @@
+"""Tests for flow_log_analytics."""
+
+import random
+from collections import defaultdict
+
+from flow_log_analytics import (
+    DEFAULT_FIELDS,
+    FlowLogAnalytics,
+    FlowLogTable,
+    ip_to_str,
+)
+
+
+def record(src, dst, dst_port, nbytes=100, start=1700000000, action="ACCEPT"):
+    """Default-format flow log line."""
+    return (
+        f"2 123456789012 eni-0abc {src} {dst} 40000 {dst_port} 6 1 {nbytes} "
+        f"{start} {start + 60} {action} OK"
+    )
+
+
+def table(lines):
+    return FlowLogTable.from_lines(lines, DEFAULT_FIELDS)
+
+
+def test_lines_with_wrong_width_are_skipped_even_when_totals_match():
+    good = record("10.0.0.1", "10.0.0.2", 443)
+    # One field too many followed by one too few: the token total is right
+    lines = [good, good + " extra", good.rsplit(" ", 1)[0], good]
+    t = table(lines)
+    assert len(t) == 2
+    assert t.skipped == 2
+    assert list(t.dst_port) == [443, 443]
+
+
+def test_lines_with_values_that_do_not_convert_are_skipped():
+    lines = [
+        record("10.0.0.1", "10.0.0.2", 443),
+        record("10.0.0.999", "10.0.0.2", 443),
+        record("10.0.0.1", "10.0.0.2", "https"),
+        record("10.0.0.3", "10.0.0.4", 22),
+    ]
+    t = table(lines)
+    assert [ip_to_str(a) for a in t.src] == ["10.0.0.1", "10.0.0.3"]
+    assert t.skipped == 2
+
+
+def test_nodata_and_ipv6_records_are_skipped():
+    lines = [
+        "2 123456789012 eni-0abc - - - - - - - 1700000000 1700000060 - NODATA",
+        record("2001:db8::1", "2001:db8::2", 443),
+        record("10.0.0.1", "10.0.0.2", 443),
+    ]
+    t = table(lines)
+    assert len(t) == 1
+    assert t.skipped == 2
+
+
+def test_port_scan_fanout_matches_brute_force():
+    rng = random.Random(7)
+    lines = [record("10.0.0.66", "10.0.1.5", port) for port in range(1, 151)]
+    lines += [record("10.0.0.77", f"10.0.2.{h}", 3389) for h in range(1, 61)]
+    lines += [
+        record(f"10.0.0.{rng.randint(1, 20)}", f"10.0.3.{rng.randint(1, 20)}", port)
+        for port in rng.choices([22, 80, 443], k=500)
+    ]
+    rng.shuffle(lines)
+
+    ports = defaultdict(set)
+    hosts = defaultdict(set)
+    for line in lines:
+        tokens = line.split()
+        ports[tokens[3], tokens[4]].add(tokens[6])
+        hosts[tokens[3], tokens[6]].add(tokens[4])
+    max_ports = defaultdict(int)
+    max_hosts = defaultdict(int)
+    for (src, _), seen in ports.items():
+        max_ports[src] = max(max_ports[src], len(seen))
+    for (src, _), seen in hosts.items():
+        max_hosts[src] = max(max_hosts[src], len(seen))
+
+    scans = FlowLogAnalytics(table(lines)).port_scan_fanout(min_ports=100, min_hosts=50)
+    assert {s["ip"]: s["pattern"] for s in scans} == {
+        "10.0.0.66": "vertical",
+        "10.0.0.77": "horizontal",
+    }
+    for scan in scans:
+        assert scan["max_ports_on_host"] == max_ports[scan["ip"]]
+        assert scan["max_hosts_on_port"] == max_hosts[scan["ip"]]
+
+
+def test_rejected_heatmap_buckets_by_time_and_port():
+    lines = [
+        record("10.0.0.1", "10.0.0.2", 22, start=3600 * 10 + 5, action="REJECT"),
+        record("10.0.0.1", "10.0.0.2", 22, start=3600 * 10 + 50, action="REJECT"),
+        record("10.0.0.1", "10.0.0.2", 23, start=3600 * 12, action="REJECT"),
+        record("10.0.0.1", "10.0.0.2", 8080, start=3600 * 12, action="REJECT"),
+        record("10.0.0.1", "10.0.0.2", 443, start=3600 * 11, action="ACCEPT"),
+    ]
+    heatmap = FlowLogAnalytics(table(lines)).rejected_heatmap(
+        bucket_seconds=3600, ports=2
+    )
+    assert heatmap["buckets"] == [
+        "1970-01-01T10:00:00+00:00",
+        "1970-01-01T11:00:00+00:00",
+        "1970-01-01T12:00:00+00:00",
+    ]
+    assert heatmap["ports"] == ["22", "23", "other"]
+    assert heatmap["counts"] == [[2, 0, 0], [0, 0, 0], [0, 1, 1]]
+
+
+def test_egress_counts_only_accepted_internal_to_external_bytes():
+    lines = [
+        record("10.0.0.1", "203.0.113.9", 443, nbytes=1000),
+        record("10.0.0.2", "203.0.113.9", 8443, nbytes=500),
+        record("10.0.0.1", "198.51.100.7", 443, nbytes=200),
+        record("10.0.0.1", "198.51.100.7", 443, nbytes=9999, action="REJECT"),
+        record("203.0.113.9", "10.0.0.1", 443, nbytes=7777),
+        record("10.0.0.1", "10.0.0.2", 443, nbytes=8888),
+    ]
+    egress = FlowLogAnalytics(table(lines)).egress_by_destination()
+    assert egress == [
+        {
+            "ip": "203.0.113.9",
+            "bytes": 1500,
+            "flows": 2,
+            "internal_sources": 2,
+            "ports": 2,
+        },
+        {
+            "ip": "198.51.100.7",
+            "bytes": 200,
+            "flows": 1,
+            "internal_sources": 1,
+            "ports": 1,
+        },
+    ]
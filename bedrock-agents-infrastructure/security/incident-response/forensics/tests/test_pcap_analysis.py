@@ -0,0 +1,125 @@
+"""Tests for pcap_analysis."""
+
+import json
+import socket
+import struct
+
+from pcap_analysis import (
+    IPPROTO_TCP,
+    IPPROTO_UDP,
+    LINKTYPE_ETHERNET,
+    LINKTYPE_LINUX_SLL2,
+    PcapFlowAnalyzer,
+    decode_packet,
+    format_address,
+    format_flags,
+)
+
+SYN, ACK = 0x02, 0x10
+
+
+def ipv4(src, dst, proto, l4, fragment_offset=0):
+    header = struct.pack(
+        ">BBHHHBBH4s4s",
+        0x45,
+        0,
+        20 + len(l4),
+        1,
+        fragment_offset,
+        64,
+        proto,
+        0,
+        socket.inet_aton(src),
+        socket.inet_aton(dst),
+    )
+    return header + l4
+
+
+def ipv6(src, dst, proto, l4):
+    return (
+        struct.pack(">IHBB", 6 << 28, len(l4), proto, 64)
+        + socket.inet_pton(socket.AF_INET6, src)
+        + socket.inet_pton(socket.AF_INET6, dst)
+        + l4
+    )
+
+
+def tcp(sport, dport, flags, payload=b""):
+    return (
+        struct.pack(">HHIIBBHHH", sport, dport, 0, 0, 5 << 4, flags, 0, 0, 0) + payload
+    )
+
+
+def udp(sport, dport, payload=b""):
+    return struct.pack(">HHHH", sport, dport, 8 + len(payload), 0) + payload
+
+
+def ethernet(l3, vlan=False):
+    header = b"\0" * 12
+    if vlan:
+        header += struct.pack(">HH", 0x8100, 5)
+    return header + struct.pack(">H", 0x0800) + l3
+
+
+def write_pcap(path, packets):
+    """Classic microsecond pcap of Ethernet frames from (ts, frame) pairs."""
+    with open(path, "wb") as f:
+        f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+        for ts, frame in packets:
+            usec = round((ts % 1) * 1e6)
+            f.write(struct.pack("<IIII", int(ts), usec, len(frame), len(frame)))
+            f.write(frame)
+    return str(path)
+
+
+def test_decodes_tcp_behind_vlan_tag():
+    frame = ethernet(ipv4("10.0.0.1", "10.0.0.2", 6, tcp(40000, 443, SYN, b"hi")), True)
+    packet = decode_packet(LINKTYPE_ETHERNET, frame)
+    assert packet.proto == IPPROTO_TCP
+    assert format_address(packet.src) == "10.0.0.1"
+    assert format_address(packet.dst) == "10.0.0.2"
+    assert (packet.sport, packet.dport) == (40000, 443)
+    assert format_flags(packet.flags) == ["SYN"]
+    assert frame[packet.payload :] == b"hi"
+
+
+def test_decodes_ipv6_udp_on_linux_sll2():
+    l3 = ipv6("2001:db8::1", "2001:db8::2", 17, udp(5353, 53, b"q"))
+    frame = struct.pack(">HH", 0x86DD, 0) + b"\0" * 16 + l3
+    packet = decode_packet(LINKTYPE_LINUX_SLL2, frame)
+    assert packet.proto == IPPROTO_UDP
+    assert format_address(packet.src) == "2001:db8::1"
+    assert (packet.sport, packet.dport) == (5353, 53)
+    assert frame[packet.payload :] == b"q"
+
+
+def test_later_fragments_and_short_frames_have_no_ports():
+    fragment = ipv4("10.0.0.1", "10.0.0.2", 17, udp(1, 2), fragment_offset=185)
+    packet = decode_packet(LINKTYPE_ETHERNET, ethernet(fragment))
+    assert (packet.sport, packet.dport, packet.payload) == (0, 0, -1)
+    assert decode_packet(LINKTYPE_ETHERNET, b"\0" * 10) is None
+
+
+def test_idle_gap_splits_a_flow(tmp_path):
+    frame = ethernet(ipv4("10.0.0.1", "10.0.0.2", 6, tcp(40000, 22, ACK)))
+    path = write_pcap(tmp_path / "a.pcap", [(0, frame), (1, frame), (200, frame)])
+
+    result = PcapFlowAnalyzer(idle_timeout=120).analyze_file(path)
+    assert result["flows"] == 2
+    assert sorted(f["packets"] for f in result["top_flows"]) == [1, 2]
+    assert result["talkers"]["10.0.0.1"] == [3 * len(frame), 3, 2]
+
+
+def test_flow_cap_ends_flows_without_losing_packets(tmp_path):
+    packets = []
+    for i in range(10):
+        l3 = ipv4(f"10.0.0.{i + 1}", "10.0.1.1", 17, udp(1000 + i, 53))
+        packets.append((i, ethernet(l3)))
+    path = write_pcap(tmp_path / "a.pcap", packets)
+    flows_path = tmp_path / "flows.jsonl"
+
+    result = PcapFlowAnalyzer(max_flows=4).analyze_file(path, str(flows_path))
+    records = [json.loads(line) for line in flows_path.read_text().splitlines()]
+    assert result["flows"] == len(records) == 10
+    assert sum(r["packets"] for r in records) == result["packets"] == 10
+    assert {r["src_port"] for r in records} == set(range(1000, 1010))
@@ -0,0 +1,193 @@
+"""Tests for ssm_commands."""
+
+from unittest import mock
+
+from botocore.exceptions import ClientError
+
+import ssm_commands
+from ssm_commands import SSMCommandDispatcher, SSMResultCollector
+
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "SendCommand")
+
+
+class Pager:
+    """Paginator handing out one listing (or error) per poll, in two pages."""
+
+    def __init__(self, listings):
+        self.listings = listings
+
+    def paginate(self, CommandId, Details=False):
+        invocations = self.listings[CommandId].pop(0)
+        if isinstance(invocations, Exception):
+            raise invocations
+        yield {"CommandInvocations": invocations[:1]}
+        yield {"CommandInvocations": invocations[1:]}
+
+
+def invocation(command_id, instance_id, status, output=""):
+    return {
+        "CommandId": command_id,
+        "InstanceId": instance_id,
+        "Status": status,
+        "CommandPlugins": [
+            {
+                "Output": output,
+                "ResponseCode": 0 if status == "Success" else -1,
+                "OutputS3BucketName": "evidence",
+                "OutputS3KeyPrefix": f"ssm/{instance_id}",
+            }
+        ],
+    }
+
+
+def collector(listings):
+    with mock.patch.object(ssm_commands.boto3, "client"):
+        c = SSMResultCollector(max_workers=4, poll_interval=0)
+    c.ssm.get_paginator.return_value = Pager(listings)
+    c.ssm.get_command_invocation.side_effect = lambda CommandId, InstanceId: {
+        "StandardOutputContent": f"full output of {InstanceId}",
+        "StandardErrorContent": "",
+        "ResponseCode": 0,
+    }
+    return c
+
+
+def dispatcher(**kwargs):
+    with mock.patch.object(ssm_commands.boto3, "client"):
+        return SSMCommandDispatcher(**kwargs)
+
+
+def test_send_batches_instance_ids_and_maps_commands_back():
+    d = dispatcher(max_concurrency="25%", max_errors="5")
+    # Batches are sent from several threads; name commands after the batch
+    d.ssm.send_command.side_effect = lambda **kw: {
+        "Command": {"CommandId": f"cmd-{kw['InstanceIds'][0]}"}
+    }
+    ids = [f"i-{n:04d}" for n in range(120)]
+
+    result = d.send(["uptime"], instance_ids=ids + ids[:10], comment="x" * 150)
+
+    calls = [c.kwargs for c in d.ssm.send_command.call_args_list]
+    assert sorted(len(c["InstanceIds"]) for c in calls) == [20, 50, 50]
+    assert all(c["MaxConcurrency"] == "25%" and c["MaxErrors"] == "5" for c in calls)
+    assert all(len(c["Comment"]) == 100 for c in calls)
+    assert result["errors"] == []
+    assert set(result["instance_commands"]) == set(ids)
+    for sent in result["commands"]:
+        for instance_id in sent["instance_ids"]:
+            assert result["instance_commands"][instance_id] == sent["command_id"]
+
+
+def test_send_to_targets_uses_one_call():
+    d = dispatcher()
+    d.ssm.send_command.return_value = {"Command": {"CommandId": "cmd-1"}}
+    targets = ssm_commands.parse_targets(["Role=web,api"])
+
+    result = d.send(["uptime"], targets=targets, max_concurrency="100%")
+
+    [call] = d.ssm.send_command.call_args_list
+    assert call.kwargs["Targets"] == [{"Key": "tag:Role", "Values": ["web", "api"]}]
+    assert call.kwargs["MaxConcurrency"] == "100%"
+    assert result["commands"] == [{"command_id": "cmd-1", "targets": targets}]
+
+
+def test_throttled_sends_are_retried_with_backoff():
+    d = dispatcher(max_retries=3)
+    d.ssm.send_command.side_effect = [
+        client_error("ThrottlingException"),
+        client_error("TooManyUpdates"),
+        {"Command": {"CommandId": "cmd-1"}},
+    ]
+    with mock.patch.object(ssm_commands.time, "sleep") as sleep:
+        result = d.send(["uptime"], instance_ids=["i-1"])
+
+    assert d.ssm.send_command.call_count == 3
+    assert sleep.call_count == 2
+    assert result["instance_commands"] == {"i-1": "cmd-1"}
+
+
+def test_failed_batches_are_reported_without_retrying():
+    d = dispatcher(max_retries=3)
+    d.ssm.send_command.side_effect = client_error("InvalidInstanceId")
+    with mock.patch.object(ssm_commands.time, "sleep") as sleep:
+        result = d.send(["uptime"], instance_ids=["i-1", "i-2"])
+
+    assert d.ssm.send_command.call_count == 1
+    sleep.assert_not_called()
+    assert result["commands"] == []
+    assert result["errors"][0]["instance_ids"] == ["i-1", "i-2"]
+
+
+def test_retries_stop_after_max_retries():
+    d = dispatcher(max_retries=2)
+    d.ssm.send_command.side_effect = client_error("Throttling")
+    with mock.patch.object(ssm_commands.time, "sleep"):
+        result = d.send(["uptime"], instance_ids=["i-1"])
+
+    assert d.ssm.send_command.call_count == 3
+    assert len(result["errors"]) == 1
+
+
+def test_collect_polls_until_every_invocation_is_done():
+    c = collector(
+        {
+            "cmd-1": [
+                [
+                    invocation("cmd-1", "i-1", "InProgress"),
+                    invocation("cmd-1", "i-2", "Success", "trunc"),
+                ],
+                [
+                    invocation("cmd-1", "i-1", "Failed"),
+                    invocation("cmd-1", "i-2", "Success", "trunc"),
+                ],
+            ],
+            "cmd-2": [[invocation("cmd-2", "i-1", "Success")]],
+        }
+    )
+    with mock.patch.object(ssm_commands.time, "sleep"):
+        result = c.collect(["cmd-1", "cmd-2", "cmd-1"])
+
+    assert not result["timed_out"]
+    assert result["summary"] == {
+        "invocations": 3,
+        "done": 3,
+        "pending": 0,
+        "failed": 1,
+        "commands_pending": 0,
+    }
+    i2 = result["results"]["i-2"]["cmd-1"]
+    assert i2["stdout"] == "full output of i-2"
+    assert i2["s3_output"] == "s3://evidence/ssm/i-2"
+    assert set(result["results"]["i-1"]) == {"cmd-1", "cmd-2"}
+    # Finished invocations have their output fetched once
+    assert c.ssm.get_command_invocation.call_count == 3
+
+
+def test_collect_reports_pending_instances_on_timeout():
+    c = collector({"cmd-1": [[invocation("cmd-1", "i-1", "InProgress")]]})
+    result = c.collect(["cmd-1"], timeout=0)
+
+    assert result["timed_out"]
+    assert result["results"]["i-1"]["cmd-1"]["pending"]
+    assert result["summary"]["pending"] == 1
+    c.ssm.get_command_invocation.assert_not_called()
+
+
+def test_collect_backs_off_when_throttled():
+    c = collector(
+        {
+            "cmd-1": [
+                client_error("ThrottlingException"),
+                client_error("ThrottlingException"),
+                [invocation("cmd-1", "i-1", "Success")],
+            ]
+        }
+    )
+    c.poll_interval = 5.0
+    with mock.patch.object(ssm_commands.time, "sleep") as sleep:
+        result = c.collect(["cmd-1"])
+
+    assert [call.args[0] for call in sleep.call_args_list] == [10.0, 20.0]
+    assert result["summary"]["done"] == 1
@@ -0,0 +1,130 @@
+"""Tests for timeline-builder."""
+
+import random
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from conftest import load_script
+
+timeline_builder = load_script("timeline-builder.py")
+
+
+def edge_weight(graph, a, b):
+    """Weight of the edge between two entity names."""
+    low, high = sorted((graph._node_ids[a], graph._node_ids[b]))
+    return graph._edge_weight[graph._edge_index[(low << 32) | high]]
+
+
+def test_edge_weight_counts_distinct_windows_out_of_order():
+    graph = timeline_builder.EntityGraph(window_seconds=300)
+    entities = ["principal:alice", "ip:203.0.113.7"]
+
+    # Windows 1, 2, 1, 2 as a late collector would deliver them
+    for epoch in (300, 600, 310, 610):
+        graph.add_event(entities, epoch)
+
+    assert edge_weight(graph, *entities) == 2
+
+
+def test_edge_weight_counts_each_window_once():
+    graph = timeline_builder.EntityGraph(window_seconds=300)
+    entities = ["principal:alice", "ip:203.0.113.7", "key:AKIAEXAMPLE"]
+
+    for epoch in (0, 10, 299, 900):
+        graph.add_event(entities, epoch)
+
+    assert edge_weight(graph, "principal:alice", "key:AKIAEXAMPLE") == 2
+    assert graph.edge_count == 3
+
+
+def test_pruned_windows_are_not_recounted():
+    graph = timeline_builder.EntityGraph(window_seconds=300)
+    entities = ["principal:alice", "ip:203.0.113.7"]
+    for epoch in (300, 600, 900, 1200):
+        graph.add_event(entities, epoch)
+
+    graph.prune_windows(900)
+    assert len(graph._edge_windows) == 2
+
+    # Re-read inside the horizon, then a straggler from before it
+    for epoch in (910, 1210, 1500, 320):
+        graph.add_event(entities, epoch)
+
+    assert edge_weight(graph, *entities) == 5
+
+
+def test_clusters_follow_union_find_merges():
+    graph = timeline_builder.EntityGraph()
+    rng = random.Random(7)
+    names = [f"ip:10.0.0.{i}" for i in range(40)]
+    for epoch in range(200):
+        graph.add_event(rng.sample(names, 2), epoch)
+
+    expected = {}
+    for node in range(graph.node_count):
+        expected.setdefault(graph._find(node), set()).add(node)
+    assert sorted(map(sorted, graph._members.values())) == sorted(
+        map(sorted, expected.values())
+    )
+    assert graph.clusters(min_size=1)[0]["size"] == max(map(len, expected.values()))
+
+
+def test_late_events_merge_into_time_order():
+    with mock.patch.object(timeline_builder.boto3, "client"):
+        builder = timeline_builder.TimelineBuilder(
+            "INC", datetime(2024, 1, 1, tzinfo=timezone.utc)
+        )
+
+    def event(i, epoch):
+        timestamp = datetime.fromtimestamp(epoch, timezone.utc).isoformat()
+        return {"event_id": f"e{i}", "timestamp": timestamp, "source": "CloudTrail"}
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+    for i in range(100):
+        builder._ingest(event(i, start + 60 * i))
+    builder._merge_pending()
+
+    # A refresh whose events land before and among the stored ones
+    for i in range(100, 130):
+        builder._ingest(event(i, start + 60 * (i - 100) * 3 + 30))
+    builder._merge_pending()
+
+    epochs = [builder._event_epoch(e) for e in builder.iter_timeline()]
+    assert len(epochs) == 130
+    assert epochs == sorted(epochs)
+    assert len(builder.events) == 130
+
+
+def test_update_only_rereads_cloudtrail():
+    with mock.patch.object(timeline_builder.boto3, "client"):
+        builder = timeline_builder.TimelineBuilder(
+            "INC", datetime(2024, 1, 1, tzinfo=timezone.utc)
+        )
+    builder.watermark = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+    with mock.patch.object(builder, "collect_events", return_value=[]) as collect:
+        builder.update()
+
+    assert collect.call_args.kwargs["sources"] == ["cloudtrail"]
+
+
+def test_archive_partitions_use_utc_dates():
+    with mock.patch.object(timeline_builder.boto3, "client"):
+        builder = timeline_builder.TimelineBuilder(
+            "INC", datetime(2024, 1, 1, tzinfo=timezone.utc)
+        )
+    prefixes = {
+        "AWSLogs/": ["AWSLogs/123456789012/"],
+        "AWSLogs/123456789012/CloudTrail/": [
+            "AWSLogs/123456789012/CloudTrail/us-east-1/"
+        ],
+    }
+    builder._list_common_prefixes = prefixes.get
+
+    # 20:00-22:00 at UTC-5 is 01:00-03:00 UTC the next day
+    eastern = timezone(timedelta(hours=-5))
+    partitions = builder._archive_partitions(
+        datetime(2024, 3, 9, 20, tzinfo=eastern),
+        datetime(2024, 3, 9, 22, tzinfo=eastern),
+    )
+    assert partitions == ["AWSLogs/123456789012/CloudTrail/us-east-1/2024/03/10/"]
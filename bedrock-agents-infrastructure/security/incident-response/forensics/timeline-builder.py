@@ -10,18 +10,467 @@ Usage:
 """
 
 import argparse
+import bisect
+import gzip
+import heapq
 import json
 import boto3
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import multiprocessing
+import os
+import queue
+import re
+import threading
+import time
+from array import array
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from collections import defaultdict
 
+import numpy as np
+
+from resource_inventory import DEFAULT_INVENTORY_TTL, ResourceInventory
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Marker a collector task puts on the event queue when it has finished
+_COLLECTOR_DONE = object()
+
+# Width of the per-source-IP correlation windows
+CORRELATION_WINDOW_SECONDS = 300
+
+# Width of the time buckets the event store is kept in; a refresh only
+# re-sorts the buckets its events fall into
+EVENT_BUCKET_SECONDS = CORRELATION_WINDOW_SECONDS
+
+# Sources update() re-reads; the others only start queries, once per build
+INCREMENTAL_SOURCES = ["cloudtrail"]
+
+# Event fields broken down in the exported histograms
+HISTOGRAM_DIMENSIONS = ("source", "principal", "event_type")
+
+# Histogram bucket widths in seconds
+HISTOGRAM_BUCKETS = {"per_minute": 60, "per_hour": 3600}
+
+# Categories kept per dimension; the rest are folded into "Other"
+HISTOGRAM_TOP_CATEGORIES = 20
+
+# CloudTrail archive files are partitioned and named by delivery time,
+# which trails the events they contain
+ARCHIVE_DELIVERY_LAG = timedelta(hours=1)
+
+# Archive files handed to a worker process per task
+ARCHIVE_BATCH_SIZE = 16
+
+# Delivery timestamp in archive file names, e.g. ..._20240101T0005Z_...
+ARCHIVE_FILE_TIME = re.compile(r"_(\d{8}T\d{4}Z)_")
+
+# Entity kinds tracked in the entity graph
+ENTITY_KINDS = ("principal", "ip", "resource", "session", "key")
+
+# CloudTrail request parameters that name the resource being acted on
+RESOURCE_PARAMETERS = (
+    "bucketName",
+    "instanceId",
+    "roleArn",
+    "functionName",
+    "dBInstanceIdentifier",
+    "secretId",
+    "keyId",
+    "userName",
+)
+
+
+def cloudtrail_record_to_event(record: Dict) -> Dict:
+    """Convert a raw CloudTrail record (archive format) to a timeline event."""
+    identity = record.get("userIdentity") or {}
+    arn = identity.get("arn")
+
+    return {
+        "timestamp": str(record.get("eventTime", "")).replace("Z", "+00:00"),
+        "source": "CloudTrail",
+        "event_id": record.get("eventID"),
+        "event_type": record.get("eventName"),
+        "principal": (
+            identity.get("userName")
+            or (arn.rsplit("/", 1)[-1] if arn else None)
+            or identity.get("principalId")
+        ),
+        "source_ip": record.get("sourceIPAddress"),
+        "resource_type": (record.get("requestParameters") or {}).get("resource"),
+        "action": record.get("eventName"),
+        "status": record.get("errorCode") or "Success",
+        "raw_event": record,
+    }
+
+
+# Per-process S3 client for archive workers
+_archive_s3 = None
+
+
+def read_cloudtrail_archive(
+    bucket: str, keys: List[str], start_epoch: float, end_epoch: float
+) -> List[Dict]:
+    """
+    Download, decompress and parse a batch of CloudTrail archive files.
+
+    Runs in a worker process; only events inside the window are returned.
+    """
+    global _archive_s3
+    if _archive_s3 is None:
+        _archive_s3 = boto3.client("s3")
+
+    events = []
+    for key in keys:
+        try:
+            body = _archive_s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+            records = json.loads(gzip.decompress(body)).get("Records", [])
+        except Exception as e:
+            logger.warning(f"Error reading CloudTrail archive {key}: {e}")
+            continue
+
+        for record in records:
+            event = cloudtrail_record_to_event(record)
+            if start_epoch <= TimelineBuilder._event_epoch(event) <= end_epoch:
+                events.append(event)
+
+    return events
+
+
+def extract_entities(event: Dict) -> List[str]:
+    """
+    Extract entity node names ("kind:value") from a timeline event.
+
+    Long-term access keys (AKIA...) become key nodes and temporary
+    credentials (ASIA...) become session nodes, including the session
+    credentials handed out by AssumeRole/GetSessionToken responses. That is
+    what links a compromised key to the sessions created from it.
+    """
+    raw = event.get("raw_event") or {}
+    identity = raw.get("userIdentity") or {}
+    entities = []
+
+    principal = identity.get("arn") or event.get("principal")
+    if principal:
+        entities.append(f"principal:{principal}")
+
+    source_ip = event.get("source_ip")
+    if source_ip and not str(source_ip).endswith("amazonaws.com"):
+        entities.append(f"ip:{source_ip}")
+
+    access_keys = [identity.get("accessKeyId")]
+    credentials = (raw.get("responseElements") or {}).get("credentials")
+    if isinstance(credentials, dict):
+        access_keys.append(credentials.get("accessKeyId"))
+    for access_key in access_keys:
+        if access_key:
+            kind = "session" if access_key.startswith("ASIA") else "key"
+            entities.append(f"{kind}:{access_key}")
+
+    for resource in raw.get("resources") or []:
+        if isinstance(resource, dict) and resource.get("ARN"):
+            entities.append(f"resource:{resource['ARN']}")
+    request_parameters = raw.get("requestParameters")
+    if isinstance(request_parameters, dict):
+        for parameter in RESOURCE_PARAMETERS:
+            value = request_parameters.get(parameter)
+            if isinstance(value, str) and value:
+                entities.append(f"resource:{value}")
+
+    # Keep first-seen order but drop duplicates
+    return list(dict.fromkeys(entities))
+
+
+class EntityGraph:
+    """
+    Entity co-occurrence graph with union-find clustering.
+
+    Nodes are principals, IPs, resources, sessions and access keys. Two
+    entities are linked when they appear in the same event; an edge's
+    weight counts the correlation windows in which they co-occurred. Node
+    and edge attributes live in compact arrays, and a CSR adjacency index
+    is built on demand for pivoting. Cluster membership is kept up to date
+    as clusters merge, so summarising clusters does not walk every node.
+    """
+
+    def __init__(self, window_seconds: int = CORRELATION_WINDOW_SECONDS):
+        """
+        Initialize entity graph.
+
+        Args:
+            window_seconds: Width of the co-occurrence windows
+        """
+        self.window_seconds = window_seconds
+
+        # Nodes
+        self._node_ids: Dict[str, int] = {}
+        self._node_names: List[str] = []
+        self._node_kinds = array("B")
+        self._node_events = array("I")
+        self._first_seen = array("d")
+        self._last_seen = array("d")
+
+        # Union-find forest over node ids, and the members of each root
+        self._parent = array("I")
+        self._rank = array("B")
+        self._members: Dict[int, List[int]] = {}
+
+        # Edges as parallel arrays, keyed by (low id << 32 | high id)
+        self._edge_index: Dict[int, int] = {}
+        self._edge_src = array("I")
+        self._edge_dst = array("I")
+        self._edge_weight = array("I")
+        self._edge_last_window = array("q")
+
+        # (edge << 32 | window) keys already counted, so an edge's weight
+        # counts distinct windows however out of order events arrive; keys
+        # older than the late-arrival horizon are dropped by prune_windows()
+        self._edge_windows: Set[int] = set()
+        self._pruned_before = 0
+
+        # CSR adjacency (offsets, neighbours), rebuilt after new edges
+        self._adjacency: Optional[Tuple[array, array]] = None
+
+    @property
+    def node_count(self) -> int:
+        """Number of entities in the graph."""
+        return len(self._node_names)
+
+    @property
+    def edge_count(self) -> int:
+        """Number of distinct entity pairs linked in the graph."""
+        return len(self._edge_src)
+
+    def _node(self, name: str, epoch: float) -> int:
+        """Return the id for an entity, creating the node if needed."""
+        node = self._node_ids.get(name)
+        if node is None:
+            node = len(self._node_names)
+            self._node_ids[name] = node
+            self._node_names.append(name)
+            self._node_kinds.append(ENTITY_KINDS.index(name.split(":", 1)[0]))
+            self._node_events.append(0)
+            self._first_seen.append(epoch)
+            self._last_seen.append(epoch)
+            self._parent.append(node)
+            self._rank.append(0)
+            self._members[node] = [node]
+        else:
+            if epoch < self._first_seen[node]:
+                self._first_seen[node] = epoch
+            if epoch > self._last_seen[node]:
+                self._last_seen[node] = epoch
+        self._node_events[node] += 1
+        return node
+
+    def _find(self, node: int) -> int:
+        """Find the cluster root of a node, halving the path on the way."""
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def _union(self, a: int, b: int) -> None:
+        """Merge the clusters of two nodes (union by rank)."""
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return
+        if self._rank[root_a] < self._rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        if self._rank[root_a] == self._rank[root_b]:
+            self._rank[root_a] += 1
+
+        # Move the smaller member list into the larger one
+        members_a, members_b = self._members[root_a], self._members.pop(root_b)
+        if len(members_a) < len(members_b):
+            members_a, members_b = members_b, members_a
+            self._members[root_a] = members_a
+        members_a.extend(members_b)
+
+    def add_event(self, entities: List[str], epoch: float) -> None:
+        """
+        Add the entities of one event and link them pairwise.
+
+        Args:
+            entities: Entity names from extract_entities()
+            epoch: Event time as epoch seconds
+        """
+        nodes = [self._node(name, epoch) for name in entities]
+        window = int(epoch // self.window_seconds)
+
+        for i, a in enumerate(nodes):
+            for b in nodes[i + 1 :]:
+                low, high = (a, b) if a < b else (b, a)
+                key = (low << 32) | high
+                edge = self._edge_index.get(key)
+                if edge is None:
+                    edge = len(self._edge_src)
+                    self._edge_index[key] = edge
+                    self._edge_src.append(low)
+                    self._edge_dst.append(high)
+                    self._edge_weight.append(1)
+                    self._edge_last_window.append(window)
+                    self._edge_windows.add((edge << 32) | window)
+                    self._adjacency = None
+                    self._union(low, high)
+                elif window > self._edge_last_window[edge]:
+                    self._edge_weight[edge] += 1
+                    self._edge_last_window[edge] = window
+                    self._edge_windows.add((edge << 32) | window)
+                elif window < self._edge_last_window[edge]:
+                    # Older than the horizon: assume already counted
+                    if window < self._pruned_before:
+                        continue
+                    edge_window = (edge << 32) | window
+                    if edge_window not in self._edge_windows:
+                        self._edge_weight[edge] += 1
+                        self._edge_windows.add(edge_window)
+
+    def prune_windows(self, before: float) -> None:
+        """
+        Forget which windows before a time were counted.
+
+        Events older than that time must not be added again; if they are,
+        they no longer add to edge weights.
+
+        Args:
+            before: Epoch seconds no later events will precede
+        """
+        cutoff = int(before // self.window_seconds)
+        if cutoff <= self._pruned_before:
+            return
+        self._pruned_before = cutoff
+        self._edge_windows = {
+            key for key in self._edge_windows if key & 0xFFFFFFFF >= cutoff
+        }
+
+    def _build_adjacency(self) -> Tuple[array, array]:
+        """Build the CSR adjacency index from the edge arrays."""
+        if self._adjacency is not None:
+            return self._adjacency
+
+        degree = array("I", [0]) * (self.node_count + 1)
+        for a, b in zip(self._edge_src, self._edge_dst):
+            degree[a + 1] += 1
+            degree[b + 1] += 1
+
+        offsets = array("Q", [0]) * (self.node_count + 1)
+        for node in range(self.node_count):
+            offsets[node + 1] = offsets[node] + degree[node + 1]
+
+        neighbours = array("I", [0]) * offsets[-1]
+        cursor = array("Q", offsets)
+        for a, b in zip(self._edge_src, self._edge_dst):
+            neighbours[cursor[a]] = b
+            cursor[a] += 1
+            neighbours[cursor[b]] = a
+            cursor[b] += 1
+
+        self._adjacency = (offsets, neighbours)
+        return self._adjacency
+
+    def _lookup(self, entity: str) -> List[int]:
+        """Resolve "kind:value" or a bare value to node ids."""
+        if entity in self._node_ids:
+            return [self._node_ids[entity]]
+        return [
+            self._node_ids[f"{kind}:{entity}"]
+            for kind in ENTITY_KINDS
+            if f"{kind}:{entity}" in self._node_ids
+        ]
+
+    def _summarize(self, members: List[int]) -> Dict:
+        """Summarise a set of nodes."""
+        by_kind: Dict[str, int] = defaultdict(int)
+        for node in members:
+            by_kind[ENTITY_KINDS[self._node_kinds[node]]] += 1
+
+        top_members = heapq.nlargest(10, members, key=lambda n: self._node_events[n])
+        return {
+            "size": len(members),
+            "entities_by_kind": dict(by_kind),
+            "entity_events": sum(self._node_events[n] for n in members),
+            "first_seen": datetime.fromtimestamp(
+                min(self._first_seen[n] for n in members), timezone.utc
+            ).isoformat(),
+            "last_seen": datetime.fromtimestamp(
+                max(self._last_seen[n] for n in members), timezone.utc
+            ).isoformat(),
+            "top_entities": [self._node_names[n] for n in top_members[:10]],
+        }
+
+    def clusters(self, min_size: int = 2, limit: int = 10) -> List[Dict]:
+        """
+        Summarise connected clusters of activity, largest first.
+
+        Args:
+            min_size: Smallest cluster to report
+            limit: Maximum clusters to report
+        """
+        ranked = heapq.nlargest(
+            limit,
+            (nodes for nodes in self._members.values() if len(nodes) >= min_size),
+            key=len,
+        )
+        return [self._summarize(nodes) for nodes in ranked]
+
+    def pivot(self, entity: str, max_hops: Optional[int] = None) -> Dict:
+        """
+        Pivot from one entity to everything linked to it.
+
+        Args:
+            entity: "kind:value" or a bare value such as an access key ID
+            max_hops: Limit on link distance (whole cluster if None)
+
+        Returns:
+            Cluster summary plus linked entities grouped by kind with their
+            hop distance from the starting entity
+        """
+        starts = self._lookup(entity)
+        if not starts:
+            return {"entity": entity, "found": False}
+
+        offsets, neighbours = self._build_adjacency()
+
+        # Breadth-first search over the CSR index
+        distance = {node: 0 for node in starts}
+        frontier = list(starts)
+        hops = 0
+        while frontier and (max_hops is None or hops < max_hops):
+            hops += 1
+            next_frontier = []
+            for node in frontier:
+                for i in range(offsets[node], offsets[node + 1]):
+                    neighbour = neighbours[i]
+                    if neighbour not in distance:
+                        distance[neighbour] = hops
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+
+        linked: Dict[str, List[Dict]] = defaultdict(list)
+        for node, hop in sorted(distance.items(), key=lambda x: x[1]):
+            kind, value = self._node_names[node].split(":", 1)
+            linked[kind].append({"entity": value, "hops": hop})
+
+        return {
+            "entity": entity,
+            "found": True,
+            "cluster": self._summarize(list(distance)),
+            "linked_entities": dict(linked),
+        }
+
 
 class TimelineBuilder:
     """Builds incident timeline from forensic data."""
@@ -31,6 +480,13 @@ class TimelineBuilder:
         incident_id: str,
         start_time: datetime,
         end_time: Optional[datetime] = None,
+        max_workers: int = 8,
+        queue_size: int = 10000,
+        late_arrival: timedelta = timedelta(minutes=15),
+        cloudtrail_bucket: Optional[str] = None,
+        cloudtrail_prefix: str = "",
+        archive_workers: Optional[int] = None,
+        inventory: Optional[ResourceInventory] = None,
     ):
         """
         Initialize timeline builder.
@@ -39,218 +495,611 @@ class TimelineBuilder:
             incident_id: Unique incident identifier
             start_time: Timeline start time
             end_time: Timeline end time (now if None)
+            max_workers: Number of concurrent collector tasks
+            queue_size: Maximum events buffered between collectors and correlator
+            late_arrival: How far before the watermark update() re-reads
+                CloudTrail to pick up late-delivered events
+            cloudtrail_bucket: Trail bucket to read archived events from
+                instead of the LookupEvents API
+            cloudtrail_prefix: Key prefix the trail delivers under
+            archive_workers: Processes parsing archive files (CPU count if None)
+            inventory: Shared resource inventory (in-memory one if None)
         """
         self.incident_id = incident_id
         self.start_time = start_time
-        self.end_time = end_time or datetime.utcnow()
+        self.end_time = end_time or self._now()
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.late_arrival = late_arrival
+        self.cloudtrail_bucket = cloudtrail_bucket
+        self.cloudtrail_prefix = cloudtrail_prefix.strip("/")
+        self.archive_workers = archive_workers or os.cpu_count() or 1
+        self.inventory = inventory or ResourceInventory(incident_id)
+
+        # A timeline without a fixed end follows the incident as it unfolds
+        self.follow = end_time is None
 
         # Initialize AWS clients
         self.cloudtrail = boto3.client("cloudtrail")
         self.cloudwatch = boto3.client("logs")
-        self.ec2 = boto3.client("ec2")
         self.rds = boto3.client("rds")
+        self.s3 = boto3.client("s3")
+
+        # Timeline events storage and incremental correlation state
+        self._reset_state()
+
+    def _now(self) -> datetime:
+        """Current UTC time, matching the timezone-awareness of start_time."""
+        if self.start_time.tzinfo is not None:
+            return datetime.now(timezone.utc)
+        return datetime.utcnow()
+
+    def _reset_state(self) -> None:
+        """Clear the event store, correlation windows and pattern counters."""
+        # (epoch key, event) pairs in time-sorted buckets of
+        # EVENT_BUCKET_SECONDS, the bucket numbers in order, and the pairs
+        # ingested since the last merge
+        self._buckets: Dict[int, List[Tuple[float, Dict[str, Any]]]] = {}
+        self._bucket_order: List[int] = []
+        self._event_count = 0
+        self._pending: List[Tuple[float, Dict[str, Any]]] = []
+        self._seen_event_ids: set = set()
+
+        self._ip_activity: Dict[str, int] = defaultdict(int)
+        self._ip_window_activity: Dict[Tuple[str, int], int] = defaultdict(int)
+
+        self.entity_graph = EntityGraph()
+
+        self._source_counts: Dict[str, int] = defaultdict(int)
+        self._principal_counts: Dict[str, int] = defaultdict(int)
+        self._source_ip_counts: Dict[str, int] = defaultdict(int)
+        self._event_type_counts: Dict[str, int] = defaultdict(int)
+
+        # Histogram columns in ingestion order: epoch seconds plus one
+        # category code per dimension, ready for NumPy without copying
+        self._hist_epochs = array("q")
+        self._hist_codes = {dim: array("I") for dim in HISTOGRAM_DIMENSIONS}
+        self._hist_categories: Dict[str, Dict[str, int]] = {
+            dim: {} for dim in HISTOGRAM_DIMENSIONS
+        }
 
-        # Timeline events storage
-        self.events: List[Dict[str, Any]] = []
-
-    def parse_cloudtrail_events(self) -> List[Dict]:
-        """Parse CloudTrail events into timeline format."""
-        logger.info("Parsing CloudTrail events")
-
-        events = []
+        # End of the last collected window (None until the first build)
+        self.watermark: Optional[datetime] = None
 
-        try:
-            paginator = self.cloudtrail.get_paginator("lookup_events")
-            page_iterator = paginator.paginate(
-                StartTime=self.start_time, EndTime=self.end_time
-            )
+    def collect_events(
+        self,
+        sources: Optional[Iterable[str]] = None,
+        vpc_ids: Optional[List[str]] = None,
+        log_groups: Optional[List[str]] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        cloudtrail_lookback: timedelta = timedelta(0),
+    ) -> Iterator[Dict]:
+        """
+        Collect events from all sources concurrently.
 
-            for page in page_iterator:
-                for event in page.get("Events", []):
-                    try:
-                        # Parse event JSON
-                        event_data = json.loads(event.get("CloudTrailEvent", "{}"))
-
-                        timeline_event = {
-                            "timestamp": (
-                                event["EventTime"].isoformat()
-                                if hasattr(event["EventTime"], "isoformat")
-                                else str(event["EventTime"])
-                            ),
-                            "source": "CloudTrail",
-                            "event_type": event.get("EventName"),
-                            "principal": event.get("Username"),
-                            "source_ip": event_data.get("sourceIPAddress"),
-                            "resource_type": event_data.get(
-                                "requestParameters", {}
-                            ).get("resource"),
-                            "action": event.get("EventName"),
-                            "status": (
-                                "Success" if event.get("CloudTrailEvent") else "Unknown"
-                            ),
-                            "raw_event": event_data,
-                        }
-
-                        events.append(timeline_event)
-
-                    except Exception as e:
-                        logger.warning(f"Error parsing CloudTrail event: {e}")
-
-            logger.info(f"Parsed {len(events)} CloudTrail events")
+        Every source runs as a collector task on a shared thread pool and
+        fans out one sub-task per VPC flow log or log group. Collectors feed
+        a bounded queue that is drained here, so events are yielded as soon
+        as any collector produces them.
 
-        except Exception as e:
-            logger.error(f"Error retrieving CloudTrail events: {e}")
+        Args:
+            sources: Sources to collect (cloudtrail, vpc_flow_logs, cloudwatch;
+                all if None)
+            vpc_ids: VPCs to query flow logs for (all if None)
+            log_groups: Log groups to query (all if None)
+            start_time: Window start (timeline start if None)
+            end_time: Window end (timeline end if None)
+            cloudtrail_lookback: Extra time read before start_time for
+                CloudTrail, whose events are delivered with a delay
+
+        Yields:
+            Timeline events in arrival order
+        """
+        start_time = start_time or self.start_time
+        end_time = end_time or self.end_time
+
+        collectors: Dict[str, Callable] = {
+            "cloudtrail": lambda spawn: (
+                self._collect_cloudtrail_archive
+                if self.cloudtrail_bucket
+                else self._collect_cloudtrail
+            )(spawn, start_time - cloudtrail_lookback, end_time),
+            "vpc_flow_logs": lambda spawn: self._collect_vpc_flow_logs(
+                spawn, start_time, end_time, vpc_ids
+            ),
+            "cloudwatch": lambda spawn: self._collect_cloudwatch(
+                spawn, start_time, end_time, log_groups
+            ),
+        }
+        selected = list(sources) if sources is not None else list(collectors)
 
-        return events
+        events_queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        lock = threading.Lock()
+        outstanding = 0
 
-    def parse_vpc_flow_logs(self, vpc_ids: Optional[List[str]] = None) -> List[Dict]:
-        """Parse VPC Flow Logs into timeline format."""
-        logger.info("Parsing VPC Flow Logs")
+        def put(item: Any) -> bool:
+            # Block while the correlator is behind, but give up once stopped
+            while not stop.is_set():
+                try:
+                    events_queue.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="timeline-collector"
+        )
 
-        events = []
+        def run(name: str, producer: Callable) -> None:
+            try:
+                # Fan-out collectors only spawn sub-tasks and return None
+                for event in producer(spawn) or ():
+                    if not put(event):
+                        return
+            except Exception as e:
+                logger.warning(f"Error collecting {name}: {e}")
+            finally:
+                put(_COLLECTOR_DONE)
+
+        def spawn(name: str, producer: Callable) -> None:
+            nonlocal outstanding
+            if stop.is_set():
+                return
+            with lock:
+                outstanding += 1
+            try:
+                executor.submit(run, name, producer)
+            except RuntimeError:
+                # The consumer stopped and the pool is already shut down
+                with lock:
+                    outstanding -= 1
 
         try:
-            if vpc_ids is None:
-                vpcs = self.ec2.describe_vpcs()
-                vpc_ids = [vpc["VpcId"] for vpc in vpcs.get("Vpcs", [])]
-
-            for vpc_id in vpc_ids:
+            for name in selected:
+                spawn(name, collectors[name])
+
+            while True:
+                item = events_queue.get()
+                if item is _COLLECTOR_DONE:
+                    with lock:
+                        outstanding -= 1
+                        if outstanding == 0:
+                            break
+                    continue
+                yield item
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _collect_cloudtrail(
+        self, spawn: Callable, start_time: datetime, end_time: datetime
+    ) -> Iterator[Dict]:
+        """Collector yielding CloudTrail events."""
+        paginator = self.cloudtrail.get_paginator("lookup_events")
+        page_iterator = paginator.paginate(StartTime=start_time, EndTime=end_time)
+
+        count = 0
+        for page in page_iterator:
+            for event in page.get("Events", []):
                 try:
-                    # Get flow logs
-                    flow_logs_response = self.ec2.describe_flow_logs(
-                        Filter=[{"Name": "resource-id", "Values": [vpc_id]}]
-                    )
-
-                    for fl in flow_logs_response.get("FlowLogs", []):
-                        log_group = fl.get("LogGroupName")
-                        if log_group:
-                            start_time = int(self.start_time.timestamp() * 1000)
-                            end_time = int(self.end_time.timestamp() * 1000)
-
-                            # Query for rejected flows (suspicious activity)
-                            query = """
-                            fields @timestamp, srcip, dstip, srcport, dstport, action, bytes, packets
-                            | filter action = "REJECT"
-                            """
-
-                            response = self.cloudwatch.start_query(
-                                logGroupName=log_group,
-                                startTime=start_time,
-                                endTime=end_time,
-                                queryString=query,
-                            )
-
-                            # Note: In production, would poll for results
-                            events.append(
-                                {
-                                    "timestamp": datetime.utcnow().isoformat(),
-                                    "source": "VPC Flow Logs",
-                                    "vpc_id": vpc_id,
-                                    "query_id": response["queryId"],
-                                    "log_group": log_group,
-                                }
-                            )
+                    # Parse event JSON
+                    event_data = json.loads(event.get("CloudTrailEvent", "{}"))
+
+                    timeline_event = {
+                        "timestamp": (
+                            event["EventTime"].isoformat()
+                            if hasattr(event["EventTime"], "isoformat")
+                            else str(event["EventTime"])
+                        ),
+                        "source": "CloudTrail",
+                        "event_id": event.get("EventId"),
+                        "event_type": event.get("EventName"),
+                        "principal": event.get("Username"),
+                        "source_ip": event_data.get("sourceIPAddress"),
+                        "resource_type": event_data.get("requestParameters", {}).get(
+                            "resource"
+                        ),
+                        "action": event.get("EventName"),
+                        "status": (
+                            "Success" if event.get("CloudTrailEvent") else "Unknown"
+                        ),
+                        "raw_event": event_data,
+                    }
+
+                    count += 1
+                    yield timeline_event
 
                 except Exception as e:
-                    logger.warning(f"Error parsing flow logs for {vpc_id}: {e}")
-
-        except Exception as e:
-            logger.error(f"Error parsing VPC Flow Logs: {e}")
-
-        return events
+                    logger.warning(f"Error parsing CloudTrail event: {e}")
+
+        logger.info(f"Parsed {count} CloudTrail events")
+
+    def _list_common_prefixes(self, prefix: str) -> List[str]:
+        """List the "directories" directly under a prefix in the trail bucket."""
+        prefixes = []
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(
+            Bucket=self.cloudtrail_bucket, Prefix=prefix, Delimiter="/"
+        ):
+            prefixes.extend(p["Prefix"] for p in page.get("CommonPrefixes", []))
+        return prefixes
+
+    def _archive_partitions(
+        self, start_time: datetime, end_time: datetime
+    ) -> List[str]:
+        """Date partitions of the trail archive that can hold the window."""
+        base = (
+            f"{self.cloudtrail_prefix}/AWSLogs/"
+            if self.cloudtrail_prefix
+            else "AWSLogs/"
+        )
 
-    def parse_cloudwatch_logs(
-        self, log_groups: Optional[List[str]] = None
-    ) -> List[Dict]:
-        """Parse CloudWatch logs into timeline format."""
-        logger.info("Parsing CloudWatch logs")
+        account_prefixes = []
+        for prefix in self._list_common_prefixes(base):
+            # Organization trails nest accounts under the organization ID
+            if prefix[len(base) :].startswith("o-"):
+                account_prefixes.extend(self._list_common_prefixes(prefix))
+            else:
+                account_prefixes.append(prefix)
+
+        # Partitions are UTC dates; naive times are already UTC
+        def utc_date(value: datetime) -> date:
+            if value.tzinfo is not None:
+                value = value.astimezone(timezone.utc)
+            return value.date()
+
+        days = []
+        day = utc_date(start_time)
+        while day <= utc_date(end_time + ARCHIVE_DELIVERY_LAG):
+            days.append(day)
+            day += timedelta(days=1)
+
+        return [
+            f"{region_prefix}{day:%Y/%m/%d}/"
+            for account_prefix in account_prefixes
+            for region_prefix in self._list_common_prefixes(
+                f"{account_prefix}CloudTrail/"
+            )
+            for day in days
+        ]
+
+    def _list_archive_files(
+        self, partition: str, start_epoch: float, end_epoch: float
+    ) -> List[str]:
+        """List archive files in a partition delivered during the window."""
+        keys = []
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.cloudtrail_bucket, Prefix=partition):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                match = ARCHIVE_FILE_TIME.search(key)
+                if match:
+                    delivered = (
+                        datetime.strptime(match.group(1), "%Y%m%dT%H%MZ")
+                        .replace(tzinfo=timezone.utc)
+                        .timestamp()
+                    )
+                    # Files are delivered after the events they contain
+                    if delivered < start_epoch or delivered > end_epoch:
+                        continue
+                keys.append(key)
+        return keys
+
+    def _collect_cloudtrail_archive(
+        self, spawn: Callable, start_time: datetime, end_time: datetime
+    ) -> Iterator[Dict]:
+        """
+        Collector yielding CloudTrail events from the trail's S3 archive.
 
-        events = []
+        Only the date partitions covering the window are listed, and the
+        gzip JSON files are decompressed and parsed in a process pool.
+        Unlike LookupEvents this includes data events and is not limited to
+        the last 90 days or throttled to a couple of calls per second.
+        """
+        start_epoch = self._event_epoch({"timestamp": start_time.isoformat()})
+        end_epoch = self._event_epoch({"timestamp": end_time.isoformat()})
+        delivery_end = end_epoch + ARCHIVE_DELIVERY_LAG.total_seconds()
+
+        partitions = self._archive_partitions(start_time, end_time)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as listers:
+            keys = [
+                key
+                for partition_keys in listers.map(
+                    lambda p: self._list_archive_files(p, start_epoch, delivery_end),
+                    partitions,
+                )
+                for key in partition_keys
+            ]
+
+        logger.info(
+            f"Reading {len(keys)} CloudTrail archive files "
+            f"from {len(partitions)} partitions"
+        )
 
-        try:
-            if log_groups is None:
-                paginator = self.cloudwatch.get_paginator("describe_log_groups")
-                log_groups = []
-                for page in paginator.paginate():
-                    log_groups.extend(
-                        [lg["logGroupName"] for lg in page.get("logGroups", [])]
+        batches = [
+            keys[i : i + ARCHIVE_BATCH_SIZE]
+            for i in range(0, len(keys), ARCHIVE_BATCH_SIZE)
+        ]
+
+        # Spawned workers: forking while collector threads run is unsafe
+        count = 0
+        with ProcessPoolExecutor(
+            max_workers=self.archive_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            pending = set()
+            while batches or pending:
+                # Keep a bounded number of batches in flight
+                while batches and len(pending) < 2 * self.archive_workers:
+                    pending.add(
+                        pool.submit(
+                            read_cloudtrail_archive,
+                            self.cloudtrail_bucket,
+                            batches.pop(),
+                            start_epoch,
+                            end_epoch,
+                        )
                     )
 
-            for log_group in log_groups:
-                try:
-                    logger.info(f"Querying {log_group}")
-
-                    start_time = int(self.start_time.timestamp() * 1000)
-                    end_time = int(self.end_time.timestamp() * 1000)
-
-                    # Query for error/warning events
-                    query = """
-                    fields @timestamp, @message, @logStream
-                    | filter @message like /ERROR|WARNING|CRITICAL|FATAL|exception/
-                    | sort @timestamp desc
-                    """
-
-                    response = self.cloudwatch.start_query(
-                        logGroupName=log_group,
-                        startTime=start_time,
-                        endTime=end_time,
-                        queryString=query,
-                    )
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for event in future.result():
+                        count += 1
+                        yield event
 
-                    events.append(
-                        {
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "source": "CloudWatch",
-                            "log_group": log_group,
-                            "query_id": response["queryId"],
-                        }
-                    )
+        logger.info(f"Parsed {count} archived CloudTrail events")
 
-                except Exception as e:
-                    logger.warning(f"Error querying {log_group}: {e}")
+    def _collect_vpc_flow_logs(
+        self,
+        spawn: Callable,
+        start_time: datetime,
+        end_time: datetime,
+        vpc_ids: Optional[List[str]] = None,
+    ) -> None:
+        """Collector fanning out one flow log query per log group."""
+        if vpc_ids is None:
+            vpc_ids = self.inventory.vpc_ids()
+
+        if not vpc_ids:
+            return
+
+        # The inventory's flow log list covers every VPC in one lookup
+        for fl in self.inventory.flow_logs(vpc_ids):
+            log_group = fl.get("LogGroupName")
+            if log_group:
+                spawn(
+                    f"flow logs {log_group}",
+                    lambda _spawn, vpc_id=fl.get("ResourceId"), lg=log_group: [
+                        self._query_flow_log_group(vpc_id, lg, start_time, end_time)
+                    ],
+                )
+
+    def _query_flow_log_group(
+        self, vpc_id: str, log_group: str, start: datetime, end: datetime
+    ) -> Dict:
+        """Start a rejected-flow query against a single flow log group."""
+        start_time = int(start.timestamp() * 1000)
+        end_time = int(end.timestamp() * 1000)
+
+        # Query for rejected flows (suspicious activity)
+        query = """
+        fields @timestamp, srcip, dstip, srcport, dstport, action, bytes, packets
+        | filter action = "REJECT"
+        """
 
-        except Exception as e:
-            logger.error(f"Error parsing CloudWatch logs: {e}")
+        response = self.cloudwatch.start_query(
+            logGroupName=log_group,
+            startTime=start_time,
+            endTime=end_time,
+            queryString=query,
+        )
 
-        return events
+        # Note: In production, would poll for results
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "VPC Flow Logs",
+            "vpc_id": vpc_id,
+            "query_id": response["queryId"],
+            "log_group": log_group,
+        }
 
-    def correlate_events(self, events: List[Dict]) -> List[Dict]:
-        """
-        Correlate events from multiple sources.
+    def _collect_cloudwatch(
+        self,
+        spawn: Callable,
+        start_time: datetime,
+        end_time: datetime,
+        log_groups: Optional[List[str]] = None,
+    ) -> None:
+        """Collector fanning out one query per log group."""
+        if log_groups is None:
+            log_groups = self.inventory.log_group_names()
+
+        for log_group in log_groups:
+            spawn(
+                f"log group {log_group}",
+                lambda _spawn, lg=log_group: [
+                    self._query_log_group(lg, start_time, end_time)
+                ],
+            )
 
-        Args:
-            events: List of timeline events
+    def _query_log_group(self, log_group: str, start: datetime, end: datetime) -> Dict:
+        """Start an error/warning query against a single log group."""
+        logger.info(f"Querying {log_group}")
 
-        Returns:
-            List of correlated events with relationships
+        start_time = int(start.timestamp() * 1000)
+        end_time = int(end.timestamp() * 1000)
+
+        # Query for error/warning events
+        query = """
+        fields @timestamp, @message, @logStream
+        | filter @message like /ERROR|WARNING|CRITICAL|FATAL|exception/
+        | sort @timestamp desc
         """
-        logger.info(f"Correlating {len(events)} events")
 
-        # Sort by timestamp
-        sorted_events = sorted(events, key=lambda x: x.get("timestamp", ""))
+        response = self.cloudwatch.start_query(
+            logGroupName=log_group,
+            startTime=start_time,
+            endTime=end_time,
+            queryString=query,
+        )
 
-        # Group by source IP and time window (5 min)
-        correlations = defaultdict(list)
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "source": "CloudWatch",
+            "log_group": log_group,
+            "query_id": response["queryId"],
+        }
 
-        for event in sorted_events:
-            source_ip = event.get("source_ip")
-            timestamp = event.get("timestamp")
+    def parse_cloudtrail_events(self) -> List[Dict]:
+        """Parse CloudTrail events into timeline format."""
+        logger.info("Parsing CloudTrail events")
+        return list(self.collect_events(["cloudtrail"]))
 
-            if source_ip and timestamp:
-                correlations[source_ip].append(event)
+    def parse_vpc_flow_logs(self, vpc_ids: Optional[List[str]] = None) -> List[Dict]:
+        """Parse VPC Flow Logs into timeline format."""
+        logger.info("Parsing VPC Flow Logs")
+        return list(self.collect_events(["vpc_flow_logs"], vpc_ids=vpc_ids))
 
-        # Add correlation info
-        correlated = []
-        for event in sorted_events:
-            source_ip = event.get("source_ip")
+    def parse_cloudwatch_logs(
+        self, log_groups: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """Parse CloudWatch logs into timeline format."""
+        logger.info("Parsing CloudWatch logs")
+        return list(self.collect_events(["cloudwatch"], log_groups=log_groups))
 
-            if source_ip in correlations:
-                event["related_events"] = len(correlations[source_ip]) - 1
-                event["source_ip_activity"] = len(correlations[source_ip])
+    @staticmethod
+    def _event_epoch(event: Dict) -> float:
+        """Sort key for an event: its timestamp as epoch seconds (UTC)."""
+        try:
+            timestamp = datetime.fromisoformat(str(event.get("timestamp")))
+        except ValueError:
+            return 0.0
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+
+    @staticmethod
+    def _event_id(event: Dict) -> Optional[str]:
+        """Stable identifier used to drop events already in the store."""
+        if event.get("event_id"):
+            return event["event_id"]
+        if event.get("query_id"):
+            return f"query:{event['query_id']}"
+        return None
+
+    def _ingest(self, event: Dict) -> bool:
+        """
+        Add one event to the store and update correlations and counters.
 
-            correlated.append(event)
+        Returns:
+            False if the event was already ingested
+        """
+        event_id = self._event_id(event)
+        if event_id is not None:
+            if event_id in self._seen_event_ids:
+                return False
+            self._seen_event_ids.add(event_id)
+
+        key = self._event_epoch(event)
+        self._pending.append((key, event))
+
+        # Correlate by source IP, overall and per time window
+        source_ip = event.get("source_ip")
+        if source_ip and event.get("timestamp"):
+            self._ip_activity[source_ip] += 1
+            window = int(key // CORRELATION_WINDOW_SECONDS)
+            self._ip_window_activity[(source_ip, window)] += 1
+
+        entities = extract_entities(event)
+        if entities:
+            self.entity_graph.add_event(entities, key)
+
+        # Pattern counters behind _current_analysis()
+        self._source_counts[event.get("source", "Unknown")] += 1
+        self._principal_counts[event.get("principal", "Unknown")] += 1
+        pattern_ip = event.get("source_ip", "Unknown")
+        if pattern_ip:
+            self._source_ip_counts[pattern_ip] += 1
+        self._event_type_counts[event.get("event_type", "Unknown")] += 1
+
+        self._hist_epochs.append(int(key))
+        for dim in HISTOGRAM_DIMENSIONS:
+            categories = self._hist_categories[dim]
+            label = str(event.get(dim) or "Unknown")
+            self._hist_codes[dim].append(categories.setdefault(label, len(categories)))
+
+        return True
+
+    def _ingest_window(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        cloudtrail_lookback: timedelta = timedelta(0),
+        sources: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Collect one time window into the store and advance the watermark."""
+        ingested = 0
+        for event in self.collect_events(
+            sources=sources,
+            start_time=start_time,
+            end_time=end_time,
+            cloudtrail_lookback=cloudtrail_lookback,
+        ):
+            if self._ingest(event):
+                ingested += 1
+
+        self._merge_pending()
+        self.watermark = end_time
+
+        # The next refresh re-reads no further back than late_arrival
+        horizon = end_time - self.late_arrival
+        if horizon.tzinfo is None:
+            horizon = horizon.replace(tzinfo=timezone.utc)
+        self.entity_graph.prune_windows(horizon.timestamp())
+        return ingested
+
+    def _merge_pending(self) -> None:
+        """
+        Merge newly ingested events into the time-sorted store.
 
-        return correlated
+        Only the buckets the new events fall into are re-sorted, so late
+        events cost the size of a few tail buckets, not of the store.
+        """
+        if not self._pending:
+            return
+
+        touched: Dict[int, List[Tuple[float, Dict[str, Any]]]] = defaultdict(list)
+        for item in self._pending:
+            touched[int(item[0] // EVENT_BUCKET_SECONDS)].append(item)
+
+        for bucket, items in touched.items():
+            events = self._buckets.get(bucket)
+            if events is None:
+                events = self._buckets[bucket] = items
+                if not self._bucket_order or bucket > self._bucket_order[-1]:
+                    self._bucket_order.append(bucket)
+                else:
+                    bisect.insort(self._bucket_order, bucket)
+            else:
+                events.extend(items)
+            # Stable, so events with equal times keep their arrival order
+            events.sort(key=lambda item: item[0])
+
+        self._event_count += len(self._pending)
+        self._pending = []
+
+    def _stored(self) -> Iterator[Tuple[float, Dict[str, Any]]]:
+        """Yield the stored (epoch key, event) pairs in time order."""
+        for bucket in self._bucket_order:
+            yield from self._buckets[bucket]
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        """Stored events in time order."""
+        return [event for _, event in self._stored()]
 
     def build_timeline(self) -> Dict:
         """
@@ -259,108 +1108,231 @@ class TimelineBuilder:
         Returns:
             Dictionary with timeline and analysis
         """
+        self._rebuild()
+        return self.get_timeline()
+
+    def _rebuild(self) -> None:
+        """Reset the timeline state and collect the whole timeline window."""
         logger.info(f"Building timeline for incident {self.incident_id}")
+        self._reset_state()
 
-        # Collect events from all sources
-        logger.info("Collecting events from all sources...")
-        all_events = []
+        # Collect events from all sources concurrently and correlate them
+        # as they arrive
+        logger.info("Collecting and correlating events from all sources...")
+        self._ingest_window(self.start_time, self.end_time)
 
-        # CloudTrail events
-        cloudtrail_events = self.parse_cloudtrail_events()
-        all_events.extend(cloudtrail_events)
-        logger.info(f"Collected {len(cloudtrail_events)} CloudTrail events")
+        for source, count in self._source_counts.items():
+            logger.info(f"Collected {count} {source} events")
 
-        # VPC Flow Logs
-        vpc_events = self.parse_vpc_flow_logs()
-        all_events.extend(vpc_events)
-        logger.info(f"Collected {len(vpc_events)} VPC events")
+    def update(self) -> Dict:
+        """
+        Ingest only events newer than the last watermark.
 
-        # CloudWatch logs
-        cw_events = self.parse_cloudwatch_logs()
-        all_events.extend(cw_events)
-        logger.info(f"Collected {len(cw_events)} CloudWatch events")
+        Correlations and pattern counters are adjusted for the new events
+        only, so a refresh costs time proportional to what has happened
+        since the previous one. The first call builds the timeline.
 
-        # Sort and correlate events
-        logger.info("Sorting and correlating events...")
-        correlated_events = self.correlate_events(all_events)
+        Refreshes read CloudTrail only: the flow log and log group
+        collectors start one Insights query over the whole window and
+        record it as a single event, which the first build already did.
 
-        # Analyze event patterns
-        logger.info("Analyzing event patterns...")
-        analysis = self.analyze_patterns(correlated_events)
+        Returns:
+            Dictionary summarising the refresh and the current analysis
+        """
+        if self.watermark is None:
+            self._rebuild()
+            new_events = self._event_count
+        else:
+            if self.follow:
+                self.end_time = self._now()
+
+            new_events = 0
+            if self.end_time > self.watermark:
+                logger.info(
+                    f"Updating timeline for incident {self.incident_id} "
+                    f"since {self.watermark.isoformat()}"
+                )
+                new_events = self._ingest_window(
+                    self.watermark,
+                    self.end_time,
+                    self.late_arrival,
+                    sources=INCREMENTAL_SOURCES,
+                )
+
+        logger.info(f"Ingested {new_events} new events")
+
+        return {
+            "incident_id": self.incident_id,
+            "new_events": new_events,
+            "total_events": self._event_count,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "events_by_source": dict(self._source_counts),
+            "analysis": self._current_analysis(),
+        }
 
-        # Build timeline output
-        timeline = {
+    def iter_timeline(self) -> Iterator[Dict]:
+        """Yield stored events in time order with their correlation info."""
+        # Correlation info is derived from the counters at render time, so
+        # earlier events see activity that arrived after them
+        for key, event in self._stored():
+            source_ip = event.get("source_ip")
+
+            if source_ip in self._ip_activity:
+                window = int(key // CORRELATION_WINDOW_SECONDS)
+                event["related_events"] = self._ip_activity[source_ip] - 1
+                event["source_ip_activity"] = self._ip_activity[source_ip]
+                event["source_ip_window_activity"] = self._ip_window_activity[
+                    (source_ip, window)
+                ]
+
+            yield event
+
+    def _summary(self) -> Dict:
+        """Timeline fields other than the event stream."""
+        return {
             "incident_id": self.incident_id,
             "timeline_period": {
                 "start": self.start_time.isoformat(),
                 "end": self.end_time.isoformat(),
                 "duration_seconds": (self.end_time - self.start_time).total_seconds(),
             },
-            "total_events": len(correlated_events),
-            "events_by_source": self._count_by_source(correlated_events),
-            "timeline": correlated_events,
-            "analysis": analysis,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "total_events": self._event_count,
+            "events_by_source": dict(self._source_counts),
+            "analysis": self._current_analysis(),
+            "histograms": self.compute_histograms(),
             "generated_time": datetime.utcnow().isoformat(),
         }
 
+    def get_timeline(self) -> Dict:
+        """Render the current timeline state without collecting anything."""
+        timeline = self._summary()
+        timeline["timeline"] = list(self.iter_timeline())
         return timeline
 
-    def _count_by_source(self, events: List[Dict]) -> Dict[str, int]:
-        """Count events by source."""
-        counts: Dict[str, int] = defaultdict(int)
-        for event in events:
-            source = event.get("source", "Unknown")
-            counts[source] += 1
-        return dict(counts)
-
-    def analyze_patterns(self, events: List[Dict]) -> Dict:
-        """Analyze event patterns for insights."""
-        analysis: Dict[str, Any] = {
-            "top_principals": defaultdict(int),
-            "top_source_ips": defaultdict(int),
-            "top_event_types": defaultdict(int),
+    def compute_histograms(self) -> Dict:
+        """
+        Per-minute and per-hour event histograms over the timeline window.
+
+        Counts are broken down by source, principal and event type with
+        np.bincount over the epoch and category-code columns. Only the most
+        active categories of each dimension are kept; the rest are summed
+        into "Other".
+        """
+        start = int(self._event_epoch({"timestamp": self.start_time.isoformat()}))
+        end = int(self._event_epoch({"timestamp": self.end_time.isoformat()}))
+
+        epochs = np.frombuffer(self._hist_epochs, dtype=np.int64)
+        in_window = (epochs >= start) & (epochs <= end)
+        epochs = epochs[in_window]
+
+        # Map every dimension to at most HISTOGRAM_TOP_CATEGORIES + 1 codes
+        dimensions = {}
+        for dim in HISTOGRAM_DIMENSIONS:
+            labels = np.array(list(self._hist_categories[dim]), dtype=object)
+            codes = np.frombuffer(self._hist_codes[dim], dtype=np.uint32)
+            codes = codes[in_window].astype(np.int64)
+
+            totals = np.bincount(codes, minlength=len(labels))
+            top = np.argsort(totals, kind="stable")[::-1][:HISTOGRAM_TOP_CATEGORIES]
+            top = top[totals[top] > 0]
+
+            remap = np.full(len(labels), len(top), dtype=np.int64)
+            remap[top] = np.arange(len(top))
+            names = [str(label) for label in labels[top]]
+            if len(top) < len(labels) and (totals.sum() > totals[top].sum()):
+                names.append("Other")
+            dimensions[dim] = (names, remap[codes])
+
+        histograms = {}
+        for name, width in HISTOGRAM_BUCKETS.items():
+            origin = start - start % width
+            bins = (epochs - origin) // width
+            bin_count = (end - origin) // width + 1
+
+            buckets: Dict[str, Any] = {
+                "bucket_seconds": width,
+                "start": datetime.fromtimestamp(origin, timezone.utc).isoformat(),
+                "bins": bin_count,
+                "total": np.bincount(bins, minlength=bin_count).tolist(),
+            }
+            for dim, (names, codes) in dimensions.items():
+                category_count = len(names) or 1
+                matrix = np.bincount(
+                    codes * bin_count + bins, minlength=category_count * bin_count
+                ).reshape(category_count, bin_count)
+                buckets[f"by_{dim}"] = {
+                    label: matrix[i].tolist() for i, label in enumerate(names)
+                }
+
+            histograms[name] = buckets
+
+        return histograms
+
+    @staticmethod
+    def _top(counts: Dict[str, int], limit: int) -> Dict[str, int]:
+        """Return the highest counts, largest first."""
+        return dict(sorted(counts.items(), key=lambda x: x[1], reverse=True)[:limit])
+
+    def _current_analysis(self) -> Dict:
+        """Analysis of the event store from the running pattern counters."""
+        return {
+            "top_principals": self._top(self._principal_counts, 5),
+            "top_source_ips": self._top(self._source_ip_counts, 5),
+            "top_event_types": self._top(self._event_type_counts, 10),
             "suspicious_patterns": [],
+            "entity_graph": {
+                "entities": self.entity_graph.node_count,
+                "links": self.entity_graph.edge_count,
+                "clusters": self.entity_graph.clusters(),
+            },
         }
 
-        for event in events:
-            # Count by principal
-            principal = event.get("principal", "Unknown")
-            analysis["top_principals"][principal] += 1
-
-            # Count by source IP
-            source_ip = event.get("source_ip", "Unknown")
-            if source_ip:
-                analysis["top_source_ips"][source_ip] += 1
-
-            # Count by event type
-            event_type = event.get("event_type", "Unknown")
-            analysis["top_event_types"][event_type] += 1
-
-        # Find top items
-        analysis["top_principals"] = dict(
-            sorted(
-                analysis["top_principals"].items(), key=lambda x: x[1], reverse=True
-            )[:5]
-        )
-        analysis["top_source_ips"] = dict(
-            sorted(
-                analysis["top_source_ips"].items(), key=lambda x: x[1], reverse=True
-            )[:5]
-        )
-        analysis["top_event_types"] = dict(
-            sorted(
-                analysis["top_event_types"].items(), key=lambda x: x[1], reverse=True
-            )[:10]
-        )
+    def export_timeline(self, output_file: str, incremental: bool = False) -> str:
+        """
+        Export timeline to file.
+
+        Events are streamed to the file one at a time instead of building
+        the whole document in memory first. Summary fields and histograms
+        are written ahead of the event stream, and the histograms also go to
+        a small "<name>-histograms.json" file next to the output so
+        dashboards can render overviews without loading the events.
 
-        return dict(analysis)
+        Args:
+            output_file: Output path
+            incremental: Refresh with update() instead of rebuilding
+        """
+        if incremental:
+            self.update()
+        else:
+            self._rebuild()
 
-    def export_timeline(self, output_file: str) -> str:
-        """Export timeline to file."""
-        timeline = self.build_timeline()
+        summary = self._summary()
 
         with open(output_file, "w") as f:
-            json.dump(timeline, f, indent=2, default=str)
+            f.write("{\n")
+            for key, value in summary.items():
+                f.write(f"  {json.dumps(key)}: {json.dumps(value, default=str)},\n")
+
+            f.write('  "timeline": [')
+            for i, event in enumerate(self.iter_timeline()):
+                f.write(",\n    " if i else "\n    ")
+                f.write(json.dumps(event, default=str))
+            f.write("\n  ]\n}\n")
+
+        output_path = Path(output_file)
+        histogram_file = output_path.with_name(f"{output_path.stem}-histograms.json")
+        with open(histogram_file, "w") as f:
+            json.dump(
+                {
+                    "incident_id": self.incident_id,
+                    "timeline_period": summary["timeline_period"],
+                    "generated_time": summary["generated_time"],
+                    "histograms": summary["histograms"],
+                },
+                f,
+                indent=2,
+            )
 
         logger.info(f"Timeline exported to {output_file}")
         return output_file
@@ -379,6 +1351,44 @@ def main():
         "--end-time", help="Timeline end time (ISO format, now if not specified)"
     )
     parser.add_argument("--output-file", default="timeline.json", help="Output file")
+    parser.add_argument(
+        "--max-workers", type=int, default=8, help="Concurrent collector tasks"
+    )
+    parser.add_argument(
+        "--cloudtrail-bucket",
+        help="Read CloudTrail from this trail bucket instead of LookupEvents",
+    )
+    parser.add_argument(
+        "--cloudtrail-prefix", default="", help="Key prefix of the trail bucket"
+    )
+    parser.add_argument(
+        "--archive-workers",
+        type=int,
+        help="Processes parsing CloudTrail archive files (CPU count by default)",
+    )
+    parser.add_argument(
+        "--pivot",
+        action="append",
+        default=[],
+        help="Entity to pivot from, e.g. an access key ID (repeatable)",
+    )
+    parser.add_argument(
+        "--refresh-interval",
+        type=int,
+        default=0,
+        help="Keep refreshing the timeline every N seconds (live incidents)",
+    )
+    parser.add_argument(
+        "--inventory-dir",
+        default="./incident-inventory",
+        help="Resource inventory cache shared by the forensics scripts",
+    )
+    parser.add_argument(
+        "--inventory-ttl",
+        type=float,
+        default=DEFAULT_INVENTORY_TTL,
+        help="Seconds cached inventory stays valid",
+    )
 
     args = parser.parse_args()
 
@@ -389,11 +1399,35 @@ def main():
         end_time = datetime.fromisoformat(args.end_time.replace("Z", "+00:00"))
 
     # Build timeline
-    builder = TimelineBuilder(args.incident_id, start_time, end_time)
+    builder = TimelineBuilder(
+        args.incident_id,
+        start_time,
+        end_time,
+        max_workers=args.max_workers,
+        cloudtrail_bucket=args.cloudtrail_bucket,
+        cloudtrail_prefix=args.cloudtrail_prefix,
+        archive_workers=args.archive_workers,
+        inventory=ResourceInventory(
+            args.incident_id, args.inventory_dir, args.inventory_ttl
+        ),
+    )
     output_file = builder.export_timeline(args.output_file)
 
     print(f"Timeline created: {output_file}")
 
+    for entity in args.pivot:
+        print(json.dumps(builder.entity_graph.pivot(entity), indent=2))
+
+    # Live mode: only ingest what is new on every refresh
+    if args.refresh_interval > 0 and builder.follow:
+        try:
+            while True:
+                time.sleep(args.refresh_interval)
+                builder.export_timeline(args.output_file, incremental=True)
+                print(f"Timeline refreshed: {output_file}")
+        except KeyboardInterrupt:
+            pass
+
 
 if __name__ == "__main__":
     main()